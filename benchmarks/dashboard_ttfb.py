@@ -0,0 +1,151 @@
+"""Time to first byte and transfer size of the web dashboard.
+
+Run from the repository root::
+
+    python -m benchmarks.dashboard_ttfb
+    python -m benchmarks.dashboard_ttfb --url http://127.0.0.1:8000
+
+Without ``--url`` the dashboard is started under uvicorn on a scratch
+SQLite database seeded with ``--users`` members and ``--events`` events.
+With ``--url`` an already running instance is measured (seed it yourself,
+e.g. with ``--seed-only`` and the same ``DATABASE_URL``).
+
+Every request is repeated ``--repeat`` times; the table shows the median
+TTFB and the bytes on the wire as a browser would fetch them (gzip accepted).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import re
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = (
+        f"sqlite+aiosqlite:///{Path(tempfile.mkdtemp(prefix='techhub-bench-')) / 'bench.db'}"
+    )
+os.environ.setdefault("BOT_TOKEN", "0:benchmark")
+
+import httpx  # noqa: E402
+
+from bot.db import init_db, session_scope  # noqa: E402
+from bot.models import Event, EventRegistration, MembershipStatus, User  # noqa: E402
+
+PORT = 8766
+
+
+async def seed(users: int, events: int) -> None:
+    await init_db()
+    now = datetime.utcnow()
+    async with session_scope() as session:
+        members = [
+            User(
+                telegram_id=index,
+                full_name=f"Участник {index}",
+                email=f"member{index}@example.com",
+                status=MembershipStatus.ACTIVE,
+            )
+            for index in range(users)
+        ]
+        session.add_all(members)
+        rows = [
+            Event(
+                title=f"Мероприятие {index}",
+                location="Аудитория 101",
+                registration_start=now - timedelta(days=30),
+                registration_end=now + timedelta(days=30),
+                start_at=now + timedelta(days=index - events // 2),
+                end_at=now + timedelta(days=index - events // 2, hours=2),
+            )
+            for index in range(events)
+        ]
+        session.add_all(rows)
+        await session.flush()
+        session.add_all(
+            EventRegistration(event_id=event.id, user_id=member.id)
+            for event in rows
+            for member in members[: len(members) // 2]
+        )
+
+
+async def measure(client: httpx.AsyncClient, url: str, repeat: int, headers: dict | None = None) -> tuple:
+    ttfbs = []
+    size = status = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        async with client.stream("GET", url, headers={"Accept-Encoding": "gzip", **(headers or {})}) as response:
+            size = 0
+            async for chunk in response.aiter_raw():
+                if not size:
+                    ttfbs.append(time.perf_counter() - started)
+                size += len(chunk)
+            if not size:
+                ttfbs.append(time.perf_counter() - started)
+            status = response.status_code
+            etag = response.headers.get("etag")
+    return status, statistics.median(ttfbs) * 1000, size, etag
+
+
+async def run(args: argparse.Namespace) -> None:
+    server = None
+    base = args.url
+    if base is None:
+        import uvicorn
+
+        from web.app import app
+
+        await seed(args.users, args.events)
+        server = uvicorn.Server(uvicorn.Config(app, port=PORT, log_level="warning"))
+        serving = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.05)
+        base = f"http://127.0.0.1:{PORT}"
+
+    async with httpx.AsyncClient(base_url=base, timeout=30) as client:
+        rows = []
+        status, ttfb, size, etag = await measure(client, "/", 1)
+        rows.append(("dashboard, first request", status, ttfb, size))
+        status, ttfb, size, _ = await measure(client, "/", args.repeat)
+        rows.append(("dashboard", status, ttfb, size))
+        page_weight = size
+        if etag:
+            status, ttfb, size, _ = await measure(client, "/", args.repeat, {"If-None-Match": etag})
+            rows.append(("dashboard, If-None-Match", status, ttfb, size))
+        page = (await client.get("/")).text
+        for src in re.findall(r'(?:src|href)="([^"]+\.(?:js|css))"', page):
+            status, ttfb, size, _ = await measure(client, src, args.repeat)
+            rows.append((src.rsplit("/", 1)[-1], status, ttfb, size))
+            page_weight += size
+
+    print(f"{'request':<40} {'status':>6} {'ttfb ms':>8} {'bytes':>9}")
+    for name, status, ttfb, size in rows:
+        print(f"{name[:40]:<40} {status:>6} {ttfb:8.1f} {size:9d}")
+    print(f"{'page weight (HTML + own assets)':<40} {'':>6} {'':>8} {page_weight:9d}")
+
+    if server is not None:
+        server.should_exit = True
+        await serving
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="measure a running instance instead of starting one")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--events", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed-only", action="store_true", help="only seed DATABASE_URL and exit")
+    args = parser.parse_args()
+    if args.seed_only:
+        asyncio.run(seed(args.users, args.events))
+        return
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
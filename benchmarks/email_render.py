@@ -0,0 +1,102 @@
+"""Rendering and MIME assembly of personalized emails.
+
+Run from the repository root::
+
+    python -m benchmarks.email_render --messages 10000
+
+Each variant renders the reminder template for ``--messages`` members and
+builds and serializes the multipart messages. Besides throughput it reports the longest
+event-loop stall seen by a 1 ms ticker, i.e. how long other handlers would
+have waited while the batch was being prepared.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("BOT_TOKEN", "0:benchmark")
+os.environ.setdefault("SMTP_FROM", "bot@example.com")
+
+from bot.utils.email_templates import EmailTemplates, get_email_templates, render_emails  # noqa: E402
+from bot.utils.emailer import encode_message  # noqa: E402
+
+EVENT = {"title": "Хакатон", "start": "01.01 18:00", "location": "Аудитория 101"}
+
+
+def _contexts(count: int) -> list[dict]:
+    return [{**EVENT, "name": f"Участник {index}"} for index in range(count)]
+
+
+async def on_loop(count: int) -> None:
+    templates = get_email_templates()
+    for index, context in enumerate(_contexts(count)):
+        email = templates.render("event_reminder", **context)
+        encode_message(email.subject, email.text, [f"member{index}@example.com"], email.html)
+
+
+async def per_message_threads(count: int) -> None:
+    templates = get_email_templates()
+    for index, context in enumerate(_contexts(count)):
+        email = templates.render("event_reminder", **context)
+        await asyncio.to_thread(encode_message, email.subject, email.text, [f"member{index}@example.com"], email.html)
+
+
+async def bulk_threads(count: int) -> None:
+    emails = await render_emails("event_reminder", _contexts(count))
+    await asyncio.to_thread(
+        lambda: [
+            encode_message(email.subject, email.text, [f"member{index}@example.com"], email.html)
+            for index, email in enumerate(emails)
+        ]
+    )
+
+
+VARIANTS = (
+    ("render + MIME on the loop", on_loop),
+    ("MIME per message in threads", per_message_threads),
+    ("bulk render + MIME in thread", bulk_threads),
+)
+
+
+async def measure(variant, count: int) -> tuple[float, float]:
+    stall = 0.0
+    running = True
+
+    async def ticker() -> None:
+        nonlocal stall
+        while running:
+            before = time.perf_counter()
+            await asyncio.sleep(0.001)
+            stall = max(stall, time.perf_counter() - before - 0.001)
+
+    probe = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+    started = time.perf_counter()
+    await variant(count)
+    elapsed = time.perf_counter() - started
+    running = False
+    await probe
+    return elapsed, stall
+
+
+async def run(args: argparse.Namespace) -> None:
+    started = time.perf_counter()
+    EmailTemplates()
+    print(f"{'compile templates':<30} {(time.perf_counter() - started) * 1000:8.1f} ms")
+    get_email_templates()
+    for name, variant in VARIANTS:
+        elapsed, stall = await measure(variant, args.messages)
+        print(f"{name:<30} {args.messages / elapsed:8.0f} msgs/sec  max loop stall {stall * 1000:7.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=10000)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
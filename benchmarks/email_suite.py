@@ -0,0 +1,233 @@
+"""Email benchmark suite: realistic workloads against a local aiosmtpd stand-in.
+
+Run from the repository root::
+
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.email_suite --output benchmarks/results/email.json
+    python -m benchmarks.email_suite reminders --compare benchmarks/results/email.json
+
+Workloads:
+
+``registration``
+    Members signing up for an event: ``--users`` concurrent handlers each
+    await ``send_email`` with a rendered confirmation for one address.
+``reminders``
+    The reminder burst of a large event: personalized reminders submitted
+    to the email queue in a tight loop and drained by its workers.
+``reminders_bcc``
+    The same burst sent as ``--batch-size`` BCC chunks (as with
+    ``EMAIL_BATCH_SIZE``) through ``send_email``.
+
+For each workload the suite records messages/sec, p50/p99 latency from the
+call to the message reaching the server, and the peak number of connections
+the server saw open. Results go to a JSON file; ``--compare`` prints the
+change against an earlier run.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List
+
+from .smtp_stub import SinkHandler, start_server  # first: configures the environment for bot
+
+from bot.config import get_settings
+from bot.utils import emailer
+from bot.utils.email_templates import get_email_templates
+
+settings = get_settings()
+
+EVENT = {"title": "Хакатон", "start": "01.01 18:00", "location": "Аудитория 101"}
+
+
+def _address(index: int) -> str:
+    return f"member{index}@example.com"
+
+
+async def registration(count: int, args: argparse.Namespace) -> Dict[str, float]:
+    templates = get_email_templates()
+    submitted: Dict[str, float] = {}
+    slots = asyncio.Semaphore(args.users)
+
+    async def handler(index: int) -> None:
+        async with slots:
+            email = templates.render(
+                "event_registered", name=f"Участник {index}", title=EVENT["title"], start=EVENT["start"]
+            )
+            submitted[_address(index)] = time.perf_counter()
+            await emailer.send_email(email.subject, email.text, [_address(index)], email.html)
+
+    await asyncio.gather(*(handler(index) for index in range(count)))
+    return submitted
+
+
+async def reminders(count: int, args: argparse.Namespace) -> Dict[str, float]:
+    templates = get_email_templates()
+    submitted: Dict[str, float] = {}
+    queue = emailer.get_email_queue()
+    queue.start()
+    for index in range(count):
+        email = templates.render("event_reminder", **EVENT, name=f"Участник {index}")
+        submitted[_address(index)] = time.perf_counter()
+        await queue.submit(email.subject, email.text, [_address(index)], email.html)
+        if (index + 1) % 100 == 0:
+            # Let the workers run, as the reminder worker's awaits would in the bot
+            await asyncio.sleep(0)
+    await queue.stop()
+    return submitted
+
+
+async def reminders_bcc(count: int, args: argparse.Namespace) -> Dict[str, float]:
+    email = get_email_templates().render("event_reminder", **EVENT, name=None)
+    submitted: Dict[str, float] = {}
+    chunks = [
+        [_address(index) for index in range(start, min(start + args.batch_size, count))]
+        for start in range(0, count, args.batch_size)
+    ]
+
+    async def send(chunk: List[str]) -> None:
+        now = time.perf_counter()
+        submitted.update((address, now) for address in chunk)
+        await emailer.send_email(email.subject, email.text, chunk, email.html)
+
+    await asyncio.gather(*(send(chunk) for chunk in chunks))
+    return submitted
+
+
+WORKLOADS = {
+    "registration": registration,
+    "reminders": reminders,
+    "reminders_bcc": reminders_bcc,
+}
+
+
+def _percentile(values: List[float], percent: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[percent - 1]
+
+
+def summarize(handler: SinkHandler, submitted: Dict[str, float], elapsed: float) -> dict:
+    latencies = [
+        (handler.arrivals[address] - started) * 1000
+        for address, started in submitted.items()
+        if address in handler.arrivals
+    ]
+    return {
+        "messages": handler.received,
+        "recipients": handler.recipients,
+        "lost": len(submitted) - len(latencies),
+        "seconds": round(elapsed, 3),
+        "msgs_per_sec": round(handler.recipients / elapsed, 1),
+        "p50_ms": round(_percentile(latencies, 50), 1),
+        "p99_ms": round(_percentile(latencies, 99), 1),
+        "peak_connections": handler.peak_connections,
+        "connections": handler.connections,
+    }
+
+
+async def run_workload(name: str, args: argparse.Namespace) -> dict:
+    controller, handler = start_server(args.port, args.latency)
+    try:
+        started = time.perf_counter()
+        submitted = await WORKLOADS[name](args.messages, args)
+        elapsed = time.perf_counter() - started
+        await emailer.close_smtp_pool()
+    finally:
+        controller.stop()
+    return summarize(handler, submitted, elapsed)
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: dict, baseline_path: Path) -> None:
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    print(f"\nChange against {baseline_path} ({baseline.get('revision', '?')}):")
+    for name, current in results.items():
+        previous = baseline.get("workloads", {}).get(name)
+        if not previous:
+            continue
+        changes = []
+        for metric in ("msgs_per_sec", "p50_ms", "p99_ms", "peak_connections"):
+            if previous.get(metric):
+                delta = (current[metric] - previous[metric]) / previous[metric] * 100
+                changes.append(f"{metric} {delta:+.1f}%")
+        print(f"  {name:<15} " + ", ".join(changes))
+
+
+async def run(args: argparse.Namespace) -> None:
+    settings.smtp_port = args.port
+    settings.smtp_pool_size = args.pool_size
+    settings.email_workers = args.pool_size
+    settings.email_queue_size = args.messages + 1
+    emailer._pool = None
+    emailer._queue = None
+
+    results = {}
+    for name in args.workloads:
+        results[name] = await run_workload(name, args)
+        row = results[name]
+        print(
+            f"{name:<15} {row['msgs_per_sec']:8.1f} msgs/sec  p50 {row['p50_ms']:7.1f} ms  "
+            f"p99 {row['p99_ms']:7.1f} ms  peak connections {row['peak_connections']}"
+        )
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "parameters": {
+            "messages": args.messages,
+            "handshake_latency": args.latency,
+            "pool_size": args.pool_size,
+            "users": args.users,
+            "batch_size": args.batch_size,
+        },
+        "workloads": results,
+    }
+    if args.compare:
+        compare(results, args.compare)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(f"\nResults written to {args.output}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("workloads", nargs="*", metavar="workload", help=f"any of {', '.join(WORKLOADS)}; all by default")
+    parser.add_argument("--messages", type=int, default=2000, help="emails (recipients) per workload")
+    parser.add_argument("--users", type=int, default=50, help="concurrent handlers in the registration workload")
+    parser.add_argument("--batch-size", type=int, default=50, help="recipients per BCC chunk")
+    parser.add_argument(
+        "--pool-size", type=int, default=settings.smtp_pool_size, help="SMTP connections and email workers"
+    )
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every handshake")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--output", type=Path, help="write the results as JSON")
+    parser.add_argument("--compare", type=Path, help="earlier JSON results to compare against")
+    args = parser.parse_args()
+    unknown = set(args.workloads) - set(WORKLOADS)
+    if unknown:
+        parser.error(f"unknown workload: {', '.join(sorted(unknown))}")
+    args.workloads = args.workloads or list(WORKLOADS)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
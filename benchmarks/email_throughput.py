@@ -0,0 +1,116 @@
+"""Email throughput against a local aiosmtpd stand-in.
+
+Run from the repository root::
+
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.email_throughput --messages 500
+    python -m benchmarks.email_throughput --scenario reminders --messages 2000
+
+The stand-in (``benchmarks/smtp_stub.py``) accepts AUTH and discards
+messages; an artificial handshake delay (``--latency``) stands in for the
+network round trips of a real relay.
+
+``connections`` compares a fresh ``aiosmtplib.send`` per message with
+``SMTPPool``. ``reminders`` renders and queues one reminder email for
+``--messages`` registrants into a scratch SQLite database, exactly as the
+reminder worker does, and drains it with the outbox worker.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+
+import aiosmtplib
+
+from .smtp_stub import HOST, PASSWORD, USER, start_server  # first: configures the environment for bot
+
+from bot.config import get_settings
+from bot.db import init_db, session_scope
+from bot.services.club import ClubService
+from bot.services.outbox import process_outbox_batch
+from bot.services.reminders import _enqueue_reminder_emails
+from bot.utils.emailer import SMTPPool, build_message, close_smtp_pool
+
+settings = get_settings()
+
+
+def _message(index: int):
+    return build_message(f"Benchmark #{index}", "Hello from the benchmark.", [f"member{index}@example.com"])
+
+
+async def per_message(port: int, count: int, concurrency: int) -> None:
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one(index: int) -> None:
+        async with slots:
+            await aiosmtplib.send(
+                _message(index), hostname=HOST, port=port, username=USER, password=PASSWORD, start_tls=False
+            )
+
+    await asyncio.gather(*(one(index) for index in range(count)))
+
+
+async def pooled(port: int, count: int, concurrency: int) -> None:
+    pool = SMTPPool(hostname=HOST, port=port, username=USER, password=PASSWORD, start_tls=False, size=concurrency)
+    try:
+        await asyncio.gather(*(pool.send(_message(index)) for index in range(count)))
+    finally:
+        await pool.close()
+
+
+async def reminders(port: int, count: int, concurrency: int) -> None:
+    settings.smtp_port = port
+    settings.smtp_pool_size = concurrency
+    await init_db()
+    rows = [
+        SimpleNamespace(email=f"member{index}@example.com", full_name=f"Участник {index}") for index in range(count)
+    ]
+    event = {"title": "Benchmark", "start": "01.01 18:00", "location": "Аудитория 101"}
+    async with session_scope() as session:
+        await _enqueue_reminder_emails(
+            ClubService(session), rows, event, f"reminder-email:bench:{time.time_ns()}"
+        )
+    try:
+        while await process_outbox_batch(None):
+            pass
+    finally:
+        await close_smtp_pool()
+
+
+SCENARIOS = {
+    "connections": (("aiosmtplib.send per message", per_message), ("SMTPPool", pooled)),
+    "reminders": (("reminder emails", reminders),),
+}
+
+
+async def run(args: argparse.Namespace) -> None:
+    for name, scenario in SCENARIOS[args.scenario]:
+        controller, handler = start_server(args.port, args.latency)
+        try:
+            started = time.perf_counter()
+            await scenario(args.port, args.messages, args.concurrency)
+            elapsed = time.perf_counter() - started
+        finally:
+            controller.stop()
+        print(
+            f"{name:<30} {args.messages / elapsed:8.1f} msgs/sec  "
+            f"{handler.connections:5d} connections  {handler.received} messages  "
+            f"{handler.recipients} recipients"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="connections")
+    parser.add_argument("--messages", type=int, default=500, help="messages, or registrants for reminders")
+    parser.add_argument("--concurrency", type=int, default=2, help="parallel sends / pool size")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every handshake")
+    parser.add_argument("--port", type=int, default=8025)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Shared setup for the email benchmarks: environment and a local aiosmtpd stand-in.
+
+Import this module before anything from ``bot``: it points the settings at
+the stand-in and at a scratch SQLite database.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict
+
+HOST = "127.0.0.1"
+USER = "bench"
+PASSWORD = "bench"
+SCRATCH = Path(tempfile.mkdtemp(prefix="techhub-bench-"))
+
+os.environ.setdefault("BOT_TOKEN", "0:benchmark")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{SCRATCH / 'bench.db'}"
+os.environ.update(
+    SMTP_HOST=HOST,
+    SMTP_USER=USER,
+    SMTP_PASSWORD=PASSWORD,
+    SMTP_FROM="bot@example.com",
+    SMTP_START_TLS="false",
+)
+
+from aiosmtpd.controller import Controller  # noqa: E402
+from aiosmtpd.smtp import SMTP, AuthResult  # noqa: E402
+
+
+class SinkHandler:
+    """Accepts and discards mail, keeping the counters the benchmarks report."""
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.received = 0
+        self.recipients = 0
+        self.connections = 0
+        self.open_connections = 0
+        self.peak_connections = 0
+        # Arrival time (perf_counter) of the first message for each envelope recipient
+        self.arrivals: Dict[str, float] = {}
+
+    def connected(self) -> None:
+        self.connections += 1
+        self.open_connections += 1
+        self.peak_connections = max(self.peak_connections, self.open_connections)
+
+    def disconnected(self) -> None:
+        self.open_connections -= 1
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        # Every new connection says EHLO once, so this is where handshake cost is paid
+        await asyncio.sleep(self.latency)
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        now = time.perf_counter()
+        self.received += 1
+        self.recipients += len(envelope.rcpt_tos)
+        for address in envelope.rcpt_tos:
+            self.arrivals.setdefault(address, now)
+        return "250 OK"
+
+
+class CountingSMTP(SMTP):
+    def connection_made(self, transport) -> None:
+        self.event_handler.connected()
+        super().connection_made(transport)
+
+    def connection_lost(self, exc) -> None:
+        self.event_handler.disconnected()
+        super().connection_lost(exc)
+
+
+class StubController(Controller):
+    def factory(self):
+        return CountingSMTP(self.handler, **self.SMTP_kwargs)
+
+
+def _authenticate(server, session, envelope, mechanism, auth_data):
+    return AuthResult(success=True)
+
+
+def start_server(port: int, latency: float) -> tuple[Controller, SinkHandler]:
+    handler = SinkHandler(latency)
+    controller = StubController(
+        handler,
+        hostname=HOST,
+        port=port,
+        authenticator=_authenticate,
+        auth_require_tls=False,
+    )
+    controller.start()
+    # Controller.start() opens a probe connection to check the server is up
+    handler.connections = handler.peak_connections = 0
+    return controller, handler
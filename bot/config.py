@@ -1,3 +1,5 @@
+import os
+import socket
 from functools import lru_cache
 from pathlib import Path
 from typing import List, Optional, Union
@@ -21,9 +23,41 @@ class Settings(BaseSettings):
     smtp_user: Optional[str] = Field(default=None, alias="SMTP_USER")
     smtp_password: Optional[str] = Field(default=None, alias="SMTP_PASSWORD")
     smtp_from: Optional[str] = Field(default=None, alias="SMTP_FROM")
+    smtp_start_tls: bool = Field(default=True, alias="SMTP_START_TLS")
+    smtp_pool_size: int = Field(default=2, alias="SMTP_POOL_SIZE")
+    smtp_idle_timeout: float = Field(default=60.0, alias="SMTP_IDLE_TIMEOUT")
+    email_workers: int = Field(default=2, alias="EMAIL_WORKERS")
+    email_queue_size: int = Field(default=1000, alias="EMAIL_QUEUE_SIZE")
+    email_max_attempts: int = Field(default=3, alias="EMAIL_MAX_ATTEMPTS")
+    email_batch_size: int = Field(default=1, alias="EMAIL_BATCH_SIZE")
     reminder_hours_before: int = Field(default=24, alias="REMINDER_HOURS_BEFORE")
+    reminder_stages: str = Field(default="", alias="REMINDER_STAGES")
     points_per_event: int = Field(default=10, alias="POINTS_PER_EVENT")
+    points_per_attendance: int = Field(default=0, alias="POINTS_PER_ATTENDANCE")
+    checkin_flush_seconds: float = Field(default=5.0, alias="CHECKIN_FLUSH_SECONDS")
+    checkin_batch_size: int = Field(default=50, alias="CHECKIN_BATCH_SIZE")
     timezone: str = Field(default="Europe/Moscow", alias="TIMEZONE")
+    digest_hour: int = Field(default=19, alias="DIGEST_HOUR")
+    outbox_batch_size: int = Field(default=50, alias="OUTBOX_BATCH_SIZE")
+    outbox_max_attempts: int = Field(default=8, alias="OUTBOX_MAX_ATTEMPTS")
+    outbox_poll_seconds: float = Field(default=5.0, alias="OUTBOX_POLL_SECONDS")
+    outbox_concurrency: int = Field(default=8, alias="OUTBOX_CONCURRENCY")
+    admin_alert_window_seconds: float = Field(default=0.0, alias="ADMIN_ALERT_WINDOW_SECONDS")
+    worker_id: Optional[str] = Field(default=None, alias="WORKER_ID")
+    worker_lease_seconds: int = Field(default=300, alias="WORKER_LEASE_SECONDS")
+    telegram_global_rate: float = Field(default=25.0, alias="TELEGRAM_GLOBAL_RATE")
+    telegram_chat_rate: float = Field(default=1.0, alias="TELEGRAM_CHAT_RATE")
+    telegram_chat_burst: float = Field(default=3.0, alias="TELEGRAM_CHAT_BURST")
+    series_occurrences_ahead: int = Field(default=4, alias="SERIES_OCCURRENCES_AHEAD")
+    web_base_url: Optional[str] = Field(default=None, alias="WEB_BASE_URL")
+    calendar_secret: Optional[str] = Field(default=None, alias="CALENDAR_SECRET")
+    calendar_cache_seconds: int = Field(default=300, alias="CALENDAR_CACHE_SECONDS")
+    dashboard_cache_seconds: int = Field(default=10, alias="DASHBOARD_CACHE_SECONDS")
+    api_token: Optional[str] = Field(default=None, alias="API_TOKEN")
+    api_max_page_size: int = Field(default=5000, alias="API_MAX_PAGE_SIZE")
+    stats_sample_minutes: int = Field(default=5, alias="STATS_SAMPLE_MINUTES")
+    stats_raw_retention_days: int = Field(default=2, alias="STATS_RAW_RETENTION_DAYS")
+    stats_hourly_retention_days: int = Field(default=90, alias="STATS_HOURLY_RETENTION_DAYS")
 
     model_config = SettingsConfigDict(
         env_file=str(BASE_DIR / ".env"),
@@ -47,6 +81,18 @@ class Settings(BaseSettings):
     def has_smtp_credentials(self) -> bool:
         return bool(self.smtp_host and self.smtp_user and self.smtp_password and self.smtp_from)
 
+    @property
+    def worker_name(self) -> str:
+        """Lease owner written to claimed rows; unique per process unless WORKER_ID is set."""
+        return self.worker_id or f"{socket.gethostname()}:{os.getpid()}"
+
+    @property
+    def reminder_stage_hours(self) -> List[int]:
+        """Reminder offsets in hours, earliest stage first (``REMINDER_STAGES=24h,1h``)."""
+        cleaned = [v.strip().rstrip("h") for v in self.reminder_stages.replace(";", ",").split(",")]
+        hours = {int(v) for v in cleaned if v}
+        return sorted(hours or {self.reminder_hours_before}, reverse=True)
+
 
 @lru_cache(maxsize=1)
 def get_settings() -> Settings:
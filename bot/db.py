@@ -40,6 +40,37 @@ async def _ensure_columns(conn) -> None:
         await add_column("events", "photo_file_id", "TEXT")
     if not await column_exists("users", "group_name"):
         await add_column("users", "group_name", "TEXT")
+    if not await column_exists("events", "series_id"):
+        await add_column("events", "series_id", "INTEGER REFERENCES event_series(id)")
+        await conn.exec_driver_sql(
+            "CREATE INDEX IF NOT EXISTS ix_events_series_id ON events (series_id)"
+        )
+    if not await column_exists("events", "reminder_locked_by"):
+        await add_column("events", "reminder_locked_by", "VARCHAR(64)")
+        await add_column("events", "reminder_locked_until", "DATETIME")
+    if not await column_exists("outbox", "locked_by"):
+        await add_column("outbox", "locked_by", "VARCHAR(64)")
+        await add_column("outbox", "locked_until", "DATETIME")
+    if not await column_exists("outbox", "campaign_id"):
+        await add_column("outbox", "campaign_id", "INTEGER REFERENCES campaigns(id)")
+        await conn.exec_driver_sql(
+            "CREATE INDEX IF NOT EXISTS ix_outbox_campaign ON outbox (campaign_id, status)"
+        )
+    if not await column_exists("events", "registration_notified_at"):
+        await add_column("events", "registration_notified_at", "DATETIME")
+    if not await column_exists("applications", "alert_batch"):
+        await add_column("applications", "alert_batch", "BIGINT")
+        # Applications stored before alert batches were already announced on submit
+        await conn.exec_driver_sql("UPDATE applications SET alert_batch = id")
+        await conn.exec_driver_sql(
+            "CREATE INDEX IF NOT EXISTS ix_applications_alert_batch ON applications (alert_batch)"
+        )
+    if not await column_exists("users", "notify_mode"):
+        await add_column("users", "notify_mode", "VARCHAR(9) NOT NULL DEFAULT 'IMMEDIATE'")
+    for column in ("status", "group_name", "points"):
+        await conn.exec_driver_sql(
+            f"CREATE INDEX IF NOT EXISTS ix_users_{column} ON users ({column})"
+        )
 
 
 @asynccontextmanager
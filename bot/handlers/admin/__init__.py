@@ -1,4 +1,4 @@
-from . import applications, events, exports, stats, teams, users
+from . import applications, broadcasts, events, exports, stats, teams, users
 
 admin_routers = [
     applications.router,
@@ -7,6 +7,7 @@ admin_routers = [
     events.router,
     exports.router,
     stats.router,
+    broadcasts.router,
 ]
 
 __all__ = ["admin_routers"]
@@ -2,13 +2,12 @@ from zoneinfo import ZoneInfo
 
 from aiogram import F, Router
 from aiogram.types import CallbackQuery, Message
-from aiogram import Bot
 
 from ...config import get_settings
 from ...keyboards.common import application_actions
 from ...models import ApplicationStatus
 from ...services.club import ClubService
-from ...utils.emailer import send_email_background
+from ...utils.email_templates import render_email
 
 router = Router()
 settings = get_settings()
@@ -19,6 +18,30 @@ def is_admin(user_id: int) -> bool:
     return user_id in settings.admin_ids
 
 
+async def _notify_approved(club_service: ClubService, application) -> None:
+    await club_service.enqueue_telegram(
+        application.user.telegram_id,
+        "Ваша заявка в ИТ-Клуб одобрена! Добро пожаловать!",
+    )
+    if application.user.email:
+        email = render_email("application_approved", name=application.user.full_name)
+        await club_service.enqueue_email(
+            email.subject, email.text, [application.user.email], html=email.html
+        )
+
+
+async def _notify_rejected(club_service: ClubService, application) -> None:
+    await club_service.enqueue_telegram(
+        application.user.telegram_id,
+        "К сожалению, ваша заявка в ИТ-Клуб отклонена. Вы можете подать повторно позднее.",
+    )
+    if application.user.email:
+        email = render_email("application_rejected", name=application.user.full_name)
+        await club_service.enqueue_email(
+            email.subject, email.text, [application.user.email], html=email.html
+        )
+
+
 @router.message(F.text == "Заявки")
 async def list_applications(message: Message, club_service: ClubService) -> None:
     if not is_admin(message.from_user.id):
@@ -35,18 +58,10 @@ async def list_applications(message: Message, club_service: ClubService) -> None
         )
 
 
-async def _notify_user(bot: Bot, user_id: int, text: str) -> None:
-    try:
-        await bot.send_message(user_id, text)
-    except Exception:
-        pass
-
-
 @router.callback_query(F.data.startswith("app:approve:"))
 async def approve_application(
     call: CallbackQuery,
     club_service: ClubService,
-    bot: Bot,
 ) -> None:
     if not is_admin(call.from_user.id):
         await call.answer("Только администратор может это сделать.", show_alert=True)
@@ -61,25 +76,13 @@ async def approve_application(
         return
     await club_service.approve_application(application, admin_id=call.from_user.id)
     await call.message.answer(f"Заявка #{app_id} одобрена.")
-    await _notify_user(
-        bot,
-        application.user.telegram_id,
-        "Ваша заявка в ИТ-Клуб одобрена! Добро пожаловать!",
-    )
-    if application.user.email:
-        body = (
-            "Здравствуйте!\n\n"
-            "Ваша заявка на вступление в ИТ-Клуб принята. "
-            "Ждём вас на мероприятиях!"
-        )
-        send_email_background("Принятие заявки", body, [application.user.email])
+    await _notify_approved(club_service, application)
 
 
 @router.callback_query(F.data.startswith("app:reject:"))
 async def reject_application(
     call: CallbackQuery,
     club_service: ClubService,
-    bot: Bot,
 ) -> None:
     if not is_admin(call.from_user.id):
         await call.answer("Только администратор может это сделать.", show_alert=True)
@@ -94,18 +97,38 @@ async def reject_application(
         return
     await club_service.reject_application(application, admin_id=call.from_user.id)
     await call.message.answer(f"Заявка #{app_id} отклонена.")
-    await _notify_user(
-        bot,
-        application.user.telegram_id,
-        "К сожалению, ваша заявка в ИТ-Клуб отклонена. Вы можете подать повторно позднее.",
-    )
-    if application.user.email:
-        body = (
-            "Здравствуйте!\n\n"
-            "Заявка на вступление в ИТ-Клуб отклонена. "
-            "Вы всегда можете подать её снова."
-        )
-        send_email_background("Заявка отклонена", body, [application.user.email])
+    await _notify_rejected(club_service, application)
+
+
+@router.callback_query(F.data.startswith("app:batch:"))
+async def application_batch(call: CallbackQuery, club_service: ClubService) -> None:
+    if not is_admin(call.from_user.id):
+        await call.answer("Только администратор может это сделать.", show_alert=True)
+        return
+    await call.answer()
+    _, _, action, batch = call.data.split(":")
+    applications = await club_service.list_batch_applications(int(batch))
+    if not applications:
+        await call.message.answer("Все заявки из этой подборки уже обработаны.")
+        return
+    if action == "list":
+        for app in applications:
+            await call.message.answer(
+                f"#{app.id} — {app.user.full_name}\nEmail: {app.user.email}\n"
+                f"Мотивация: {app.motivation or 'не указана'}",
+                reply_markup=application_actions(app.id),
+            )
+        return
+    for application in applications:
+        if action == "approve":
+            await club_service.approve_application(application, admin_id=call.from_user.id)
+            await _notify_approved(club_service, application)
+        else:
+            await club_service.reject_application(application, admin_id=call.from_user.id)
+            await _notify_rejected(club_service, application)
+    verb = "одобрено" if action == "approve" else "отклонено"
+    await call.message.edit_reply_markup(reply_markup=None)
+    await call.message.answer(f"Заявок {verb}: {len(applications)}.")
 
 
 @router.message(F.text.startswith("История заявки"))
@@ -0,0 +1,99 @@
+from aiogram import F, Router
+from aiogram.fsm.context import FSMContext
+from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, Message
+
+from ...config import get_settings
+from ...services.campaigns import describe_segment, parse_segment, progress_text
+from ...services.club import ClubService
+from ...utils.states import BroadcastState
+
+router = Router()
+settings = get_settings()
+
+
+def is_admin(user_id: int) -> bool:
+    return user_id in settings.admin_ids
+
+
+@router.message(F.text == "Рассылка")
+async def admin_broadcast_help(message: Message) -> None:
+    if not is_admin(message.from_user.id):
+        return
+    await message.answer(
+        "Рассылка активным участникам клуба.\n"
+        "Формат: 'Рассылка все' или 'Рассылка <условия>', условия через ';':\n"
+        "группа ИВТ-21, команда <ID>, мероприятие <ID>, баллы <минимум>.\n"
+        "Например: 'Рассылка группа ИВТ-21; баллы 50'."
+    )
+
+
+@router.message(F.text.startswith("Рассылка "))
+async def admin_broadcast_segment(message: Message, state: FSMContext, club_service: ClubService) -> None:
+    if not is_admin(message.from_user.id):
+        return
+    try:
+        segment = parse_segment(message.text.split(" ", 1)[1])
+    except ValueError as exc:
+        await message.answer(str(exc))
+        return
+    total = await club_service.count_segment(segment)
+    if total == 0:
+        await message.answer(f"Получателей нет: {describe_segment(segment)}.")
+        return
+    await state.set_state(BroadcastState.text)
+    await state.update_data(segment=segment, total=total)
+    await message.answer(
+        f"Получатели: {describe_segment(segment)} — {total}.\n"
+        "Отправьте текст сообщения. /cancel — отменить."
+    )
+
+
+@router.message(BroadcastState.text)
+async def admin_broadcast_text(message: Message, state: FSMContext) -> None:
+    if message.text and message.text.lower() == "/cancel":
+        await state.clear()
+        await message.answer("Рассылка отменена.")
+        return
+    if not message.text:
+        await message.answer("Нужен текст сообщения.")
+        return
+    data = await state.get_data()
+    await state.update_data(text=message.html_text)
+    await state.set_state(BroadcastState.confirm)
+    markup = InlineKeyboardMarkup(
+        inline_keyboard=[
+            [
+                InlineKeyboardButton(text="Отправить", callback_data="admin:broadcast:send"),
+                InlineKeyboardButton(text="Отмена", callback_data="admin:broadcast:cancel"),
+            ]
+        ]
+    )
+    await message.answer(
+        f"Отправить сообщение {data['total']} получателям ({describe_segment(data['segment'])})?",
+        reply_markup=markup,
+    )
+
+
+@router.callback_query(BroadcastState.confirm, F.data == "admin:broadcast:cancel")
+async def admin_broadcast_cancel(call: CallbackQuery, state: FSMContext) -> None:
+    await call.answer()
+    await state.clear()
+    await call.message.edit_text("Рассылка отменена.")
+
+
+@router.callback_query(BroadcastState.confirm, F.data == "admin:broadcast:send")
+async def admin_broadcast_send(call: CallbackQuery, state: FSMContext, club_service: ClubService) -> None:
+    await call.answer()
+    if not is_admin(call.from_user.id):
+        return
+    data = await state.get_data()
+    await state.clear()
+    # The confirmation message becomes the live progress report
+    campaign = await club_service.create_campaign(
+        data["text"],
+        data["segment"],
+        admin_chat_id=call.message.chat.id,
+        status_message_id=call.message.message_id,
+    )
+    progress = await club_service.campaign_progress([campaign.id])
+    await call.message.edit_text(progress_text(campaign, progress[campaign.id]))
@@ -2,13 +2,15 @@ import json
 from datetime import datetime, timezone
 from zoneinfo import ZoneInfo
 
-from aiogram import F, Router
+from aiogram import Bot, F, Router
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, Message
+from aiogram.utils.deep_linking import create_start_link
 
 from ...config import get_settings
+from ...services.checkin import start_checkin, stop_checkin
 from ...services.club import ClubService
-from ...utils.states import EventCreateState, EventPhotoState
+from ...utils.states import CheckInState, EventCreateState, EventPhotoState
 from ...keyboards.common import event_template_keyboard
 
 router = Router()
@@ -27,6 +29,9 @@ EVENT_TEMPLATES = {
 }
 
 
+ROSTER_PER_PAGE = 20
+
+
 def is_admin(user_id: int) -> bool:
     return user_id in settings.admin_ids
 
@@ -201,7 +206,12 @@ async def event_set_end(message: Message, state: FSMContext) -> None:
             return
         await state.update_data(end_at=dt)
     await state.set_state(EventCreateState.capacity)
-    await message.answer("Введите вместимость (число) или /skip для неограниченной:")
+    if data.get("mode") == "edit":
+        await message.answer(
+            "Введите вместимость (число), /skip чтобы оставить текущую или /unlimited для неограниченной:"
+        )
+    else:
+        await message.answer("Введите вместимость (число) или /skip для неограниченной:")
 
 
 @router.message(EventCreateState.capacity)
@@ -209,6 +219,8 @@ async def event_set_capacity(message: Message, state: FSMContext, club_service:
     data = await state.get_data()
     if message.text == "/skip" and data.get("mode") == "edit":
         capacity = data["original"]["capacity"]
+    elif message.text == "/unlimited":
+        capacity = None
     elif message.text != "/skip":
         if not message.text.isdigit():
             await message.answer("Введите число или /skip.")
@@ -232,6 +244,8 @@ async def event_set_capacity(message: Message, state: FSMContext, club_service:
                 admin_id=message.from_user.id,
             )
             await message.answer("Мероприятие обновлено.")
+            if event.series_id:
+                await _propagate_to_series(message, club_service, event.series_id, data, capacity)
         else:
             await club_service.create_event(
                 title=data.get("title"),
@@ -252,6 +266,73 @@ async def event_set_capacity(message: Message, state: FSMContext, club_service:
     await state.clear()
 
 
+async def _propagate_to_series(
+    message: Message,
+    club_service: ClubService,
+    series_id: int,
+    data: dict,
+    capacity,
+) -> None:
+    series = await club_service.get_series(series_id)
+    if not series:
+        return
+    original = data.get("original", {})
+    changed = {
+        field: data.get(field)
+        for field in ("title", "description", "location")
+        if data.get(field) != original.get(field)
+    }
+    if capacity != original.get("capacity"):
+        changed["capacity"] = capacity
+    if not changed:
+        return
+    updated = await club_service.update_event_series(series, changed)
+    await message.answer(f"Изменения применены к серии #{series.id} (будущих мероприятий: {updated}).")
+
+
+@router.message(F.text.startswith("Серия мероприятия"))
+async def event_series_create(message: Message, club_service: ClubService) -> None:
+    if not is_admin(message.from_user.id):
+        return
+    parts = message.text.split()
+    if len(parts) < 3 or not all(part.isdigit() for part in parts[2:5]):
+        await message.answer("Формат: Серия мероприятия <id> [интервал в днях] [сколько вперёд]")
+        return
+    event = await club_service.get_event(int(parts[2]))
+    if not event:
+        await message.answer("Мероприятие не найдено.")
+        return
+    interval_days = int(parts[3]) if len(parts) > 3 else 7
+    ahead = int(parts[4]) if len(parts) > 4 else None
+    try:
+        series = await club_service.create_series_from_event(
+            event, interval_days=interval_days, occurrences_ahead=ahead
+        )
+    except ValueError as exc:
+        await message.answer(str(exc))
+        return
+    await message.answer(
+        f"Серия #{series.id} создана: повтор каждые {series.interval_days} дн., "
+        f"заранее создаётся {series.occurrences_ahead} мероприятий."
+    )
+
+
+@router.message(F.text.startswith("Остановить серию"))
+async def event_series_stop(message: Message, club_service: ClubService) -> None:
+    if not is_admin(message.from_user.id):
+        return
+    parts = message.text.split()
+    if len(parts) < 3 or not parts[2].isdigit():
+        await message.answer("Формат: Остановить серию <id>")
+        return
+    series = await club_service.get_series(int(parts[2]))
+    if not series:
+        await message.answer("Серия не найдена.")
+        return
+    await club_service.stop_series(series)
+    await message.answer("Серия остановлена. Уже созданные мероприятия сохранены.")
+
+
 @router.message(F.text.startswith("История мероприятия"))
 async def event_history(message: Message, club_service: ClubService) -> None:
     if not is_admin(message.from_user.id):
@@ -336,7 +417,7 @@ async def event_delete(message: Message, club_service: ClubService) -> None:
 
 
 @router.callback_query(F.data.startswith("admin:event:view:"))
-async def admin_event_view(call: CallbackQuery, club_service: ClubService) -> None:
+async def admin_event_view(call: CallbackQuery, club_service: ClubService, bot: Bot) -> None:
     await call.answer()
     if not is_admin(call.from_user.id):
         return
@@ -353,14 +434,23 @@ async def admin_event_view(call: CallbackQuery, club_service: ClubService) -> No
         f"Вместимость: {event.capacity or 'без ограничений'}\n"
         f"Описание: {event.description or '—'}"
     )
-    actions = InlineKeyboardMarkup(
-        inline_keyboard=[
-            [InlineKeyboardButton(text="Редактировать", callback_data=f"admin:event:edit:{event.id}")],
-            [InlineKeyboardButton(text="Удалить", callback_data=f"admin:event:delete:{event.id}")],
-            [InlineKeyboardButton(text="Фото", callback_data=f"admin:event:photo:{event.id}")],
-            [InlineKeyboardButton(text="История", callback_data=f"admin:event:history:{event.id}")],
-        ]
-    )
+    if event.series_id:
+        text += f"\nСерия: #{event.series_id}"
+    text += f"\nСсылка для записи: {await create_start_link(bot, f'ev_{event.id}')}"
+    rows = [
+        [InlineKeyboardButton(text="Редактировать", callback_data=f"admin:event:edit:{event.id}")],
+        [InlineKeyboardButton(text="Удалить", callback_data=f"admin:event:delete:{event.id}")],
+        [InlineKeyboardButton(text="Фото", callback_data=f"admin:event:photo:{event.id}")],
+        [InlineKeyboardButton(text="История", callback_data=f"admin:event:history:{event.id}")],
+        [InlineKeyboardButton(text="Участники", callback_data=f"admin:event:roster:{event.id}")],
+        [InlineKeyboardButton(text="Экспорт участников", callback_data=f"admin:event:export:{event.id}")],
+        [InlineKeyboardButton(text="Отметка участников", callback_data=f"admin:event:checkin:{event.id}")],
+    ]
+    if not event.series_id:
+        rows.append(
+            [InlineKeyboardButton(text="Повторять еженедельно", callback_data=f"admin:event:series:{event.id}")]
+        )
+    actions = InlineKeyboardMarkup(inline_keyboard=rows)
     if event.photo_file_id:
         await call.message.answer_photo(event.photo_file_id, caption=text, reply_markup=actions)
     else:
@@ -381,6 +471,120 @@ async def admin_event_delete(call: CallbackQuery, club_service: ClubService) ->
     await call.message.answer("Мероприятие удалено.")
 
 
+@router.callback_query(F.data.startswith("admin:event:series:"))
+async def admin_event_series(call: CallbackQuery, club_service: ClubService) -> None:
+    await call.answer()
+    if not is_admin(call.from_user.id):
+        return
+    event_id = int(call.data.split(":")[-1])
+    event = await club_service.get_event(event_id)
+    if not event:
+        await call.message.answer("Мероприятие не найдено.")
+        return
+    try:
+        series = await club_service.create_series_from_event(event, interval_days=7)
+    except ValueError as exc:
+        await call.message.answer(str(exc))
+        return
+    await call.message.answer(
+        f"Серия #{series.id} создана: мероприятие будет повторяться каждую неделю."
+    )
+
+
+async def _roster_page(
+    club_service: ClubService,
+    event_id: int,
+    *,
+    after_id=None,
+    before_id=None,
+) -> tuple[str, InlineKeyboardMarkup]:
+    rows, has_prev, has_next = await club_service.list_event_participants(
+        event_id, after_id=after_id, before_id=before_id, limit=ROSTER_PER_PAGE
+    )
+    total = await club_service.count_event_registrations(event_id)
+    lines = [f"Участники мероприятия #{event_id} (всего {total}):"]
+    for row in rows:
+        mark = "✅" if row.attended else "•"
+        name = f"{row.full_name} (@{row.username})" if row.username else row.full_name
+        lines.append(f"{mark} {name}")
+    if not rows:
+        lines.append("(пока пусто)")
+    nav_row = []
+    if rows and has_prev:
+        nav_row.append(
+            InlineKeyboardButton(text="⬅", callback_data=f"admin:event:rpage:{event_id}:p:{rows[0].id}")
+        )
+    if rows and has_next:
+        nav_row.append(
+            InlineKeyboardButton(text="➡", callback_data=f"admin:event:rpage:{event_id}:n:{rows[-1].id}")
+        )
+    return "\n".join(lines), InlineKeyboardMarkup(inline_keyboard=[nav_row] if nav_row else [])
+
+
+@router.callback_query(F.data.startswith("admin:event:roster:"))
+async def admin_event_roster(call: CallbackQuery, club_service: ClubService) -> None:
+    await call.answer()
+    if not is_admin(call.from_user.id):
+        return
+    event_id = int(call.data.split(":")[-1])
+    text, markup = await _roster_page(club_service, event_id)
+    await call.message.answer(text, reply_markup=markup)
+
+
+@router.callback_query(F.data.startswith("admin:event:rpage:"))
+async def admin_event_roster_page(call: CallbackQuery, club_service: ClubService) -> None:
+    await call.answer()
+    if not is_admin(call.from_user.id):
+        return
+    _, _, _, event_id, direction, cursor = call.data.split(":")
+    if direction == "p":
+        text, markup = await _roster_page(club_service, int(event_id), before_id=int(cursor))
+    else:
+        text, markup = await _roster_page(club_service, int(event_id), after_id=int(cursor))
+    await call.message.edit_text(text, reply_markup=markup)
+
+
+@router.callback_query(F.data.startswith("admin:event:checkin:"))
+async def admin_event_checkin(call: CallbackQuery, state: FSMContext) -> None:
+    await call.answer()
+    if not is_admin(call.from_user.id):
+        return
+    event_id = int(call.data.split(":")[-1])
+    session = await start_checkin(event_id)
+    await state.set_state(CheckInState.scanning)
+    await state.update_data(event_id=event_id)
+    await call.message.answer(
+        f"Отметка на мероприятие #{event_id} запущена: в списке {session.total}, "
+        f"уже отмечено {session.checked_in}.\n"
+        "Отправляйте коды участников или их Telegram ID. /stop — завершить."
+    )
+
+
+@router.message(CheckInState.scanning)
+async def admin_event_checkin_scan(message: Message, state: FSMContext) -> None:
+    data = await state.get_data()
+    event_id = data.get("event_id")
+    if message.text and message.text.lower() == "/stop":
+        session = await stop_checkin(event_id)
+        await state.clear()
+        if session:
+            await message.answer(
+                f"Отметка завершена: пришли {session.checked_in} из {session.total}."
+            )
+        else:
+            await message.answer("Отметка завершена.")
+        return
+    session = await start_checkin(event_id)
+    for value in (message.text or "").split():
+        status, attendee = session.scan(value)
+        if status == "ok":
+            await message.answer(f"✅ {attendee.full_name} ({session.checked_in}/{session.total})")
+        elif status == "duplicate":
+            await message.answer(f"⚠️ {attendee.full_name} уже отмечен(а)")
+        else:
+            await message.answer(f"❌ Код {value} не найден среди записавшихся")
+
+
 @router.callback_query(F.data.startswith("admin:event:photo:"))
 async def admin_event_photo(call: CallbackQuery, state: FSMContext, club_service: ClubService) -> None:
     await call.answer()
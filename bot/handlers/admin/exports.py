@@ -1,7 +1,7 @@
 from pathlib import Path
 
 from aiogram import F, Router
-from aiogram.types import FSInputFile, Message
+from aiogram.types import CallbackQuery, FSInputFile, Message
 from aiogram import Bot
 
 from ...config import get_settings
@@ -28,3 +28,20 @@ async def export_data(message: Message, club_service: ClubService, bot: Bot) ->
     await message.answer("Подготовлены файлы, отправляю...")
     for path in [users_csv, teams_csv, users_xlsx, teams_xlsx]:
         await bot.send_document(message.from_user.id, FSInputFile(path))
+
+
+@router.callback_query(F.data.startswith("admin:event:export:"))
+async def export_event_participants(call: CallbackQuery, club_service: ClubService, bot: Bot) -> None:
+    await call.answer()
+    if not is_admin(call.from_user.id):
+        return
+    event_id = int(call.data.split(":")[-1])
+    EXPORT_DIR.mkdir(exist_ok=True)
+    csv_path = await club_service.export_event_participants_csv(
+        event_id, EXPORT_DIR / f"event_{event_id}.csv"
+    )
+    xlsx_path = await club_service.export_event_participants_xlsx(
+        event_id, EXPORT_DIR / f"event_{event_id}.xlsx"
+    )
+    for path in [csv_path, xlsx_path]:
+        await bot.send_document(call.from_user.id, FSInputFile(path))
@@ -17,6 +17,7 @@ async def show_stats(message: Message, club_service: ClubService) -> None:
     if not is_admin(message.from_user.id):
         return
     stats = await club_service.get_statistics()
+    outbox = await club_service.outbox_stats()
     await message.answer(
         "Статистика клуба:\n"
         f"Пользователей всего: {stats['users_total']}\n"
@@ -26,4 +27,6 @@ async def show_stats(message: Message, club_service: ClubService) -> None:
         f"Всего мероприятий: {stats['events_total']}\n"
         f"Ближайших мероприятий: {stats['upcoming_events']}\n"
         f"Регистраций на мероприятия: {stats['event_registrations']}\n"
+        f"Уведомлений в очереди: {outbox['pending']}\n"
+        f"Недоставленных уведомлений: {outbox['dead']}\n"
     )
@@ -1,5 +1,6 @@
-from aiogram import F, Router
+from aiogram import Bot, F, Router
 from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup, Message
+from aiogram.utils.deep_linking import create_start_link
 
 from ...config import get_settings
 from ...services.club import ClubService
@@ -69,7 +70,7 @@ async def admin_remove_member(message: Message, club_service: ClubService) -> No
 
 
 @router.callback_query(F.data.startswith("admin:team:view:"))
-async def admin_team_view(call: CallbackQuery, club_service: ClubService) -> None:
+async def admin_team_view(call: CallbackQuery, club_service: ClubService, bot: Bot) -> None:
     await call.answer()
     if not is_admin(call.from_user.id):
         return
@@ -88,7 +89,8 @@ async def admin_team_view(call: CallbackQuery, club_service: ClubService) -> Non
         f"#{team.id} {team.name}\n"
         f"Капитан: {team.owner.full_name}\n"
         f"Тип: {'Постоянная' if team.is_permanent else 'Временная'}\n"
-        f"Участники:\n{members}\n\n"
+        f"Участники:\n{members}\n"
+        f"Ссылка для вступления: {await create_start_link(bot, f'team_{team.id}')}\n\n"
         "Команды чата:\n"
         "• Удалить команду ID\n"
         "• Исключить ID_команды ID_участника"
@@ -1,13 +1,87 @@
+from zoneinfo import ZoneInfo
+
 from aiogram import Router
-from aiogram.filters import CommandStart
+from aiogram.filters import CommandObject, CommandStart
 from aiogram.types import Message
 
 from ..config import get_settings
-from ..keyboards.common import admin_menu, main_menu
+from ..keyboards.common import (
+    admin_menu,
+    event_actions,
+    event_signup_confirm,
+    main_menu,
+    team_join_confirm,
+)
+from ..models import MembershipStatus, RegistrationStatus, User
 from ..services.club import ClubService
 
 router = Router()
 settings = get_settings()
+_tz = ZoneInfo(settings.timezone)
+
+
+@router.message(CommandStart(deep_link=True))
+async def cmd_start_deep_link(
+    message: Message,
+    command: CommandObject,
+    club_service: ClubService,
+) -> None:
+    user = await club_service.ensure_user(
+        telegram_id=message.from_user.id,
+        username=message.from_user.username,
+        full_name=message.from_user.full_name,
+    )
+    kind, _, raw_id = (command.args or "").partition("_")
+    if not raw_id.isdigit() or kind not in {"ev", "team"}:
+        await cmd_start(message, club_service)
+        return
+    if user.status != MembershipStatus.ACTIVE:
+        await message.answer(
+            "Записываться и вступать в команды могут только участники клуба. "
+            "Подайте заявку через меню.",
+            reply_markup=main_menu(is_member=False),
+        )
+        return
+    if kind == "ev":
+        await _event_signup(message, club_service, user, int(raw_id))
+    else:
+        await _team_join(message, club_service, user, int(raw_id))
+
+
+async def _event_signup(message: Message, club_service: ClubService, user: User, event_id: int) -> None:
+    event = await club_service.get_event_brief(event_id)
+    if not event:
+        await message.answer("Мероприятие не найдено.")
+        return
+    start = event.start_at.astimezone(_tz).strftime("%d.%m %H:%M")
+    lines = [event.title, f"Начало: {start}", f"Локация: {event.location or 'не указана'}"]
+    if event.capacity is not None:
+        taken = await club_service.count_event_registrations(event.id)
+        lines.append(f"Свободных мест: {max(event.capacity - taken, 0)}")
+    registration = await club_service.get_registration(event.id, user.id)
+    if registration and registration.status == RegistrationStatus.REGISTERED:
+        lines.append("Вы уже записаны.")
+        markup = event_actions(event.id, registered=True)
+    else:
+        markup = event_signup_confirm(event.id)
+    await message.answer("\n".join(lines), reply_markup=markup)
+
+
+async def _team_join(message: Message, club_service: ClubService, user: User, team_id: int) -> None:
+    team = await club_service.get_team_brief(team_id)
+    if not team:
+        await message.answer("Команда не найдена.")
+        return
+    members = await club_service.count_team_members(team.id)
+    text = (
+        f"Команда: {team.name}\n"
+        f"Капитан: {team.owner.full_name}\n"
+        f"Участников: {members}"
+    )
+    if team.owner_id == user.id:
+        await message.answer(text + "\nВы капитан этой команды.")
+        return
+    await message.answer(text, reply_markup=team_join_confirm(team.id))
 
 
 @router.message(CommandStart())
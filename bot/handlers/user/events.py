@@ -1,13 +1,16 @@
+from datetime import datetime
+from typing import Optional
 from zoneinfo import ZoneInfo
 
 from aiogram import F, Router
 from aiogram.types import CallbackQuery, Message
 
 from ...config import get_settings
-from ...keyboards.common import event_actions
+from ...keyboards.common import event_actions, event_subscription_toggle
 from ...models import MembershipStatus, RegistrationStatus
-from ...services.club import ClubService
-from ...utils.emailer import send_email_background
+from ...services.checkin import checkin_code
+from ...services.club import ClubService, naive_utc
+from ...utils.email_templates import render_email
 
 router = Router()
 settings = get_settings()
@@ -28,9 +31,14 @@ def format_event(event) -> str:
     )
 
 
-async def send_event_card(message: Message, event, registered: bool) -> None:
+async def send_event_card(
+    message: Message,
+    event,
+    registered: bool,
+    subscribed: Optional[bool] = None,
+) -> None:
     caption = format_event(event)
-    markup = event_actions(event.id, registered)
+    markup = event_actions(event.id, registered, subscribed)
     if event.photo_file_id:
         await message.answer_photo(event.photo_file_id, caption=caption, reply_markup=markup)
     else:
@@ -40,20 +48,32 @@ async def send_event_card(message: Message, event, registered: bool) -> None:
 @router.message(F.text == "Мероприятия")
 async def list_events(message: Message, club_service: ClubService) -> None:
     events = await club_service.list_events(only_open=False)
-    if not events:
-        await message.answer("Пока нет мероприятий.")
-        return
     user = await club_service.ensure_user(
         telegram_id=message.from_user.id,
         username=message.from_user.username,
         full_name=message.from_user.full_name,
     )
+    subscriptions = await club_service.list_user_subscriptions(user.id)
+    if not events:
+        await message.answer(
+            "Пока нет мероприятий.",
+            reply_markup=event_subscription_toggle(None in subscriptions),
+        )
+        return
+    now = datetime.utcnow()
     for event in events:
         registered = any(
             r.user_id == user.id and r.status == RegistrationStatus.REGISTERED
             for r in event.registrations
         )
-        await send_event_card(message, event, registered)
+        subscribed = None
+        if naive_utc(event.registration_start) > now:
+            subscribed = event.id in subscriptions
+        await send_event_card(message, event, registered, subscribed)
+    await message.answer(
+        "Хотите узнавать об открытии регистрации?",
+        reply_markup=event_subscription_toggle(None in subscriptions),
+    )
 
 
 @router.callback_query(F.data.startswith("event:info:"))
@@ -88,7 +108,7 @@ async def event_photo_view(call: CallbackQuery, club_service: ClubService) -> No
 async def event_join(call: CallbackQuery, club_service: ClubService) -> None:
     await call.answer()
     event_id = int(call.data.split(":")[2])
-    event = await club_service.get_event(event_id)
+    event = await club_service.get_event_brief(event_id)
     if not event:
         await call.message.answer("Мероприятие не найдено.")
         return
@@ -97,19 +117,19 @@ async def event_join(call: CallbackQuery, club_service: ClubService) -> None:
         await call.message.answer("Записываться могут только участники клуба.")
         return
     try:
-        await club_service.register_for_event(event, user)
-        await call.message.answer("Вы зарегистрированы на мероприятие! Мы начислили вам баллы.")
+        registration = await club_service.register_for_event(event, user)
+        await call.message.answer(
+            "Вы зарегистрированы на мероприятие! Мы начислили вам баллы.\n"
+            f"Код для отметки на входе: {checkin_code(registration.id)}"
+        )
         if user.email:
-            start_local = event.start_at.astimezone(_tz).strftime("%d.%m %H:%M")
-            send_email_background(
-                f"Регистрация на мероприятие: {event.title}",
-                (
-                    f"Вы зарегистрированы на '{event.title}'.\n"
-                    f"Начало: {start_local}.\n"
-                    "До встречи!"
-                ),
-                [user.email],
+            email = render_email(
+                "event_registered",
+                name=user.full_name,
+                title=event.title,
+                start=event.start_at.astimezone(_tz).strftime("%d.%m %H:%M"),
             )
+            await club_service.enqueue_email(email.subject, email.text, [user.email], html=email.html)
     except ValueError as exc:
         await call.message.answer(str(exc))
 
@@ -130,13 +150,29 @@ async def event_cancel(call: CallbackQuery, club_service: ClubService) -> None:
         await club_service.cancel_registration(event, user)
         await call.message.answer("Регистрация отменена.")
         if user.email:
-            send_email_background(
-                f"Отмена участия: {event.title}",
-                (
-                    f"Вы отменили участие в '{event.title}'.\n"
-                    "Если передумаете, вы всегда можете зарегистрироваться снова!"
-                ),
-                [user.email],
-            )
+            email = render_email("event_cancelled", name=user.full_name, title=event.title)
+            await club_service.enqueue_email(email.subject, email.text, [user.email], html=email.html)
     except ValueError as exc:
         await call.message.answer(str(exc))
+
+
+@router.callback_query(F.data.startswith("event:subscribe:") | F.data.startswith("event:unsubscribe:"))
+async def event_subscription(call: CallbackQuery, club_service: ClubService) -> None:
+    _, action, target = call.data.split(":")
+    user = await club_service.get_user(call.from_user.id)
+    if not user:
+        await call.answer("Сначала подайте заявку в клуб.")
+        return
+    event_id = None if target == "all" else int(target)
+    if action == "subscribe":
+        await club_service.subscribe_to_event(user.id, event_id)
+        await call.answer("Пришлём сообщение, когда откроется регистрация.")
+    else:
+        await club_service.unsubscribe_from_event(user.id, event_id)
+        await call.answer("Подписка отключена.")
+    subscribed = action == "subscribe"
+    if event_id is None:
+        markup = event_subscription_toggle(subscribed)
+    else:
+        markup = event_actions(event_id, registered=False, subscribed=subscribed)
+    await call.message.edit_reply_markup(reply_markup=markup)
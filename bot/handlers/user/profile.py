@@ -3,12 +3,16 @@ from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, Message
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
+from ...config import get_settings
 from ...keyboards.common import main_menu
-from ...models import ApplicationStatus
+from ...models import ApplicationStatus, NotifyMode
+from ...services.calendar import calendar_url
+from ...services.checkin import checkin_code
 from ...services.club import ClubService
 from ...utils.states import ProfileEditState, ProfilePhotoState
 
 router = Router()
+settings = get_settings()
 
 
 def profile_keyboard() -> InlineKeyboardBuilder:
@@ -17,6 +21,22 @@ def profile_keyboard() -> InlineKeyboardBuilder:
     builder.button(text="Мои мероприятия", callback_data="profile:events")
     builder.button(text="Мои заявки", callback_data="profile:applications")
     builder.button(text="Обновить фото", callback_data="profile:photo")
+    builder.button(text="Уведомления", callback_data="profile:notify")
+    return builder
+
+
+NOTIFY_MODE_LABELS = {
+    NotifyMode.IMMEDIATE: "сразу",
+    NotifyMode.DIGEST: "ежедневный дайджест",
+}
+
+
+def notify_mode_keyboard(current: NotifyMode) -> InlineKeyboardBuilder:
+    builder = InlineKeyboardBuilder()
+    for mode, label in NOTIFY_MODE_LABELS.items():
+        mark = "✅ " if mode == current else ""
+        builder.button(text=f"{mark}{label.capitalize()}", callback_data=f"profile:notify:{mode.value}")
+    builder.adjust(1)
     return builder
 
 
@@ -36,6 +56,7 @@ async def view_profile(message: Message, club_service: ClubService) -> None:
         f"Группа: {user.group_name or 'не указана'}\n"
         f"Статус: {user.status.value}\n"
         f"Баллы: {user.points}\n"
+        f"Уведомления: {NOTIFY_MODE_LABELS[user.notify_mode]}\n"
     )
     if user.photo_file_id:
         await message.answer_photo(
@@ -129,14 +150,23 @@ async def edit_group(message: Message, state: FSMContext, club_service: ClubServ
 @router.callback_query(F.data == "profile:events")
 async def profile_events(call: CallbackQuery, club_service: ClubService) -> None:
     await call.answer()
-    registrations = await club_service.list_user_registrations(call.from_user.id)
+    user = await club_service.get_user(call.from_user.id)
+    registrations = await club_service.list_user_registrations(user.id) if user else []
     if not registrations:
         await call.message.answer("Вы пока не записаны ни на одно мероприятие.")
         return
     lines = ["Ваши регистрации:"]
     for reg in registrations:
-        status = "✅" if reg.status == reg.status.REGISTERED else "❌"
-        lines.append(f"{status} {reg.event.title} — {reg.event.start_at:%d.%m %H:%M}")
+        if reg.status == reg.status.REGISTERED:
+            lines.append(
+                f"✅ {reg.event.title} — {reg.event.start_at:%d.%m %H:%M} "
+                f"(код: {checkin_code(reg.id)})"
+            )
+        else:
+            lines.append(f"❌ {reg.event.title} — {reg.event.start_at:%d.%m %H:%M}")
+    feed_url = calendar_url(user.id)
+    if feed_url:
+        lines.append(f"\nПодписка на календарь: {feed_url}")
     await call.message.answer("\n".join(lines))
 
 
@@ -159,6 +189,33 @@ async def profile_applications(call: CallbackQuery, club_service: ClubService) -
     await call.message.answer(text)
 
 
+@router.callback_query(F.data == "profile:notify")
+async def profile_notify(call: CallbackQuery, club_service: ClubService) -> None:
+    await call.answer()
+    user = await club_service.get_user(call.from_user.id)
+    if not user:
+        await call.message.answer("Сначала подайте заявку.")
+        return
+    await call.message.answer(
+        "Как присылать напоминания и новости клуба?\n"
+        f"В режиме дайджеста они собираются в одно сообщение в {settings.digest_hour}:00. "
+        "Ответы на ваши действия и решения по заявкам приходят сразу.",
+        reply_markup=notify_mode_keyboard(user.notify_mode).as_markup(),
+    )
+
+
+@router.callback_query(F.data.startswith("profile:notify:"))
+async def profile_notify_set(call: CallbackQuery, club_service: ClubService) -> None:
+    user = await club_service.get_user(call.from_user.id)
+    if not user:
+        await call.answer()
+        return
+    mode = NotifyMode(call.data.split(":")[-1])
+    await club_service.set_notify_mode(user, mode)
+    await call.answer(f"Уведомления: {NOTIFY_MODE_LABELS[mode]}")
+    await call.message.edit_reply_markup(reply_markup=notify_mode_keyboard(mode).as_markup())
+
+
 @router.callback_query(F.data == "profile:photo")
 async def profile_photo_prompt(call: CallbackQuery, state: FSMContext) -> None:
     await call.answer()
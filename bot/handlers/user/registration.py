@@ -1,12 +1,11 @@
 from aiogram import F, Router
 from aiogram.fsm.context import FSMContext
 from aiogram.types import Message
-from aiogram import Bot
 
 from ...config import get_settings
-from ...keyboards.common import application_actions, main_menu
+from ...keyboards.common import main_menu
 from ...services.club import ClubService
-from ...utils.emailer import send_email_background
+from ...utils.email_templates import render_email
 from ...utils.states import RegistrationState
 
 router = Router()
@@ -83,7 +82,6 @@ async def registration_finish(
     message: Message,
     state: FSMContext,
     club_service: ClubService,
-    bot: Bot,
 ) -> None:
     data = await state.get_data()
     user = await club_service.ensure_user(
@@ -105,27 +103,17 @@ async def registration_finish(
         reply_markup=main_menu(is_member=False),
     )
 
-    subject = "Новая заявка в ИТ-Клуб"
-    body = (
-        f"Поступила новая заявка от {user.full_name} (@{user.username or 'нет username'}).\n"
-        f"Email: {user.email}\n"
-        f"Телефон: {user.phone or 'не указан'}\n"
-        f"Группа: {user.group_name or 'не указана'}\n"
-        f"Мотивация: {application.motivation or 'не указана'}\n"
+    email = render_email(
+        "application_new",
+        full_name=user.full_name,
+        username=user.username,
+        email=user.email,
+        phone=user.phone,
+        group_name=user.group_name,
+        motivation=application.motivation,
     )
-    if settings.has_smtp_credentials:
-        send_email_background(subject, body, [settings.smtp_from])
-
-    for admin_id in settings.admin_ids:
-        try:
-            await bot.send_message(
-                admin_id,
-                body,
-                reply_markup=application_actions(application.id),
-            )
-        except Exception:
-            # Ignore delivery issues to keep user flow smooth
-            continue
+    await club_service.enqueue_email(email.subject, email.text, [settings.smtp_from], html=email.html)
+    # Admins are alerted in Telegram by the admin alert worker, which can merge a rush into one message
 
 
 @router.message(F.text == "Выйти из клуба")
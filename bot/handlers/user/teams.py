@@ -189,7 +189,7 @@ async def team_view(call: CallbackQuery, club_service: ClubService) -> None:
 async def team_join(call: CallbackQuery, club_service: ClubService) -> None:
     await call.answer()
     team_id = int(call.data.split(":")[2])
-    team = await club_service.get_team(team_id)
+    team = await club_service.get_team_brief(team_id)
     if not team:
         await call.message.answer("Команда не найдена.")
         return
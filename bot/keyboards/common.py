@@ -1,3 +1,5 @@
+from typing import Optional
+
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup, KeyboardButton, ReplyKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder, ReplyKeyboardBuilder
 
@@ -24,7 +26,8 @@ def admin_menu() -> ReplyKeyboardMarkup:
     builder.button(text="Мероприятия (админ)")
     builder.button(text="Экспорт данных")
     builder.button(text="Статистика")
-    builder.adjust(2, 2, 2)
+    builder.button(text="Рассылка")
+    builder.adjust(2, 2, 2, 1)
     return builder.as_markup(resize_keyboard=True, input_field_placeholder="Панель администратора")
 
 
@@ -36,6 +39,15 @@ def application_actions(app_id: int) -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
+def application_batch_actions(batch: int, count: int) -> InlineKeyboardMarkup:
+    builder = InlineKeyboardBuilder()
+    builder.button(text=f"Принять все ({count})", callback_data=f"app:batch:approve:{batch}")
+    builder.button(text="Отклонить все", callback_data=f"app:batch:reject:{batch}")
+    builder.button(text="Показать по одной", callback_data=f"app:batch:list:{batch}")
+    builder.adjust(2, 1)
+    return builder.as_markup()
+
+
 def team_actions(team_id: int, is_owner: bool) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     builder.button(text="Состав", callback_data=f"team:view:{team_id}")
@@ -50,18 +62,44 @@ def team_actions(team_id: int, is_owner: bool) -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
-def event_actions(event_id: int, registered: bool) -> InlineKeyboardMarkup:
+def event_actions(event_id: int, registered: bool, subscribed: Optional[bool] = None) -> InlineKeyboardMarkup:
+    """``subscribed`` is set only while registration has not opened yet."""
     builder = InlineKeyboardBuilder()
     if registered:
         builder.button(text="Отменить участие", callback_data=f"event:cancel:{event_id}")
-    else:
+    elif subscribed is None:
         builder.button(text="Записаться", callback_data=f"event:join:{event_id}")
+    elif subscribed:
+        builder.button(text="🔕 Не сообщать об открытии", callback_data=f"event:unsubscribe:{event_id}")
+    else:
+        builder.button(text="🔔 Сообщить об открытии", callback_data=f"event:subscribe:{event_id}")
     builder.button(text="Подробнее", callback_data=f"event:info:{event_id}")
     builder.button(text="Фото", callback_data=f"event:photo:view:{event_id}")
     builder.adjust(2)
     return builder.as_markup()
 
 
+def event_subscription_toggle(subscribed: bool) -> InlineKeyboardMarkup:
+    builder = InlineKeyboardBuilder()
+    if subscribed:
+        builder.button(text="🔕 Не сообщать о новых регистрациях", callback_data="event:unsubscribe:all")
+    else:
+        builder.button(text="🔔 Сообщать о всех новых регистрациях", callback_data="event:subscribe:all")
+    return builder.as_markup()
+
+
+def event_signup_confirm(event_id: int) -> InlineKeyboardMarkup:
+    builder = InlineKeyboardBuilder()
+    builder.button(text="Записаться", callback_data=f"event:join:{event_id}")
+    return builder.as_markup()
+
+
+def team_join_confirm(team_id: int) -> InlineKeyboardMarkup:
+    builder = InlineKeyboardBuilder()
+    builder.button(text="Вступить в команду", callback_data=f"team:join:{team_id}")
+    return builder.as_markup()
+
+
 def pagination_keyboard(prefix: str, page: int, has_more: bool) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     if page > 0:
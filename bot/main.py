@@ -11,8 +11,19 @@ from .handlers.admin import admin_routers
 from .handlers.start import router as start_router
 from .handlers.user import user_routers
 from .middlewares.db import DatabaseMiddleware
+from .services.admin_alerts import start_admin_alert_worker
+from .services.campaigns import start_campaign_worker
+from .services.checkin import stop_all_checkins
 from .services.club import ensure_default_achievements
+from .services.digest import start_digest_worker
+from .services.gateway import install_gateway
+from .services.outbox import start_outbox_worker
+from .services.registration_alerts import start_registration_alert_worker
 from .services.reminders import start_reminder_worker
+from .services.series import start_series_worker
+from .services.stats_history import start_stats_worker
+from .utils.email_templates import get_email_templates
+from .utils.emailer import close_smtp_pool, start_email_worker
 
 
 async def main() -> None:
@@ -20,6 +31,7 @@ async def main() -> None:
     settings = get_settings()
 
     bot = Bot(token=settings.bot_token, parse_mode=ParseMode.HTML)
+    install_gateway(bot)
     dp = Dispatcher()
 
     db_middleware = DatabaseMiddleware()
@@ -35,15 +47,31 @@ async def main() -> None:
     await init_db()
     async with session_scope() as session:
         await ensure_default_achievements(session)
+    # Compile email templates now so a broken template fails the start, not a send
+    get_email_templates()
 
-    reminder_task = start_reminder_worker(bot)
+    background_tasks = [
+        start_reminder_worker(),
+        start_series_worker(),
+        start_outbox_worker(bot),
+        start_campaign_worker(bot),
+        start_digest_worker(),
+        start_registration_alert_worker(),
+        start_admin_alert_worker(),
+        start_email_worker(),
+        start_stats_worker(),
+    ]
 
     try:
         await dp.start_polling(bot)
     finally:
-        reminder_task.cancel()
-        with suppress(asyncio.CancelledError):
-            await reminder_task
+        for task in background_tasks:
+            task.cancel()
+        for task in background_tasks:
+            with suppress(asyncio.CancelledError):
+                await task
+        await stop_all_checkins()
+        await close_smtp_pool()
 
 
 if __name__ == "__main__":
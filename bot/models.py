@@ -5,12 +5,15 @@ from enum import Enum
 from typing import List, Optional
 
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     CheckConstraint,
     DateTime,
     Enum as SAEnum,
     ForeignKey,
+    Index,
     Integer,
+    Sequence,
     String,
     Text,
     UniqueConstraint,
@@ -50,6 +53,34 @@ class ApplicationDecisionType(str, Enum):
     REJECTED = "rejected"
 
 
+class OutboxChannel(str, Enum):
+    TELEGRAM = "telegram"
+    EMAIL = "email"
+
+
+class OutboxStatus(str, Enum):
+    PENDING = "pending"
+    SENT = "sent"
+    DEAD = "dead"
+
+
+class NotifyMode(str, Enum):
+    IMMEDIATE = "immediate"
+    DIGEST = "digest"
+
+
+class StatsResolution(str, Enum):
+    RAW = "raw"
+    HOUR = "hour"
+    DAY = "day"
+    WEEK = "week"
+
+
+class CampaignStatus(str, Enum):
+    RUNNING = "running"
+    DONE = "done"
+
+
 class TimestampMixin:
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=func.now(), nullable=False
@@ -70,13 +101,16 @@ class User(Base, TimestampMixin):
     phone: Mapped[Optional[str]] = mapped_column(String(32))
     profession: Mapped[Optional[str]] = mapped_column(String(128))
     company: Mapped[Optional[str]] = mapped_column(String(128))
-    group_name: Mapped[Optional[str]] = mapped_column(String(64))
+    group_name: Mapped[Optional[str]] = mapped_column(String(64), index=True)
     status: Mapped[MembershipStatus] = mapped_column(
-        SAEnum(MembershipStatus), default=MembershipStatus.NEW, nullable=False
+        SAEnum(MembershipStatus), default=MembershipStatus.NEW, nullable=False, index=True
     )
-    points: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    points: Mapped[int] = mapped_column(Integer, default=0, nullable=False, index=True)
     email_confirmed: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     photo_file_id: Mapped[Optional[str]] = mapped_column(String(256))
+    notify_mode: Mapped[NotifyMode] = mapped_column(
+        SAEnum(NotifyMode), default=NotifyMode.IMMEDIATE, nullable=False
+    )
 
     application: Mapped[Optional[Application]] = relationship(
         "Application", back_populates="user", uselist=False, cascade="all, delete-orphan"
@@ -92,6 +126,10 @@ class User(Base, TimestampMixin):
     )
 
 
+# Alert batch ids on PostgreSQL; SQLite serializes writers and uses max(alert_batch) + 1
+ALERT_BATCH_SEQUENCE = Sequence("application_alert_batch_seq", metadata=Base.metadata)
+
+
 class Application(Base, TimestampMixin):
     __tablename__ = "applications"
 
@@ -103,6 +141,7 @@ class Application(Base, TimestampMixin):
     motivation: Mapped[Optional[str]] = mapped_column(Text)
     comment: Mapped[Optional[str]] = mapped_column(Text)
     decision_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    alert_batch: Mapped[Optional[int]] = mapped_column(BigInteger, index=True)
 
     user: Mapped[User] = relationship("User", back_populates="application")
     decision_logs: Mapped[List[ApplicationDecisionLog]] = relationship(
@@ -155,7 +194,13 @@ class Event(Base, TimestampMixin):
     end_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     capacity: Mapped[Optional[int]] = mapped_column(Integer)
     reminder_sent_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    reminder_locked_by: Mapped[Optional[str]] = mapped_column(String(64))
+    reminder_locked_until: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    registration_notified_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     photo_file_id: Mapped[Optional[str]] = mapped_column(String(256))
+    series_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("event_series.id", ondelete="SET NULL"), index=True
+    )
 
     __table_args__ = (
         CheckConstraint("registration_start <= registration_end", name="ck_registration_window"),
@@ -168,6 +213,30 @@ class Event(Base, TimestampMixin):
     change_logs: Mapped[List[EventChangeLog]] = relationship(
         "EventChangeLog", back_populates="event", cascade="all, delete-orphan"
     )
+    series: Mapped[Optional[EventSeries]] = relationship("EventSeries", back_populates="events")
+
+
+class EventSeries(Base, TimestampMixin):
+    """Recurring event template; occurrences are materialized as regular events."""
+
+    __tablename__ = "event_series"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    title: Mapped[str] = mapped_column(String(128), nullable=False)
+    description: Mapped[Optional[str]] = mapped_column(Text)
+    location: Mapped[Optional[str]] = mapped_column(String(256))
+    capacity: Mapped[Optional[int]] = mapped_column(Integer)
+    interval_days: Mapped[int] = mapped_column(Integer, default=7, nullable=False)
+    duration_minutes: Mapped[int] = mapped_column(Integer, nullable=False)
+    registration_opens_minutes: Mapped[int] = mapped_column(Integer, nullable=False)
+    registration_closes_minutes: Mapped[int] = mapped_column(Integer, nullable=False)
+    occurrences_ahead: Mapped[int] = mapped_column(Integer, default=4, nullable=False)
+    next_start_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+
+    __table_args__ = (CheckConstraint("interval_days > 0", name="ck_series_interval"),)
+
+    events: Mapped[List[Event]] = relationship("Event", back_populates="series")
 
 
 class EventRegistration(Base, TimestampMixin):
@@ -184,6 +253,42 @@ class EventRegistration(Base, TimestampMixin):
 
     event: Mapped[Event] = relationship("Event", back_populates="registrations")
     user: Mapped[User] = relationship("User", back_populates="registrations")
+    reminder_deliveries: Mapped[List[ReminderDelivery]] = relationship(
+        "ReminderDelivery", back_populates="registration", cascade="all, delete-orphan"
+    )
+
+
+class EventSubscription(Base, TimestampMixin):
+    """Request to be notified when registration opens; ``event_id`` NULL means every event."""
+
+    __tablename__ = "event_subscriptions"
+    __table_args__ = (
+        UniqueConstraint("user_id", "event_id", name="uq_event_subscription"),
+        Index("ix_event_subscriptions_event", "event_id"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    event_id: Mapped[Optional[int]] = mapped_column(ForeignKey("events.id", ondelete="CASCADE"))
+
+
+class ReminderDelivery(Base, TimestampMixin):
+    """Ledger of reminders already queued, one row per registration and stage."""
+
+    __tablename__ = "reminder_deliveries"
+    __table_args__ = (
+        UniqueConstraint("registration_id", "stage", name="uq_reminder_delivery"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    registration_id: Mapped[int] = mapped_column(
+        ForeignKey("event_registrations.id", ondelete="CASCADE"), nullable=False
+    )
+    stage: Mapped[str] = mapped_column(String(16), nullable=False)
+
+    registration: Mapped[EventRegistration] = relationship(
+        "EventRegistration", back_populates="reminder_deliveries"
+    )
 
 
 class Achievement(Base, TimestampMixin):
@@ -242,3 +347,76 @@ class ApplicationDecisionLog(Base, TimestampMixin):
     comment: Mapped[Optional[str]] = mapped_column(Text)
 
     application: Mapped[Application] = relationship("Application", overlaps="decision_logs")
+
+
+class DigestItem(Base, TimestampMixin):
+    """Notification buffered for a member in digest mode until the daily digest is composed."""
+
+    __tablename__ = "digest_items"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    text: Mapped[str] = mapped_column(Text, nullable=False)
+    dedup_key: Mapped[Optional[str]] = mapped_column(String(128), unique=True)
+
+
+class Campaign(Base, TimestampMixin):
+    """Admin broadcast to a member segment; each recipient is an outbox row tagged with the campaign."""
+
+    __tablename__ = "campaigns"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    text: Mapped[str] = mapped_column(Text, nullable=False)
+    segment: Mapped[str] = mapped_column(Text, nullable=False)
+    status: Mapped[CampaignStatus] = mapped_column(
+        SAEnum(CampaignStatus), default=CampaignStatus.RUNNING, nullable=False
+    )
+    total: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    admin_chat_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    status_message_id: Mapped[Optional[int]] = mapped_column(Integer)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+
+
+class OutboxMessage(Base, TimestampMixin):
+    """Notification written together with the business change and delivered by the outbox worker."""
+
+    __tablename__ = "outbox"
+    __table_args__ = (
+        Index("ix_outbox_due", "status", "next_attempt_at"),
+        Index("ix_outbox_campaign", "campaign_id", "status"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    channel: Mapped[OutboxChannel] = mapped_column(SAEnum(OutboxChannel), nullable=False)
+    dedup_key: Mapped[Optional[str]] = mapped_column(String(128), unique=True)
+    payload: Mapped[str] = mapped_column(Text, nullable=False)
+    status: Mapped[OutboxStatus] = mapped_column(
+        SAEnum(OutboxStatus), default=OutboxStatus.PENDING, nullable=False
+    )
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=func.now(), nullable=False
+    )
+    last_error: Mapped[Optional[str]] = mapped_column(Text)
+    sent_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    locked_by: Mapped[Optional[str]] = mapped_column(String(64))
+    locked_until: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    campaign_id: Mapped[Optional[int]] = mapped_column(ForeignKey("campaigns.id", ondelete="SET NULL"))
+
+
+class StatsSample(Base):
+    """Club counters for one time bucket; coarser resolutions keep the last sample of their bucket."""
+
+    __tablename__ = "stats_samples"
+    __table_args__ = (UniqueConstraint("resolution", "bucket_start", name="uq_stats_bucket"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    resolution: Mapped[StatsResolution] = mapped_column(SAEnum(StatsResolution), nullable=False)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    sampled_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    users_total: Mapped[int] = mapped_column(Integer, nullable=False)
+    members_active: Mapped[int] = mapped_column(Integer, nullable=False)
+    applications_pending: Mapped[int] = mapped_column(Integer, nullable=False)
+    event_registrations: Mapped[int] = mapped_column(Integer, nullable=False)
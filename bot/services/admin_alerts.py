@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from contextlib import suppress
+from typing import Sequence
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from ..config import get_settings
+from ..db import session_scope
+from ..keyboards.common import application_actions, application_batch_actions
+from .club import ClubService
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+BATCH_PREVIEW_LIMIT = 20
+
+_wakeup = asyncio.Event()
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_worker_after_commit(session: Session) -> None:
+    # ClubService.submit_application flags the session once the application is stored
+    if session.info.pop("new_application", False):
+        _wakeup.set()
+
+
+def application_text(row) -> str:
+    return (
+        f"Поступила новая заявка от {row.full_name} (@{row.username or 'нет username'}).\n"
+        f"Email: {row.email}\n"
+        f"Телефон: {row.phone or 'не указан'}\n"
+        f"Группа: {row.group_name or 'не указана'}\n"
+        f"Мотивация: {row.motivation or 'не указана'}\n"
+    )
+
+
+def batch_text(rows: Sequence) -> str:
+    lines = [f"Новых заявок: {len(rows)}"]
+    for row in rows[:BATCH_PREVIEW_LIMIT]:
+        lines.append(f"#{row.id} — {row.full_name}, группа {row.group_name or 'не указана'}")
+    if len(rows) > BATCH_PREVIEW_LIMIT:
+        lines.append(f"…и ещё {len(rows) - BATCH_PREVIEW_LIMIT}")
+    return "\n".join(lines)
+
+
+async def announce_new_applications() -> int:
+    """Tell every admin about applications not announced yet, in one message.
+
+    A single application keeps its own card with the usual buttons; several
+    are merged into a batch whose id is stored on the applications, so the
+    bulk buttons keep working after a restart. Applications are claimed
+    before anything is queued, so parallel bot processes never announce the
+    same application twice.
+    """
+    async with session_scope() as session:
+        club = ClubService(session)
+        batch, rows = await club.claim_unannounced_applications()
+        if not rows:
+            return 0
+        if len(rows) == 1:
+            text = application_text(rows[0])
+            markup = application_actions(rows[0].id)
+        else:
+            text = batch_text(rows)
+            markup = application_batch_actions(batch, len(rows))
+        for admin_id in settings.admin_ids:
+            await club.enqueue_telegram(
+                admin_id,
+                text,
+                reply_markup=markup,
+                dedup_key=f"admin-alert:{batch}:{admin_id}",
+            )
+    return len(rows)
+
+
+async def admin_alert_loop(poll_seconds: int = 60) -> None:
+    """Announce new applications off the request path.
+
+    With ``ADMIN_ALERT_WINDOW_SECONDS`` the worker waits that long after the
+    first new application so a rush ends up in one message per admin.
+    """
+    while True:
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(_wakeup.wait(), timeout=poll_seconds)
+        if settings.admin_alert_window_seconds > 0:
+            await asyncio.sleep(settings.admin_alert_window_seconds)
+        _wakeup.clear()
+        try:
+            await announce_new_applications()
+        except Exception as exc:  # pragma: no cover - background job
+            logger.exception("Ошибка в задаче уведомлений администраторов: %s", exc)
+
+
+def start_admin_alert_worker() -> asyncio.Task:
+    return asyncio.create_task(admin_alert_loop())
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import hashlib
+import hmac
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+from ..config import get_settings
+
+settings = get_settings()
+
+_PRODID = "-//IT Club//TechHubBot//RU"
+
+
+def _secret() -> bytes:
+    return (settings.calendar_secret or settings.bot_token).encode()
+
+
+def calendar_token(user_id: int) -> str:
+    digest = hmac.new(_secret(), f"calendar:{user_id}".encode(), hashlib.sha256)
+    return digest.hexdigest()[:32]
+
+
+def verify_calendar_token(user_id: int, token: str) -> bool:
+    return hmac.compare_digest(calendar_token(user_id), token)
+
+
+def calendar_url(user_id: int) -> Optional[str]:
+    if not settings.web_base_url:
+        return None
+    base = settings.web_base_url.rstrip("/")
+    return f"{base}/calendar/{user_id}/{calendar_token(user_id)}.ics"
+
+
+def _format_dt(value: datetime) -> str:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.strftime("%Y%m%dT%H%M%SZ")
+
+
+def _escape(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\n", "\\n")
+    )
+
+
+def _fold(line: str) -> str:
+    # RFC 5545: content lines longer than 75 octets are continued with a leading space
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line
+    parts = []
+    current = ""
+    for char in line:
+        limit = 75 if not parts else 74
+        if len((current + char).encode()) > limit:
+            parts.append(current)
+            current = char
+        else:
+            current += char
+    parts.append(current)
+    return "\r\n ".join(parts)
+
+
+def build_calendar(events: Iterable) -> str:
+    """Render event rows (id, title, description, location, start_at, end_at, updated_at) as iCalendar.
+
+    DTSTAMP comes from ``updated_at`` so an unchanged feed renders byte-for-byte identical.
+    """
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{_PRODID}",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        "X-WR-CALNAME:ИТ-Клуб",
+    ]
+    for event in events:
+        lines.extend(
+            [
+                "BEGIN:VEVENT",
+                f"UID:event-{event.id}@techhubbot",
+                f"DTSTAMP:{_format_dt(event.updated_at)}",
+                f"DTSTART:{_format_dt(event.start_at)}",
+                f"DTEND:{_format_dt(event.end_at)}",
+                f"SUMMARY:{_escape(event.title)}",
+            ]
+        )
+        if event.location:
+            lines.append(f"LOCATION:{_escape(event.location)}")
+        if event.description:
+            lines.append(f"DESCRIPTION:{_escape(event.description)}")
+        lines.append("END:VEVENT")
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(_fold(line) for line in lines) + "\r\n"
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Dict
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest
+
+from ..db import session_scope
+from ..models import Campaign
+from .club import ClubService
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_KEYS = {
+    "группа": "group",
+    "команда": "team_id",
+    "мероприятие": "event_id",
+    "баллы": "min_points",
+}
+
+_last_reported: Dict[int, str] = {}
+
+
+def parse_segment(text: str) -> dict:
+    """Parse ``все`` or ``группа ИВТ-21; баллы 50; команда 3; мероприятие 7`` into filters.
+
+    Every segment is limited to active members; filters are combined with AND.
+    """
+    text = text.strip()
+    if not text or text.lower() == "все":
+        return {}
+    segment = {}
+    for part in text.split(";"):
+        key, _, value = part.strip().partition(" ")
+        field = SEGMENT_KEYS.get(key.lower())
+        value = value.strip()
+        if not field or not value:
+            raise ValueError(f"Не удалось разобрать условие «{part.strip()}»")
+        if field == "group":
+            segment[field] = value
+        elif value.isdigit():
+            segment[field] = int(value)
+        else:
+            raise ValueError(f"Условие «{key}» ожидает число")
+    return segment
+
+
+def describe_segment(segment: dict) -> str:
+    parts = ["активные участники"]
+    if segment.get("group"):
+        parts.append(f"группа {segment['group']}")
+    if segment.get("team_id"):
+        parts.append(f"команда #{segment['team_id']}")
+    if segment.get("event_id"):
+        parts.append(f"записавшиеся на мероприятие #{segment['event_id']}")
+    if segment.get("min_points") is not None:
+        parts.append(f"от {segment['min_points']} баллов")
+    return ", ".join(parts)
+
+
+def progress_text(campaign: Campaign, counters: dict) -> str:
+    finished = counters["pending"] == 0
+    # Members in digest mode get the message with their daily digest, outside the outbox counters
+    digested = campaign.total - counters["pending"] - counters["sent"] - counters["dead"]
+    text = (
+        f"Рассылка #{campaign.id} {'завершена' if finished else 'идёт'}\n"
+        f"Получателей: {campaign.total}\n"
+        f"Доставлено: {counters['sent']}\n"
+        f"Ошибок: {counters['dead']}\n"
+        f"В очереди: {counters['pending']}"
+    )
+    if digested > 0:
+        text += f"\nОтложено в дайджест: {digested}"
+    return text
+
+
+async def report_campaigns(bot: Bot) -> None:
+    """Edit each running campaign's status message with fresh counters and close finished ones."""
+    async with session_scope() as session:
+        club = ClubService(session)
+        campaigns = await club.list_running_campaigns()
+        if not campaigns:
+            return
+        progress = await club.campaign_progress([campaign.id for campaign in campaigns])
+        finished = [campaign.id for campaign in campaigns if progress[campaign.id]["pending"] == 0]
+        await club.finish_campaigns(finished)
+
+    for campaign in campaigns:
+        text = progress_text(campaign, progress[campaign.id])
+        if campaign.id in finished:
+            _last_reported.pop(campaign.id, None)
+        elif _last_reported.get(campaign.id) == text:
+            continue
+        else:
+            _last_reported[campaign.id] = text
+        if not campaign.status_message_id:
+            continue
+        try:
+            await bot.edit_message_text(
+                text,
+                chat_id=campaign.admin_chat_id,
+                message_id=campaign.status_message_id,
+            )
+        except TelegramBadRequest:
+            # Unchanged text after a restart, or the admin deleted the message
+            pass
+
+
+async def campaign_loop(bot: Bot, interval_seconds: int = 5) -> None:
+    while True:
+        try:
+            await report_campaigns(bot)
+        except Exception as exc:  # pragma: no cover - background job
+            logger.exception("Ошибка в задаче рассылок: %s", exc)
+        await asyncio.sleep(interval_seconds)
+
+
+def start_campaign_worker(bot: Bot, interval_seconds: int = 5) -> asyncio.Task:
+    return asyncio.create_task(campaign_loop(bot, interval_seconds))
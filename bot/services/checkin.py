@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import string
+from contextlib import suppress
+from dataclasses import dataclass
+from typing import Dict, Optional, Set, Tuple
+
+from ..config import get_settings
+from ..db import session_scope
+from .club import ClubService
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_ALPHABET = string.digits + string.ascii_uppercase
+
+
+def checkin_code(registration_id: int) -> str:
+    """Short, case-insensitive code printed for the member (base36 of the registration id)."""
+    value = registration_id
+    chars = []
+    while value:
+        value, rem = divmod(value, 36)
+        chars.append(_ALPHABET[rem])
+    return "".join(reversed(chars)).rjust(4, "0")
+
+
+@dataclass
+class Attendee:
+    registration_id: int
+    user_id: int
+    telegram_id: int
+    full_name: str
+    attended: bool
+
+
+class CheckInSession:
+    """In-memory door list for one event.
+
+    Scans are answered from the preloaded roster; attendance is written back
+    in batches every ``flush_seconds`` or as soon as ``batch_size`` scans queue up.
+    """
+
+    def __init__(
+        self,
+        event_id: int,
+        attendees: list[Attendee],
+        *,
+        points: int,
+        flush_seconds: float,
+        batch_size: int,
+    ) -> None:
+        self.event_id = event_id
+        self.points = points
+        self.flush_seconds = flush_seconds
+        self.batch_size = batch_size
+        self._by_code: Dict[str, Attendee] = {
+            checkin_code(a.registration_id): a for a in attendees
+        }
+        self._by_telegram: Dict[int, Attendee] = {a.telegram_id: a for a in attendees}
+        self._pending: Set[int] = set()
+        self._wakeup = asyncio.Event()
+        self._closing = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def total(self) -> int:
+        return len(self._by_code)
+
+    @property
+    def checked_in(self) -> int:
+        return sum(1 for a in self._by_code.values() if a.attended)
+
+    def scan(self, value: str) -> Tuple[str, Optional[Attendee]]:
+        value = value.strip().upper()
+        attendee = self._by_code.get(value)
+        if attendee is None and value.isdigit():
+            attendee = self._by_telegram.get(int(value))
+        if attendee is None:
+            return "unknown", None
+        if attendee.attended:
+            return "duplicate", attendee
+        attendee.attended = True
+        self._pending.add(attendee.registration_id)
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+        return "ok", attendee
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while not self._closing:
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_seconds)
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        if not self._pending:
+            return 0
+        batch = list(self._pending)
+        self._pending.difference_update(batch)
+        try:
+            async with session_scope() as session:
+                return await ClubService(session).mark_attended(batch, points=self.points)
+        except Exception as exc:  # pragma: no cover - retried on the next tick
+            self._pending.update(batch)
+            logger.exception("Не удалось сохранить отметки мероприятия #%s: %s", self.event_id, exc)
+            return 0
+        except BaseException:
+            # Cancelled mid-write: keep the batch, mark_attended skips rows already saved
+            self._pending.update(batch)
+            raise
+
+    async def close(self) -> None:
+        """Stop the flusher after its in-flight write and save what is left."""
+        if self._task is not None:
+            self._closing = True
+            self._wakeup.set()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        await self.flush()
+
+
+_sessions: Dict[int, CheckInSession] = {}
+# One lock per event, so concurrent first scans load the roster only once
+_starting: Dict[int, asyncio.Lock] = {}
+
+
+def get_checkin(event_id: int) -> Optional[CheckInSession]:
+    return _sessions.get(event_id)
+
+
+async def start_checkin(event_id: int) -> CheckInSession:
+    async with _starting.setdefault(event_id, asyncio.Lock()):
+        session = _sessions.get(event_id)
+        if session is not None:
+            return session
+        async with session_scope() as db:
+            roster = await ClubService(db).list_checkin_roster(event_id)
+        session = CheckInSession(
+            event_id,
+            [
+                Attendee(
+                    registration_id=row.id,
+                    user_id=row.user_id,
+                    telegram_id=row.telegram_id,
+                    full_name=row.full_name,
+                    attended=row.attended,
+                )
+                for row in roster
+            ],
+            points=settings.points_per_attendance,
+            flush_seconds=settings.checkin_flush_seconds,
+            batch_size=settings.checkin_batch_size,
+        )
+        _sessions[event_id] = session
+        session.start()
+        return session
+
+
+async def stop_checkin(event_id: int) -> Optional[CheckInSession]:
+    session = _sessions.pop(event_id, None)
+    if session is not None:
+        await session.close()
+    return session
+
+
+async def stop_all_checkins() -> None:
+    for event_id in list(_sessions):
+        await stop_checkin(event_id)
@@ -2,39 +2,87 @@ from __future__ import annotations
 
 import csv
 import json
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import List, Optional, Sequence
+from typing import Any, AsyncIterator, List, Optional, Sequence, Tuple
 
 import openpyxl
 from openpyxl.workbook import Workbook
-from sqlalchemy import delete, func, or_, select
+from sqlalchemy import delete, func, insert, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from ..config import get_settings
 from ..models import (
+    ALERT_BATCH_SEQUENCE,
     Achievement,
     Application,
     ApplicationDecisionLog,
     ApplicationDecisionType,
     ApplicationStatus,
+    Campaign,
+    CampaignStatus,
+    DigestItem,
     Event,
     EventChangeAction,
     EventChangeLog,
     EventRegistration,
+    EventSeries,
+    EventSubscription,
     MembershipStatus,
+    NotifyMode,
+    OutboxChannel,
+    OutboxMessage,
+    OutboxStatus,
     RegistrationStatus,
+    ReminderDelivery,
+    StatsResolution,
+    StatsSample,
     Team,
     TeamMember,
     User,
     UserAchievement,
 )
+from ..utils.email_templates import RenderedEmail
+from .scheduler import registration_schedule, reminder_schedule, schedule_after_commit
 
 
 settings = get_settings()
 
+SERIES_TEMPLATE_FIELDS = ("title", "description", "location", "capacity")
+# Default for optional update arguments where ``None`` is a meaningful value
+_UNCHANGED: Any = object()
+
+
+def naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _minutes(delta: timedelta) -> int:
+    return int(delta.total_seconds() // 60)
+
+
+def reminder_stage(hours: int) -> str:
+    return f"{hours}h"
+
+
+def reminder_due_at(start_at: datetime, hours: int) -> datetime:
+    return naive_utc(start_at) - timedelta(hours=hours)
+
+
+def active_reminder_stage(start_at: datetime, now: Optional[datetime] = None) -> Optional[int]:
+    """The latest stage whose deadline has passed; earlier stages are superseded by it."""
+    start = naive_utc(start_at)
+    now = now or datetime.utcnow()
+    if now >= start:
+        return None
+    passed = [hours for hours in settings.reminder_stage_hours if reminder_due_at(start, hours) <= now]
+    return min(passed) if passed else None
+
 
 class ClubService:
     def __init__(self, session: AsyncSession) -> None:
@@ -210,13 +258,78 @@ class ClubService:
                 application.status = ApplicationStatus.PENDING
                 application.decision_at = None
             application.motivation = motivation
+            application.alert_batch = None
         else:
             application = Application(user=user, motivation=motivation)
             self.session.add(application)
         user.status = MembershipStatus.NEW
         await self.session.flush()
+        # Wakes the admin alert worker after commit
+        self.session.info["new_application"] = True
         return application
 
+    async def claim_unannounced_applications(self) -> Tuple[Optional[int], Sequence]:
+        """Claim pending applications nobody has announced yet as one alert batch.
+
+        The claim is a single conditional UPDATE, so when several processes run
+        it concurrently each application is won by exactly one of them. Batch
+        ids come from a sequence on PostgreSQL; on SQLite the claim holds the
+        write lock, so the next id is read safely from the table. Returns
+        ``(None, [])`` if there was nothing to claim.
+        """
+        claimed = (
+            await self.session.execute(
+                update(Application)
+                .where(
+                    Application.status == ApplicationStatus.PENDING,
+                    Application.alert_batch.is_(None),
+                )
+                # Placeholder until the batch id is known; never visible outside this transaction
+                .values(alert_batch=0)
+                .returning(Application.id)
+                .execution_options(synchronize_session=False)
+            )
+        ).scalars().all()
+        if not claimed:
+            return None, []
+        if self.session.get_bind().dialect.name == "postgresql":
+            batch = await self.session.scalar(select(ALERT_BATCH_SEQUENCE.next_value()))
+        else:
+            batch = await self.session.scalar(select(func.coalesce(func.max(Application.alert_batch), 0) + 1))
+        await self.session.execute(
+            update(Application)
+            .where(Application.id.in_(claimed))
+            .values(alert_batch=batch)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(
+            select(
+                Application.id,
+                Application.motivation,
+                User.full_name,
+                User.username,
+                User.email,
+                User.phone,
+                User.group_name,
+            )
+            .join(User, User.id == Application.user_id)
+            .where(Application.id.in_(claimed))
+            .order_by(Application.id.asc())
+        )
+        return batch, result.all()
+
+    async def list_batch_applications(self, batch: int) -> Sequence[Application]:
+        result = await self.session.execute(
+            select(Application)
+            .where(
+                Application.alert_batch == batch,
+                Application.status == ApplicationStatus.PENDING,
+            )
+            .order_by(Application.id.asc())
+            .options(selectinload(Application.user))
+        )
+        return result.scalars().all()
+
     async def list_pending_applications(self) -> Sequence[Application]:
         result = await self.session.execute(
             select(Application)
@@ -317,6 +430,18 @@ class ClubService:
         )
         return result.scalar_one_or_none()
 
+    async def get_team_brief(self, team_id: int) -> Optional[Team]:
+        """Team with its owner only; members are counted separately when needed."""
+        result = await self.session.execute(
+            select(Team).where(Team.id == team_id).options(selectinload(Team.owner))
+        )
+        return result.scalar_one_or_none()
+
+    async def count_team_members(self, team_id: int) -> int:
+        return await self.session.scalar(
+            select(func.count(TeamMember.id)).where(TeamMember.team_id == team_id)
+        ) or 0
+
     async def list_teams(self) -> Sequence[Team]:
         result = await self.session.execute(
             select(Team)
@@ -395,6 +520,26 @@ class ClubService:
         )
         return result.scalars().all()
 
+    async def get_event_brief(self, event_id: int) -> Optional[Event]:
+        """Event row without registrations, for flows that only need the card fields."""
+        return await self.session.get(Event, event_id)
+
+    async def count_event_registrations(self, event_id: int) -> int:
+        return await self.session.scalar(
+            select(func.count(EventRegistration.id)).where(
+                EventRegistration.event_id == event_id,
+                EventRegistration.status == RegistrationStatus.REGISTERED,
+            )
+        ) or 0
+
+    async def get_registration(self, event_id: int, user_id: int) -> Optional[EventRegistration]:
+        return await self.session.scalar(
+            select(EventRegistration).where(
+                EventRegistration.event_id == event_id,
+                EventRegistration.user_id == user_id,
+            )
+        )
+
     async def get_event(self, event_id: int) -> Optional[Event]:
         result = await self.session.execute(
             select(Event)
@@ -437,6 +582,12 @@ class ClubService:
         )
         self.session.add(event)
         await self.session.flush()
+        self._schedule_reminders(
+            {(event.id, hours): reminder_due_at(event.start_at, hours) for hours in settings.reminder_stage_hours}
+        )
+        schedule_after_commit(
+            self.session, registration_schedule, {event.id: naive_utc(event.registration_start)}
+        )
         await self._log_event_change(
             event,
             action=EventChangeAction.CREATED,
@@ -461,9 +612,10 @@ class ClubService:
         registration_end: Optional[datetime] = None,
         start_at: Optional[datetime] = None,
         end_at: Optional[datetime] = None,
-        capacity: Optional[int] = None,
+        capacity: Optional[int] = _UNCHANGED,
         admin_id: Optional[int] = None,
     ) -> Event:
+        """Change the given fields; ``capacity=None`` removes the limit."""
         changes = {}
         if title is not None:
             event.title = title
@@ -492,10 +644,16 @@ class ClubService:
             event.start_at,
             event.end_at,
         )
-        if capacity is not None:
+        if capacity is not _UNCHANGED and capacity != event.capacity:
             event.capacity = capacity
             changes["capacity"] = capacity
         await self.session.flush()
+        if start_at is not None:
+            await self._rearm_reminders(event)
+        if registration_start is not None:
+            schedule_after_commit(
+                self.session, registration_schedule, {event.id: naive_utc(event.registration_start)}
+            )
         if changes:
             await self._log_event_change(
                 event,
@@ -516,8 +674,156 @@ class ClubService:
         )
 
     async def delete_event(self, event: Event) -> None:
+        event_id = event.id
         await self.session.delete(event)
         await self.session.flush()
+        self._schedule_reminders({(event_id, hours): None for hours in settings.reminder_stage_hours})
+        schedule_after_commit(self.session, registration_schedule, {event_id: None})
+
+    def _schedule_reminders(self, deadlines: dict) -> None:
+        schedule_after_commit(self.session, reminder_schedule, deadlines)
+
+    async def _rearm_reminders(self, event: Event) -> None:
+        """Forget deliveries of stages that are in the future again after ``start_at`` moved."""
+        now = datetime.utcnow()
+        rearmed = [
+            reminder_stage(hours)
+            for hours in settings.reminder_stage_hours
+            if reminder_due_at(event.start_at, hours) > now
+        ]
+        if rearmed:
+            await self.session.execute(
+                delete(ReminderDelivery)
+                .where(
+                    ReminderDelivery.stage.in_(rearmed),
+                    ReminderDelivery.registration_id.in_(
+                        select(EventRegistration.id).where(EventRegistration.event_id == event.id)
+                    ),
+                )
+                .execution_options(synchronize_session=False)
+            )
+        self._schedule_reminders(
+            {(event.id, hours): reminder_due_at(event.start_at, hours) for hours in settings.reminder_stage_hours}
+        )
+
+    # Recurring series
+    async def get_series(self, series_id: int) -> Optional[EventSeries]:
+        return await self.session.get(EventSeries, series_id)
+
+    async def list_active_series(self) -> Sequence[EventSeries]:
+        result = await self.session.execute(
+            select(EventSeries).where(EventSeries.is_active.is_(True)).order_by(EventSeries.id)
+        )
+        return result.scalars().all()
+
+    async def create_series_from_event(
+        self,
+        event: Event,
+        *,
+        interval_days: int = 7,
+        occurrences_ahead: Optional[int] = None,
+    ) -> EventSeries:
+        if interval_days <= 0:
+            raise ValueError("Интервал повторения должен быть больше нуля")
+        if event.series_id:
+            raise ValueError("Мероприятие уже входит в серию")
+        series = EventSeries(
+            title=event.title,
+            description=event.description,
+            location=event.location,
+            capacity=event.capacity,
+            interval_days=interval_days,
+            duration_minutes=_minutes(event.end_at - event.start_at),
+            registration_opens_minutes=_minutes(event.start_at - event.registration_start),
+            registration_closes_minutes=_minutes(event.start_at - event.registration_end),
+            occurrences_ahead=occurrences_ahead or settings.series_occurrences_ahead,
+            next_start_at=naive_utc(event.start_at) + timedelta(days=interval_days),
+        )
+        self.session.add(series)
+        await self.session.flush()
+        event.series_id = series.id
+        await self.session.flush()
+        await self.materialize_series(series)
+        return series
+
+    async def materialize_series(self, series: EventSeries, now: Optional[datetime] = None) -> int:
+        """Top the series up to ``occurrences_ahead`` future events with one bulk INSERT."""
+        if not series.is_active:
+            return 0
+        now = now or datetime.utcnow()
+        upcoming = await self.session.scalar(
+            select(func.count(Event.id)).where(
+                Event.series_id == series.id,
+                Event.start_at >= now,
+            )
+        ) or 0
+        missing = series.occurrences_ahead - upcoming
+        if missing <= 0:
+            return 0
+
+        step = timedelta(days=series.interval_days)
+        start_at = naive_utc(series.next_start_at)
+        while start_at < now:
+            # Skip occurrences that were missed while the worker was down
+            start_at += step
+        rows = []
+        for _ in range(missing):
+            rows.append(
+                {
+                    "series_id": series.id,
+                    "title": series.title,
+                    "description": series.description,
+                    "location": series.location,
+                    "capacity": series.capacity,
+                    "registration_start": start_at
+                    - timedelta(minutes=series.registration_opens_minutes),
+                    "registration_end": start_at
+                    - timedelta(minutes=series.registration_closes_minutes),
+                    "start_at": start_at,
+                    "end_at": start_at + timedelta(minutes=series.duration_minutes),
+                }
+            )
+            start_at += step
+        await self.session.execute(insert(Event), rows)
+        series.next_start_at = start_at
+        await self.session.flush()
+        return len(rows)
+
+    async def update_event_series(
+        self,
+        series: EventSeries,
+        changes: dict,
+        *,
+        now: Optional[datetime] = None,
+    ) -> int:
+        """Apply template changes to the series and all its future events in one UPDATE.
+
+        ``changes`` maps ``title``, ``description``, ``location`` and ``capacity`` to
+        their new values; ``None`` clears a field (``capacity=None`` means no limit).
+        The title is required and cannot be cleared.
+        """
+        values = {key: value for key, value in changes.items() if key in SERIES_TEMPLATE_FIELDS}
+        if values.get("title", "") is None:
+            del values["title"]
+        if not values:
+            return 0
+        for key, value in values.items():
+            setattr(series, key, value)
+        result = await self.session.execute(
+            update(Event)
+            .where(
+                Event.series_id == series.id,
+                Event.start_at >= (now or datetime.utcnow()),
+            )
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.flush()
+        return result.rowcount
+
+    async def stop_series(self, series: EventSeries) -> None:
+        series.is_active = False
+        await self.session.flush()
 
     async def register_for_event(self, event: Event, user: User) -> EventRegistration:
         if event.capacity is not None:
@@ -546,6 +852,7 @@ class ClubService:
                 registration.status = RegistrationStatus.REGISTERED
                 await self.session.flush()
                 await self._add_points(user, settings.points_per_event)
+                self._catch_up_reminder(event, now)
                 return registration
             raise ValueError("Вы уже зарегистрированы")
 
@@ -554,8 +861,15 @@ class ClubService:
         await self.session.flush()
 
         await self._add_points(user, settings.points_per_event)
+        self._catch_up_reminder(event, now)
         return registration
 
+    def _catch_up_reminder(self, event: Event, now: datetime) -> None:
+        # A late registrant gets the current stage; the ledger keeps everyone else from a repeat
+        hours = active_reminder_stage(event.start_at, now)
+        if hours is not None:
+            self._schedule_reminders({(event.id, hours): now})
+
     async def cancel_registration(self, event: Event, user: User) -> None:
         result = await self.session.execute(
             select(EventRegistration).where(
@@ -572,6 +886,175 @@ class ClubService:
         user.points = max(0, user.points - settings.points_per_event)
         await self.session.flush()
 
+    # Registration opening alerts
+    async def list_user_subscriptions(self, user_id: int) -> set:
+        """Event ids the user follows; ``None`` in the set means every event."""
+        result = await self.session.execute(
+            select(EventSubscription.event_id).where(EventSubscription.user_id == user_id)
+        )
+        return set(result.scalars())
+
+    def _subscription_filter(self, user_id: int, event_id: Optional[int]):
+        if event_id is None:
+            return (EventSubscription.user_id == user_id, EventSubscription.event_id.is_(None))
+        return (EventSubscription.user_id == user_id, EventSubscription.event_id == event_id)
+
+    async def subscribe_to_event(self, user_id: int, event_id: Optional[int]) -> bool:
+        existing = await self.session.scalar(
+            select(EventSubscription.id).where(*self._subscription_filter(user_id, event_id))
+        )
+        if existing:
+            return False
+        self.session.add(EventSubscription(user_id=user_id, event_id=event_id))
+        await self.session.flush()
+        return True
+
+    async def unsubscribe_from_event(self, user_id: int, event_id: Optional[int]) -> None:
+        await self.session.execute(
+            delete(EventSubscription)
+            .where(*self._subscription_filter(user_id, event_id))
+            .execution_options(synchronize_session=False)
+        )
+
+    def _registration_alert_pending(self):
+        return or_(
+            Event.registration_notified_at.is_(None),
+            Event.registration_notified_at < Event.registration_start,
+        )
+
+    async def list_pending_registration_openings(self) -> dict:
+        """Registration start of every event whose subscribers were not notified yet."""
+        result = await self.session.execute(
+            select(Event.id, Event.registration_start).where(
+                Event.registration_end > datetime.utcnow(),
+                self._registration_alert_pending(),
+            )
+        )
+        return {row.id: naive_utc(row.registration_start) for row in result}
+
+    async def list_opened_registrations(self, event_ids: Sequence[int]) -> Sequence:
+        now = datetime.utcnow()
+        result = await self.session.execute(
+            select(Event.id, Event.title, Event.start_at, Event.registration_start, Event.registration_end)
+            .where(
+                Event.id.in_(event_ids),
+                Event.registration_start <= now,
+                Event.registration_end > now,
+                self._registration_alert_pending(),
+            )
+            .order_by(Event.registration_start.asc())
+        )
+        return result.all()
+
+    async def list_event_subscribers(self, event_id: int) -> Sequence:
+        """Active members following ``event_id`` or all events, via the event_id index."""
+        result = await self.session.execute(
+            select(User.id, User.telegram_id)
+            .join(EventSubscription, EventSubscription.user_id == User.id)
+            .where(
+                or_(EventSubscription.event_id == event_id, EventSubscription.event_id.is_(None)),
+                User.status == MembershipStatus.ACTIVE,
+            )
+            .distinct()
+        )
+        return result.all()
+
+    async def mark_registration_notified(self, event_ids: Sequence[int]) -> None:
+        await self.session.execute(
+            update(Event)
+            .where(Event.id.in_(event_ids))
+            .values(registration_notified_at=datetime.utcnow(), updated_at=Event.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def list_checkin_roster(self, event_id: int) -> Sequence:
+        result = await self.session.execute(
+            select(
+                EventRegistration.id,
+                EventRegistration.user_id,
+                EventRegistration.attended,
+                User.telegram_id,
+                User.full_name,
+            )
+            .join(User, User.id == EventRegistration.user_id)
+            .where(
+                EventRegistration.event_id == event_id,
+                EventRegistration.status == RegistrationStatus.REGISTERED,
+            )
+        )
+        return result.all()
+
+    async def list_event_participants(
+        self,
+        event_id: int,
+        *,
+        after_id: Optional[int] = None,
+        before_id: Optional[int] = None,
+        limit: int = 20,
+    ) -> tuple[list, bool, bool]:
+        """Keyset page of participants ordered by registration id.
+
+        Returns ``(rows, has_prev, has_next)``; pass the last row id as ``after_id``
+        for the next page or the first row id as ``before_id`` for the previous one.
+        """
+        stmt = (
+            select(
+                EventRegistration.id,
+                EventRegistration.attended,
+                User.full_name,
+                User.username,
+            )
+            .join(User, User.id == EventRegistration.user_id)
+            .where(
+                EventRegistration.event_id == event_id,
+                EventRegistration.status == RegistrationStatus.REGISTERED,
+            )
+            .limit(limit + 1)
+        )
+        if before_id is not None:
+            stmt = stmt.where(EventRegistration.id < before_id).order_by(EventRegistration.id.desc())
+        else:
+            if after_id is not None:
+                stmt = stmt.where(EventRegistration.id > after_id)
+            stmt = stmt.order_by(EventRegistration.id.asc())
+        rows = (await self.session.execute(stmt)).all()
+        overflow = len(rows) > limit
+        rows = rows[:limit]
+        if before_id is not None:
+            return list(reversed(rows)), overflow, True
+        return rows, after_id is not None, overflow
+
+    async def mark_attended(self, registration_ids: Sequence[int], points: int = 0) -> int:
+        """Set ``attended`` for a batch of registrations and award attendance points in bulk."""
+        if not registration_ids:
+            return 0
+        result = await self.session.execute(
+            select(EventRegistration.id, EventRegistration.user_id).where(
+                EventRegistration.id.in_(registration_ids),
+                EventRegistration.attended.is_(False),
+            )
+        )
+        rows = result.all()
+        if not rows:
+            return 0
+        await self.session.execute(
+            update(EventRegistration)
+            .where(EventRegistration.id.in_([row.id for row in rows]))
+            .values(attended=True)
+            .execution_options(synchronize_session=False)
+        )
+        if points:
+            user_ids = [row.user_id for row in rows]
+            await self.session.execute(
+                update(User)
+                .where(User.id.in_(user_ids))
+                .values(points=User.points + points)
+                .execution_options(synchronize_session=False)
+            )
+            await self._assign_achievements_bulk(user_ids)
+        await self.session.flush()
+        return len(rows)
+
     async def list_user_registrations(self, user_id: int) -> Sequence[EventRegistration]:
         result = await self.session.execute(
             select(EventRegistration)
@@ -581,6 +1064,27 @@ class ClubService:
         )
         return result.scalars().all()
 
+    async def list_user_calendar_events(self, user_id: int) -> Sequence:
+        """Lean rows (no ORM graph) for the user's REGISTERED events, used by the ICS feed."""
+        result = await self.session.execute(
+            select(
+                Event.id,
+                Event.title,
+                Event.description,
+                Event.location,
+                Event.start_at,
+                Event.end_at,
+                Event.updated_at,
+            )
+            .join(EventRegistration, EventRegistration.event_id == Event.id)
+            .where(
+                EventRegistration.user_id == user_id,
+                EventRegistration.status == RegistrationStatus.REGISTERED,
+            )
+            .order_by(Event.start_at.asc())
+        )
+        return result.all()
+
     async def search_events(self, query: str) -> Sequence[Event]:
         like = f"%{query.lower()}%"
         result = await self.session.execute(
@@ -597,26 +1101,122 @@ class ClubService:
         )
         return result.scalars().all()
 
-    async def upcoming_events_for_reminder(self) -> Sequence[Event]:
-        now = datetime.utcnow()
-        reminder_time = now + timedelta(hours=settings.reminder_hours_before)
+    async def list_due_reminder_events(self, event_ids: Sequence[int]) -> Sequence:
         result = await self.session.execute(
-            select(Event)
-            .where(
-                Event.start_at <= reminder_time,
-                Event.start_at >= now,
-                or_(Event.reminder_sent_at.is_(None), Event.reminder_sent_at < Event.start_at),
-            )
+            select(Event.id, Event.title, Event.location, Event.start_at)
+            .where(Event.id.in_(event_ids), Event.start_at >= datetime.utcnow())
             .order_by(Event.start_at.asc())
-            .options(
-                selectinload(Event.registrations).selectinload(EventRegistration.user)
+        )
+        return result.all()
+
+    async def list_reminder_recipients(self, event_ids: Sequence[int], stage: str) -> Sequence:
+        """Registrations of the events that have no delivery recorded for ``stage`` yet."""
+        result = await self.session.execute(
+            select(
+                EventRegistration.id.label("registration_id"),
+                EventRegistration.event_id,
+                User.id.label("user_id"),
+                User.telegram_id,
+                User.email,
+                User.full_name,
+            )
+            .join(User, User.id == EventRegistration.user_id)
+            .outerjoin(
+                ReminderDelivery,
+                (ReminderDelivery.registration_id == EventRegistration.id)
+                & (ReminderDelivery.stage == stage),
             )
+            .where(
+                EventRegistration.event_id.in_(event_ids),
+                EventRegistration.status == RegistrationStatus.REGISTERED,
+                ReminderDelivery.id.is_(None),
+            )
+            .order_by(EventRegistration.id.asc())
         )
-        return result.scalars().all()
+        return result.all()
 
-    async def mark_event_reminded(self, event: Event) -> None:
-        event.reminder_sent_at = datetime.utcnow()
-        await self.session.flush()
+    async def record_reminder_deliveries(self, registration_ids: Sequence[int], stage: str) -> None:
+        if not registration_ids:
+            return
+        await self.session.execute(
+            self._insert_ignoring_conflicts(ReminderDelivery),
+            [{"registration_id": reg_id, "stage": stage} for reg_id in registration_ids],
+        )
+
+    async def mark_events_reminded(self, event_ids: Sequence[int]) -> None:
+        await self.session.execute(
+            update(Event)
+            .where(Event.id.in_(event_ids))
+            .values(reminder_sent_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+
+    async def lease_reminder_events(
+        self,
+        event_ids: Sequence[int],
+        worker: str,
+        lease_seconds: int,
+    ) -> Tuple[List[int], dict]:
+        """Lease events to ``worker`` before their reminders are claimed.
+
+        Returns the leased ids and, for events leased by another worker, the
+        expiry of that lease (``None`` if the holder has not committed yet).
+        """
+        now = datetime.utcnow()
+        lease_until = now + timedelta(seconds=lease_seconds)
+        free = (
+            Event.id.in_(event_ids),
+            or_(Event.reminder_locked_until.is_(None), Event.reminder_locked_until < now),
+        )
+        candidates = select(Event.id).where(*free).with_for_update(skip_locked=True)
+        await self.session.execute(
+            update(Event)
+            .where(Event.id.in_(candidates), *free)
+            # Leases are bookkeeping: keep updated_at, which feeds calendar ETags
+            .values(reminder_locked_by=worker, reminder_locked_until=lease_until, updated_at=Event.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        # Ownership is decided in SQL: read back, a timestamptz column is tz-aware on PostgreSQL
+        mine = (Event.reminder_locked_by == worker) & (Event.reminder_locked_until == lease_until)
+        result = await self.session.execute(
+            select(Event.id, mine.label("leased"), Event.reminder_locked_until).where(Event.id.in_(event_ids))
+        )
+        leased = []
+        busy = {}
+        for row in result:
+            if row.leased:
+                leased.append(row.id)
+            else:
+                until = row.reminder_locked_until
+                busy[row.id] = naive_utc(until) if until is not None else None
+        return leased, busy
+
+    async def release_reminder_events(self, event_ids: Sequence[int], worker: str) -> None:
+        await self.session.execute(
+            update(Event)
+            .where(Event.id.in_(event_ids), Event.reminder_locked_by == worker)
+            .values(reminder_locked_by=None, reminder_locked_until=None, updated_at=Event.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+
+    async def list_pending_reminders(self) -> dict:
+        """Deadlines of every ``(event_id, stage_hours)`` still relevant for future events.
+
+        Stages ahead of now are scheduled at their due time; the current stage is
+        included too so deliveries missing from the ledger are caught up.
+        """
+        now = datetime.utcnow()
+        result = await self.session.execute(
+            select(Event.id, Event.start_at).where(Event.start_at >= now)
+        )
+        deadlines = {}
+        for row in result:
+            current = active_reminder_stage(row.start_at, now)
+            for hours in settings.reminder_stage_hours:
+                due_at = reminder_due_at(row.start_at, hours)
+                if due_at > now or hours == current:
+                    deadlines[(row.id, hours)] = due_at
+        return deadlines
 
     async def get_event_logs(self, event_id: int, limit: int = 20) -> Sequence[EventChangeLog]:
         result = await self.session.execute(
@@ -693,36 +1293,471 @@ class ClubService:
         self.session.add(log)
         await self.session.flush()
 
-    # Statistics and exports
-    async def get_statistics(self) -> dict:
-        users_total = await self.session.scalar(select(func.count(User.id))) or 0
-        members_active = await self.session.scalar(
-            select(func.count(User.id)).where(User.status == MembershipStatus.ACTIVE)
-        ) or 0
-        applications_pending = await self.session.scalar(
-            select(func.count(Application.id)).where(
-                Application.status == ApplicationStatus.PENDING
+    # Notification outbox
+    def _insert_ignoring_conflicts(self, model):
+        dialect = self.session.get_bind().dialect.name
+        if dialect == "sqlite":
+            return sqlite.insert(model).on_conflict_do_nothing()
+        if dialect == "postgresql":
+            return postgresql.insert(model).on_conflict_do_nothing()
+        return insert(model)
+
+    async def enqueue_notifications(self, messages: Sequence[dict]) -> None:
+        """Queue outbox rows in the current transaction.
+
+        Each item has ``channel``, ``payload`` (a dict) and optional ``dedup_key`` and
+        ``campaign_id``; rows whose key is already queued are skipped.
+        """
+        if not messages:
+            return
+        now = datetime.utcnow()
+        rows = [
+            {
+                "channel": message["channel"],
+                "payload": json.dumps(message["payload"], ensure_ascii=False),
+                "dedup_key": message.get("dedup_key"),
+                "campaign_id": message.get("campaign_id"),
+                "status": OutboxStatus.PENDING,
+                "next_attempt_at": now,
+            }
+            for message in messages
+        ]
+        await self.session.execute(self._insert_ignoring_conflicts(OutboxMessage), rows)
+        self.session.info["outbox_dirty"] = True
+
+    async def enqueue_telegram(
+        self,
+        chat_id: int,
+        text: str,
+        *,
+        reply_markup=None,
+        dedup_key: Optional[str] = None,
+    ) -> None:
+        payload = {"chat_id": chat_id, "text": text}
+        if reply_markup is not None:
+            payload["reply_markup"] = reply_markup.model_dump(exclude_none=True)
+        await self.enqueue_notifications(
+            [{"channel": OutboxChannel.TELEGRAM, "payload": payload, "dedup_key": dedup_key}]
+        )
+
+    async def enqueue_email(
+        self,
+        subject: str,
+        body: str,
+        recipients: Sequence[str],
+        *,
+        html: Optional[str] = None,
+        dedup_key: Optional[str] = None,
+    ) -> None:
+        """Queue an email as one outbox row per recipient, or per ``EMAIL_BATCH_SIZE`` recipients.
+
+        Chunks are sent with the addresses in the envelope only (see
+        ``build_message``), so recipients never see each other. ``dedup_key``
+        is suffixed with the chunk's first address to keep retries and later
+        calls for newly added recipients apart.
+        """
+        if not recipients or not settings.has_smtp_credentials:
+            return
+        recipients = list(dict.fromkeys(recipients))
+        size = max(settings.email_batch_size, 1)
+        messages = []
+        for start in range(0, len(recipients), size):
+            chunk = recipients[start : start + size]
+            suffix = chunk[0] if len(chunk) == 1 else f"{chunk[0]}+{len(chunk) - 1}"
+            messages.append(
+                {
+                    "channel": OutboxChannel.EMAIL,
+                    "payload": {"subject": subject, "body": body, "html": html, "recipients": chunk},
+                    "dedup_key": f"{dedup_key}:{suffix}" if dedup_key else None,
+                }
             )
-        ) or 0
-        teams_total = await self.session.scalar(select(func.count(Team.id))) or 0
-        events_total = await self.session.scalar(select(func.count(Event.id))) or 0
-        upcoming = await self.session.scalar(
-            select(func.count(Event.id)).where(Event.start_at >= datetime.utcnow())
-        ) or 0
-        registrations_total = await self.session.scalar(
-            select(func.count(EventRegistration.id)).where(
-                EventRegistration.status == RegistrationStatus.REGISTERED
+        await self.enqueue_notifications(messages)
+
+    async def enqueue_personal_emails(
+        self,
+        emails: Sequence[Tuple[str, RenderedEmail]],
+        *,
+        dedup_key: Optional[str] = None,
+    ) -> None:
+        """Queue individually rendered ``(address, email)`` pairs, one outbox row each."""
+        if not emails or not settings.has_smtp_credentials:
+            return
+        await self.enqueue_notifications(
+            [
+                {
+                    "channel": OutboxChannel.EMAIL,
+                    "payload": {
+                        "subject": email.subject,
+                        "body": email.text,
+                        "html": email.html,
+                        "recipients": [address],
+                    },
+                    "dedup_key": f"{dedup_key}:{address}" if dedup_key else None,
+                }
+                for address, email in emails
+            ]
+        )
+
+    async def enqueue_member_notifications(self, messages: Sequence[dict]) -> int:
+        """Queue Telegram messages to members, buffering them for those who chose the digest.
+
+        Items are like in ``enqueue_notifications`` plus ``user_id``; returns how
+        many were diverted to ``digest_items``.
+        """
+        if not messages:
+            return 0
+        result = await self.session.execute(
+            select(User.id).where(
+                User.id.in_({message["user_id"] for message in messages}),
+                User.notify_mode == NotifyMode.DIGEST,
+            )
+        )
+        digest_users = set(result.scalars())
+        await self.enqueue_notifications(
+            [message for message in messages if message["user_id"] not in digest_users]
+        )
+        items = [
+            {
+                "user_id": message["user_id"],
+                "text": message["payload"]["text"],
+                "dedup_key": message.get("dedup_key"),
+            }
+            for message in messages
+            if message["user_id"] in digest_users
+        ]
+        if items:
+            await self.session.execute(self._insert_ignoring_conflicts(DigestItem), items)
+        return len(items)
+
+    async def set_notify_mode(self, user: User, mode: NotifyMode) -> None:
+        user.notify_mode = mode
+        await self.session.flush()
+
+    async def list_digest_items(self, user_limit: int) -> Sequence:
+        """All buffered items of the first ``user_limit`` members, so no member's digest is split."""
+        user_ids = (
+            select(DigestItem.user_id)
+            .join(User, User.id == DigestItem.user_id)
+            .group_by(DigestItem.user_id)
+            .order_by(DigestItem.user_id.asc())
+            .limit(user_limit)
+            .scalar_subquery()
+        )
+        result = await self.session.execute(
+            select(DigestItem.id, DigestItem.user_id, DigestItem.text, User.telegram_id)
+            .join(User, User.id == DigestItem.user_id)
+            .where(DigestItem.user_id.in_(user_ids))
+            .order_by(DigestItem.user_id.asc(), DigestItem.id.asc())
+        )
+        return result.all()
+
+    async def delete_digest_items(self, item_ids: Sequence[int]) -> None:
+        await self.session.execute(
+            delete(DigestItem)
+            .where(DigestItem.id.in_(item_ids))
+            .execution_options(synchronize_session=False)
+        )
+
+    async def lease_due_outbox(self, limit: int, worker: str, lease_seconds: int) -> Sequence[OutboxMessage]:
+        """Lease up to ``limit`` due messages to ``worker`` so parallel processes never share a row.
+
+        Rows whose lease expired (the holder crashed) are due again. On PostgreSQL
+        competing workers skip each other's locked rows instead of waiting.
+        """
+        now = datetime.utcnow()
+        lease_until = now + timedelta(seconds=lease_seconds)
+        due = (
+            OutboxMessage.status == OutboxStatus.PENDING,
+            OutboxMessage.next_attempt_at <= now,
+            or_(OutboxMessage.locked_until.is_(None), OutboxMessage.locked_until < now),
+        )
+        candidates = (
+            select(OutboxMessage.id)
+            .where(*due)
+            .order_by(OutboxMessage.next_attempt_at.asc(), OutboxMessage.id.asc())
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        await self.session.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.id.in_(candidates), *due)
+            .values(locked_by=worker, locked_until=lease_until)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(
+            select(OutboxMessage)
+            .where(OutboxMessage.locked_by == worker, OutboxMessage.locked_until == lease_until)
+            .order_by(OutboxMessage.next_attempt_at.asc(), OutboxMessage.id.asc())
+        )
+        return result.scalars().all()
+
+    async def mark_outbox_sent(self, message_ids: Sequence[int]) -> None:
+        if not message_ids:
+            return
+        await self.session.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.id.in_(message_ids))
+            .values(
+                status=OutboxStatus.SENT,
+                sent_at=datetime.utcnow(),
+                last_error=None,
+                locked_by=None,
+                locked_until=None,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    async def mark_outbox_failed(
+        self,
+        message_id: int,
+        error: str,
+        *,
+        attempts: int,
+        retry_at: datetime,
+        dead: bool,
+    ) -> None:
+        await self.session.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.id == message_id)
+            .values(
+                attempts=attempts,
+                last_error=error[:1000],
+                next_attempt_at=retry_at,
+                status=OutboxStatus.DEAD if dead else OutboxStatus.PENDING,
+                locked_by=None,
+                locked_until=None,
             )
+            .execution_options(synchronize_session=False)
+        )
+
+    async def outbox_stats(self) -> dict:
+        result = await self.session.execute(
+            select(OutboxMessage.status, func.count(OutboxMessage.id))
+            .where(OutboxMessage.status != OutboxStatus.SENT)
+            .group_by(OutboxMessage.status)
+        )
+        counts = {status.value: 0 for status in (OutboxStatus.PENDING, OutboxStatus.DEAD)}
+        counts.update({status.value: count for status, count in result})
+        return counts
+
+    # Broadcast campaigns
+    def _segment_query(self, segment: dict):
+        query = select(User.id, User.telegram_id).where(User.status == MembershipStatus.ACTIVE)
+        if segment.get("group"):
+            query = query.where(User.group_name == segment["group"])
+        if segment.get("min_points") is not None:
+            query = query.where(User.points >= segment["min_points"])
+        if segment.get("team_id"):
+            query = query.where(
+                User.id.in_(select(TeamMember.user_id).where(TeamMember.team_id == segment["team_id"]))
+            )
+        if segment.get("event_id"):
+            query = query.where(
+                User.id.in_(
+                    select(EventRegistration.user_id).where(
+                        EventRegistration.event_id == segment["event_id"],
+                        EventRegistration.status == RegistrationStatus.REGISTERED,
+                    )
+                )
+            )
+        return query
+
+    async def count_segment(self, segment: dict) -> int:
+        return await self.session.scalar(
+            select(func.count()).select_from(self._segment_query(segment).subquery())
         ) or 0
-        return {
-            "users_total": users_total,
-            "members_active": members_active,
-            "applications_pending": applications_pending,
-            "teams_total": teams_total,
-            "events_total": events_total,
-            "upcoming_events": upcoming,
-            "event_registrations": registrations_total,
+
+    async def create_campaign(
+        self,
+        text: str,
+        segment: dict,
+        *,
+        admin_chat_id: int,
+        status_message_id: Optional[int] = None,
+        chunk_size: int = 500,
+    ) -> Campaign:
+        """Create a campaign and queue one outbox row per recipient in the same transaction."""
+        campaign = Campaign(
+            text=text,
+            segment=json.dumps(segment, ensure_ascii=False),
+            admin_chat_id=admin_chat_id,
+            status_message_id=status_message_id,
+        )
+        self.session.add(campaign)
+        await self.session.flush()
+        recipients = (await self.session.execute(self._segment_query(segment).order_by(User.id))).all()
+        for start in range(0, len(recipients), chunk_size):
+            await self.enqueue_member_notifications(
+                [
+                    {
+                        "channel": OutboxChannel.TELEGRAM,
+                        "payload": {"chat_id": row.telegram_id, "text": text},
+                        "dedup_key": f"campaign:{campaign.id}:{row.id}",
+                        "campaign_id": campaign.id,
+                        "user_id": row.id,
+                    }
+                    for row in recipients[start : start + chunk_size]
+                ]
+            )
+        campaign.total = len(recipients)
+        if not recipients:
+            campaign.status = CampaignStatus.DONE
+            campaign.finished_at = datetime.utcnow()
+        await self.session.flush()
+        return campaign
+
+    async def list_running_campaigns(self) -> Sequence[Campaign]:
+        result = await self.session.execute(
+            select(Campaign).where(Campaign.status == CampaignStatus.RUNNING).order_by(Campaign.id)
+        )
+        return result.scalars().all()
+
+    async def campaign_progress(self, campaign_ids: Sequence[int]) -> dict:
+        """Outbox counters per campaign: ``{campaign_id: {"pending": n, "sent": n, "dead": n}}``."""
+        progress = {
+            campaign_id: {status.value: 0 for status in OutboxStatus} for campaign_id in campaign_ids
         }
+        if not campaign_ids:
+            return progress
+        result = await self.session.execute(
+            select(OutboxMessage.campaign_id, OutboxMessage.status, func.count(OutboxMessage.id))
+            .where(OutboxMessage.campaign_id.in_(campaign_ids))
+            .group_by(OutboxMessage.campaign_id, OutboxMessage.status)
+        )
+        for campaign_id, status, count in result:
+            progress[campaign_id][status.value] = count
+        return progress
+
+    async def finish_campaigns(self, campaign_ids: Sequence[int]) -> None:
+        if not campaign_ids:
+            return
+        await self.session.execute(
+            update(Campaign)
+            .where(Campaign.id.in_(campaign_ids))
+            .values(status=CampaignStatus.DONE, finished_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+
+    # Statistics and exports
+    async def get_statistics(self) -> dict:
+        """Club-wide counters in one round trip (one scalar subquery per counter)."""
+
+        def count(column, *where):
+            return select(func.count(column)).where(*where).scalar_subquery()
+
+        row = (
+            await self.session.execute(
+                select(
+                    count(User.id).label("users_total"),
+                    count(User.id, User.status == MembershipStatus.ACTIVE).label("members_active"),
+                    count(Application.id, Application.status == ApplicationStatus.PENDING).label(
+                        "applications_pending"
+                    ),
+                    count(Team.id).label("teams_total"),
+                    count(Event.id).label("events_total"),
+                    count(Event.id, Event.start_at >= datetime.utcnow()).label("upcoming_events"),
+                    count(
+                        EventRegistration.id, EventRegistration.status == RegistrationStatus.REGISTERED
+                    ).label("event_registrations"),
+                )
+            )
+        ).one()
+        return {key: value or 0 for key, value in row._mapping.items()}
+
+    async def record_stats_samples(self, samples: Sequence[dict]) -> None:
+        """Write one row per ``(resolution, bucket_start)``; a later sample of the same bucket replaces it."""
+        if not samples:
+            return
+        dialect = self.session.get_bind().dialect.name
+        if dialect not in ("sqlite", "postgresql"):
+            for sample in samples:
+                await self.session.execute(
+                    delete(StatsSample).where(
+                        StatsSample.resolution == sample["resolution"],
+                        StatsSample.bucket_start == sample["bucket_start"],
+                    )
+                )
+            await self.session.execute(insert(StatsSample), list(samples))
+            return
+        statement = (sqlite if dialect == "sqlite" else postgresql).insert(StatsSample)
+        columns = [key for key in samples[0] if key not in ("resolution", "bucket_start")]
+        await self.session.execute(
+            statement.on_conflict_do_update(
+                index_elements=[StatsSample.resolution, StatsSample.bucket_start],
+                set_={column: statement.excluded[column] for column in columns},
+            ),
+            list(samples),
+        )
+
+    async def prune_stats_samples(self, resolution: StatsResolution, before: datetime) -> int:
+        result = await self.session.execute(
+            delete(StatsSample).where(StatsSample.resolution == resolution, StatsSample.bucket_start < before)
+        )
+        return result.rowcount or 0
+
+    async def list_stats_samples(
+        self, resolution: StatsResolution, start: datetime, end: datetime
+    ) -> Sequence[StatsSample]:
+        result = await self.session.execute(
+            select(StatsSample)
+            .where(
+                StatsSample.resolution == resolution,
+                StatsSample.bucket_start >= start,
+                StatsSample.bucket_start <= end,
+            )
+            .order_by(StatsSample.bucket_start.asc())
+        )
+        return result.scalars().all()
+
+    async def get_dashboard_version(self) -> tuple:
+        """A cheap fingerprint of everything the dashboard shows.
+
+        Row counts catch inserts and deletes, ``max(updated_at)`` catches
+        updates (``TimestampMixin`` bumps it, also for bulk ``update()``), and
+        the number of upcoming events changes when one starts.
+        """
+        columns = []
+        for model in (User, Application, Team, Event, EventRegistration):
+            columns.append(select(func.count(model.id)).scalar_subquery())
+            columns.append(select(func.max(model.updated_at)).scalar_subquery())
+        columns.append(
+            select(func.count(Event.id)).where(Event.start_at >= datetime.utcnow()).scalar_subquery()
+        )
+        return tuple((await self.session.execute(select(*columns))).one())
+
+    async def get_dashboard_payload(self) -> dict:
+        """Everything the web dashboard renders: counters plus per-event registrations.
+
+        Registrations are counted by a grouped query instead of loading every
+        registration and its user.
+        """
+        stats = await self.get_statistics()
+        registered = func.count(EventRegistration.id)
+        result = await self.session.execute(
+            select(Event.id, Event.title, Event.location, Event.start_at, registered.label("registrations"))
+            .outerjoin(
+                EventRegistration,
+                (EventRegistration.event_id == Event.id)
+                & (EventRegistration.status == RegistrationStatus.REGISTERED),
+            )
+            .group_by(Event.id)
+            .order_by(Event.start_at.asc())
+        )
+        return {"stats": stats, "events": [dict(row._mapping) for row in result]}
+
+    async def stream_read_page(
+        self,
+        read_model,
+        fields: Sequence[str],
+        clauses: Sequence,
+        after_id: Optional[int],
+        limit: int,
+        batch_size: int = 500,
+    ) -> AsyncIterator[Sequence]:
+        """Rows of one API page, fetched from a server-side cursor ``batch_size`` at a time."""
+        result = await self.session.stream(read_model.page_query(fields, clauses, after_id, limit))
+        async for rows in result.partitions(batch_size):
+            yield rows
 
     async def export_users_csv(self, path: Path) -> Path:
         users = await self.session.execute(select(User).order_by(User.full_name.asc()))
@@ -849,6 +1884,74 @@ class ClubService:
         workbook.save(path)
         return path
 
+    def _event_participants_query(self, event_id: int):
+        return (
+            select(
+                EventRegistration.id,
+                User.telegram_id,
+                User.full_name,
+                User.username,
+                User.email,
+                User.phone,
+                User.group_name,
+                EventRegistration.status,
+                EventRegistration.attended,
+            )
+            .join(User, User.id == EventRegistration.user_id)
+            .where(EventRegistration.event_id == event_id)
+            .order_by(EventRegistration.id.asc())
+            .execution_options(yield_per=500)
+        )
+
+    @staticmethod
+    def _participant_row(row) -> list:
+        return [
+            row.id,
+            row.telegram_id,
+            row.full_name,
+            row.username or "",
+            row.email,
+            row.phone or "",
+            row.group_name or "",
+            row.status.value,
+            "Да" if row.attended else "Нет",
+        ]
+
+    _PARTICIPANT_HEADER = [
+        "ID регистрации",
+        "Telegram ID",
+        "Имя",
+        "Username",
+        "Email",
+        "Телефон",
+        "Группа",
+        "Статус",
+        "Пришёл",
+    ]
+
+    async def export_event_participants_csv(self, event_id: int, path: Path) -> Path:
+        """Stream participants straight from the cursor into the CSV file."""
+        result = await self.session.stream(self._event_participants_query(event_id))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", newline="", encoding="utf-8") as fp:
+            writer = csv.writer(fp)
+            writer.writerow(self._PARTICIPANT_HEADER)
+            async for row in result:
+                writer.writerow(self._participant_row(row))
+        return path
+
+    async def export_event_participants_xlsx(self, event_id: int, path: Path) -> Path:
+        result = await self.session.stream(self._event_participants_query(event_id))
+        # write_only keeps openpyxl from holding every cell object in memory
+        workbook: Workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet("Участники")
+        sheet.append(self._PARTICIPANT_HEADER)
+        async for row in result:
+            sheet.append(self._participant_row(row))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        workbook.save(path)
+        return path
+
     async def _add_points(self, user: User, points: int) -> None:
         user.points += points
         await self.session.flush()
@@ -882,6 +1985,30 @@ class ClubService:
                 self.session.add(award)
         await self.session.flush()
 
+    async def _assign_achievements_bulk(self, user_ids: Sequence[int]) -> None:
+        users = await self.session.execute(
+            select(User.id, User.points).where(User.id.in_(user_ids))
+        )
+        points_by_user = {row.id: row.points for row in users}
+        achievements = (
+            await self.session.execute(select(Achievement.id, Achievement.points_required))
+        ).all()
+        owned = await self.session.execute(
+            select(UserAchievement.user_id, UserAchievement.achievement_id).where(
+                UserAchievement.user_id.in_(user_ids)
+            )
+        )
+        owned_pairs = {(row.user_id, row.achievement_id) for row in owned}
+        awards = [
+            {"user_id": user_id, "achievement_id": achievement.id}
+            for user_id, points in points_by_user.items()
+            for achievement in achievements
+            if points >= achievement.points_required
+            and (user_id, achievement.id) not in owned_pairs
+        ]
+        if awards:
+            await self.session.execute(insert(UserAchievement), awards)
+
 
 async def ensure_default_achievements(session: AsyncSession) -> None:
     defaults = [
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, time, timedelta, timezone
+from itertools import groupby
+from typing import List, Optional
+from zoneinfo import ZoneInfo
+
+from ..config import get_settings
+from ..db import session_scope
+from ..models import OutboxChannel
+from .club import ClubService
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+TZ = ZoneInfo(settings.timezone)
+
+DIGEST_HEADER = "Дайджест клуба:"
+MESSAGE_LIMIT = 4096
+
+
+def next_digest_at(now: Optional[datetime] = None) -> datetime:
+    """Next ``DIGEST_HOUR`` in the club timezone, as naive UTC."""
+    now = now or datetime.utcnow()
+    local_now = now.replace(tzinfo=timezone.utc).astimezone(TZ)
+    local_due = datetime.combine(local_now.date(), time(settings.digest_hour), tzinfo=TZ)
+    if local_due <= local_now:
+        local_due += timedelta(days=1)
+    return local_due.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def compose_digest(texts: List[str]) -> List[str]:
+    """Join items into as few messages as fit into Telegram's length limit."""
+    messages = []
+    current = DIGEST_HEADER
+    for text in texts:
+        entry = f"\n\n• {text}"
+        if len(current) + len(entry) > MESSAGE_LIMIT and current != DIGEST_HEADER:
+            messages.append(current)
+            current = DIGEST_HEADER
+        current += entry
+    messages.append(current)
+    return messages
+
+
+async def send_digests(batch_size: int = 1000) -> int:
+    """Turn buffered items into one outbox message per member; returns how many were queued.
+
+    Each batch holds every item of ``batch_size`` members and is composed,
+    queued and removed from ``digest_items`` in one transaction, so a restart
+    neither loses nor repeats a digest, and a member never gets it in halves.
+    """
+    queued = 0
+    while True:
+        async with session_scope() as session:
+            club = ClubService(session)
+            items = await club.list_digest_items(batch_size)
+            if not items:
+                return queued
+            messages = []
+            for user_id, rows in groupby(items, key=lambda row: row.user_id):
+                rows = list(rows)
+                for index, text in enumerate(compose_digest([row.text for row in rows])):
+                    messages.append(
+                        {
+                            "channel": OutboxChannel.TELEGRAM,
+                            "payload": {"chat_id": rows[0].telegram_id, "text": text},
+                            "dedup_key": f"digest:{user_id}:{rows[0].id}:{index}",
+                        }
+                    )
+            await club.enqueue_notifications(messages)
+            await club.delete_digest_items([row.id for row in items])
+            queued += len(messages)
+
+
+async def digest_loop() -> None:
+    while True:
+        delay = (next_digest_at() - datetime.utcnow()).total_seconds()
+        await asyncio.sleep(max(delay, 0))
+        try:
+            queued = await send_digests()
+            logger.info("Поставлено в очередь дайджестов: %s", queued)
+        except Exception as exc:  # pragma: no cover - background job
+            logger.exception("Ошибка в задаче дайджестов: %s", exc)
+        # Step past the digest minute so the next deadline is tomorrow's
+        await asyncio.sleep(1)
+
+
+def start_digest_worker() -> asyncio.Task:
+    return asyncio.create_task(digest_loop())
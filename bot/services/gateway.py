@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Dict, Iterator, List, Tuple
+
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType,
+)
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import Response, TelegramMethod
+from aiogram.methods.base import TelegramType
+
+from ..config import get_settings
+
+if TYPE_CHECKING:
+    from aiogram import Bot
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+INTERACTIVE = 0
+BULK = 1
+
+_lane: ContextVar[int] = ContextVar("telegram_lane", default=INTERACTIVE)
+
+
+@contextmanager
+def bulk_lane() -> Iterator[None]:
+    """Mark Bot API calls made inside the block as bulk traffic (reminders, broadcasts)."""
+    token = _lane.set(BULK)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self) -> float:
+        """Seconds until one token is available (0 when it is available right now)."""
+        self._refill(time.monotonic())
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+    @property
+    def is_full(self) -> bool:
+        self._refill(time.monotonic())
+        return self.tokens >= self.capacity
+
+
+class TelegramGateway(BaseRequestMiddleware):
+    """Outbound Bot API gateway installed as an aiogram session middleware.
+
+    Every call addressed to a chat passes a per-chat and a global token bucket.
+    Waiters for the global bucket are served by lane, so interactive replies
+    overtake queued bulk traffic. ``TelegramRetryAfter`` pauses the gateway for
+    the requested time and the call is retried. Calls without ``chat_id``
+    (getUpdates, answerCallbackQuery, ...) are passed through untouched.
+    """
+
+    def __init__(
+        self,
+        *,
+        global_rate: float,
+        chat_rate: float,
+        chat_burst: float,
+        max_retries: int = 3,
+    ) -> None:
+        self._global = TokenBucket(global_rate, global_rate)
+        self._chat_rate = chat_rate
+        self._chat_burst = chat_burst
+        self._chats: Dict[int | str, TokenBucket] = {}
+        self._max_retries = max_retries
+        self._paused_until = 0.0
+        self._waiters: List[Tuple[int, int]] = []
+        self._counter = itertools.count()
+        self._cond = asyncio.Condition()
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: "Bot",
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        chat_id = getattr(method, "chat_id", None)
+        if chat_id is None:
+            return await make_request(bot, method)
+        lane = _lane.get()
+        attempt = 0
+        while True:
+            await self._acquire_chat(chat_id)
+            await self._acquire_global(lane)
+            try:
+                return await make_request(bot, method)
+            except TelegramRetryAfter as exc:
+                attempt += 1
+                self._paused_until = max(
+                    self._paused_until, time.monotonic() + exc.retry_after
+                )
+                logger.warning(
+                    "Flood control: пауза %s с (chat_id=%s, попытка %s)",
+                    exc.retry_after,
+                    chat_id,
+                    attempt,
+                )
+                if attempt > self._max_retries:
+                    raise
+
+    async def _acquire_chat(self, chat_id: int | str) -> None:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) > 10000:
+                self._chats = {key: b for key, b in self._chats.items() if not b.is_full}
+            bucket = self._chats[chat_id] = TokenBucket(self._chat_rate, self._chat_burst)
+        while (delay := bucket.delay()) > 0:
+            await asyncio.sleep(delay)
+        bucket.take()
+
+    def _global_delay(self) -> float:
+        return max(self._global.delay(), self._paused_until - time.monotonic())
+
+    async def _acquire_global(self, lane: int) -> None:
+        ticket = (lane, next(self._counter))
+        async with self._cond:
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while True:
+                    if self._waiters[0] == ticket:
+                        delay = self._global_delay()
+                        if delay <= 0:
+                            heapq.heappop(self._waiters)
+                            self._global.take()
+                            self._cond.notify_all()
+                            return
+                        try:
+                            await asyncio.wait_for(self._cond.wait(), timeout=delay)
+                        except asyncio.TimeoutError:
+                            pass
+                    else:
+                        await self._cond.wait()
+            except asyncio.CancelledError:
+                if ticket in self._waiters:
+                    self._waiters.remove(ticket)
+                    heapq.heapify(self._waiters)
+                    self._cond.notify_all()
+                raise
+
+
+def install_gateway(bot: "Bot") -> TelegramGateway:
+    gateway = TelegramGateway(
+        global_rate=settings.telegram_global_rate,
+        chat_rate=settings.telegram_chat_rate,
+        chat_burst=settings.telegram_chat_burst,
+    )
+    bot.session.middleware(gateway)
+    return gateway
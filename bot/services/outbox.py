@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from contextlib import suppress
+from datetime import datetime, timedelta
+from typing import List
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError
+from aiogram.types import InlineKeyboardMarkup
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from ..config import get_settings
+from ..db import session_scope
+from ..models import OutboxChannel, OutboxMessage
+from ..utils.emailer import get_email_queue
+from .club import ClubService
+from .gateway import bulk_lane
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+RETRY_BASE_SECONDS = 10
+RETRY_MAX_SECONDS = 3600
+
+_wakeup = asyncio.Event()
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_worker_after_commit(session: Session) -> None:
+    # ClubService.enqueue_notifications flags the session; wake the worker once the rows are visible
+    if session.info.pop("outbox_dirty", False):
+        _wakeup.set()
+
+
+def retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS))
+
+
+def _delivery_key(message: OutboxMessage):
+    if message.channel == OutboxChannel.TELEGRAM:
+        return json.loads(message.payload)["chat_id"]
+    return f"email:{message.id}"
+
+
+async def deliver_outbox_message(bot: Bot, message: OutboxMessage) -> None:
+    payload = json.loads(message.payload)
+    if message.channel == OutboxChannel.TELEGRAM:
+        markup = payload.get("reply_markup")
+        with bulk_lane():
+            await bot.send_message(
+                payload["chat_id"],
+                payload["text"],
+                reply_markup=InlineKeyboardMarkup.model_validate(markup) if markup else None,
+            )
+    else:
+        # Bounded by the email workers; retries stay with the outbox's own bookkeeping
+        await get_email_queue().deliver(
+            payload["subject"], payload["body"], payload["recipients"], payload.get("html")
+        )
+
+
+async def process_outbox_batch(bot: Bot) -> int:
+    """Deliver one leased batch of due messages and record the outcome in a single small commit."""
+    async with session_scope() as session:
+        batch = await ClubService(session).lease_due_outbox(
+            settings.outbox_batch_size, settings.worker_name, settings.worker_lease_seconds
+        )
+    if not batch:
+        return 0
+
+    sent = []
+    failed = []
+    # Chats are served concurrently (the gateway paces them); messages to one chat keep their order
+    by_chat = defaultdict(list)
+    for message in batch:
+        by_chat[_delivery_key(message)].append(message)
+    limiter = asyncio.Semaphore(max(settings.outbox_concurrency, 1))
+
+    async def deliver_chat(messages: List[OutboxMessage]) -> None:
+        async with limiter:
+            for message in messages:
+                try:
+                    await deliver_outbox_message(bot, message)
+                    sent.append(message.id)
+                except (TelegramForbiddenError, TelegramBadRequest) as exc:
+                    # The user blocked the bot or the chat is gone: retrying will not help
+                    failed.append((message, str(exc), True))
+                except Exception as exc:
+                    failed.append((message, repr(exc), False))
+
+    await asyncio.gather(*(deliver_chat(messages) for messages in by_chat.values()))
+
+    now = datetime.utcnow()
+    async with session_scope() as session:
+        club = ClubService(session)
+        await club.mark_outbox_sent(sent)
+        for message, error, permanent in failed:
+            attempts = message.attempts + 1
+            dead = permanent or attempts >= settings.outbox_max_attempts
+            if dead:
+                logger.warning("Сообщение outbox #%s не доставлено: %s", message.id, error)
+            await club.mark_outbox_failed(
+                message.id,
+                error,
+                attempts=attempts,
+                retry_at=now + retry_delay(attempts),
+                dead=dead,
+            )
+    return len(batch)
+
+
+async def outbox_loop(bot: Bot) -> None:
+    while True:
+        _wakeup.clear()
+        try:
+            processed = await process_outbox_batch(bot)
+            if processed >= settings.outbox_batch_size:
+                continue
+        except Exception as exc:  # pragma: no cover - background job
+            logger.exception("Ошибка в задаче outbox: %s", exc)
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(_wakeup.wait(), timeout=settings.outbox_poll_seconds)
+
+
+def start_outbox_worker(bot: Bot) -> asyncio.Task:
+    return asyncio.create_task(outbox_loop(bot))
@@ -0,0 +1,236 @@
+"""Lean read models for the JSON API: column projections with keyset pagination.
+
+Each model maps public field names to columns (or correlated counts), so a
+page is one ``SELECT`` of plain rows ordered by primary key; no ORM objects
+or relationships are loaded. Pages continue from an opaque cursor holding
+the last id instead of an ``OFFSET``, so page 500 costs the same index seek
+as page 1.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+import operator
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple, Type
+
+from sqlalchemy import func, select
+
+from ..models import (
+    Event,
+    EventRegistration,
+    MembershipStatus,
+    RegistrationStatus,
+    Team,
+    TeamMember,
+    User,
+)
+from .club import naive_utc
+
+
+def _parse_bool(value: str) -> bool:
+    lowered = value.lower()
+    if lowered in ("1", "true", "yes"):
+        return True
+    if lowered in ("0", "false", "no"):
+        return False
+    raise ValueError(value)
+
+
+def _parse_datetime(value: str) -> datetime:
+    return naive_utc(datetime.fromisoformat(value.replace("Z", "+00:00")))
+
+
+def _parse_enum(enum: Type[Enum]) -> Callable[[str], Enum]:
+    return lambda value: enum(value.lower())
+
+
+@dataclass(frozen=True)
+class Filter:
+    column: Any
+    parse: Callable[[str], Any]
+    compare: Callable[[Any, Any], Any] = operator.eq
+
+
+@dataclass(frozen=True)
+class ReadModel:
+    name: str
+    model: Any
+    columns: Dict[str, Any]
+    default_fields: Tuple[str, ...]
+    filters: Dict[str, Filter] = field(default_factory=dict)
+
+    def parse_fields(self, value: Optional[str]) -> Tuple[str, ...]:
+        if not value:
+            return self.default_fields
+        names = tuple(dict.fromkeys(name.strip() for name in value.split(",") if name.strip()))
+        unknown = [name for name in names if name not in self.columns]
+        if unknown or not names:
+            raise ValueError(
+                f"Неизвестные поля: {', '.join(unknown) or value}. Доступны: {', '.join(self.columns)}"
+            )
+        return names
+
+    def parse_filters(self, params: Dict[str, str]) -> list:
+        clauses = []
+        for name, raw in params.items():
+            spec = self.filters.get(name)
+            if spec is None:
+                raise ValueError(
+                    f"Неизвестный фильтр: {name}. Доступны: {', '.join(self.filters) or 'нет'}"
+                )
+            try:
+                value = spec.parse(raw)
+            except ValueError:
+                raise ValueError(f"Некорректное значение фильтра {name}: {raw}") from None
+            clauses.append(spec.compare(spec.column, value))
+        return clauses
+
+    def page_query(self, fields: Sequence[str], clauses: Sequence, after_id: Optional[int], limit: int):
+        """``limit + 1`` rows after ``after_id``; the extra row only tells whether another page exists."""
+        key = self.model.id
+        statement = (
+            select(key.label("_cursor"), *(self.columns[name].label(name) for name in fields))
+            .where(*clauses)
+            .order_by(key.asc())
+            .limit(limit + 1)
+        )
+        if after_id is not None:
+            statement = statement.where(key > after_id)
+        return statement
+
+
+def encode_cursor(last_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"id": last_id}).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return int(data["id"])
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise ValueError("Некорректный курсор") from None
+
+
+def _updated_since(model) -> Filter:
+    return Filter(model.updated_at, _parse_datetime, operator.ge)
+
+
+_event_registrations = (
+    select(func.count(EventRegistration.id))
+    .where(
+        EventRegistration.event_id == Event.id,
+        EventRegistration.status == RegistrationStatus.REGISTERED,
+    )
+    .correlate(Event)
+    .scalar_subquery()
+)
+_team_members = (
+    select(func.count(TeamMember.id)).where(TeamMember.team_id == Team.id).correlate(Team).scalar_subquery()
+)
+
+READ_MODELS: Dict[str, ReadModel] = {
+    model.name: model
+    for model in (
+        ReadModel(
+            name="users",
+            model=User,
+            columns={
+                "id": User.id,
+                "telegram_id": User.telegram_id,
+                "username": User.username,
+                "full_name": User.full_name,
+                "email": User.email,
+                "phone": User.phone,
+                "profession": User.profession,
+                "company": User.company,
+                "group_name": User.group_name,
+                "status": User.status,
+                "points": User.points,
+                "email_confirmed": User.email_confirmed,
+                "notify_mode": User.notify_mode,
+                "created_at": User.created_at,
+                "updated_at": User.updated_at,
+            },
+            default_fields=(
+                "id", "telegram_id", "username", "full_name", "email", "group_name", "status", "points"
+            ),
+            filters={
+                "status": Filter(User.status, _parse_enum(MembershipStatus)),
+                "group_name": Filter(User.group_name, str),
+                "updated_since": _updated_since(User),
+            },
+        ),
+        ReadModel(
+            name="events",
+            model=Event,
+            columns={
+                "id": Event.id,
+                "title": Event.title,
+                "description": Event.description,
+                "location": Event.location,
+                "registration_start": Event.registration_start,
+                "registration_end": Event.registration_end,
+                "start_at": Event.start_at,
+                "end_at": Event.end_at,
+                "capacity": Event.capacity,
+                "series_id": Event.series_id,
+                "registrations": _event_registrations,
+                "created_at": Event.created_at,
+                "updated_at": Event.updated_at,
+            },
+            default_fields=("id", "title", "location", "start_at", "end_at", "capacity"),
+            filters={
+                "starts_after": Filter(Event.start_at, _parse_datetime, operator.ge),
+                "starts_before": Filter(Event.start_at, _parse_datetime, operator.lt),
+                "series_id": Filter(Event.series_id, int),
+                "updated_since": _updated_since(Event),
+            },
+        ),
+        ReadModel(
+            name="teams",
+            model=Team,
+            columns={
+                "id": Team.id,
+                "name": Team.name,
+                "description": Team.description,
+                "is_permanent": Team.is_permanent,
+                "owner_id": Team.owner_id,
+                "members": _team_members,
+                "created_at": Team.created_at,
+                "updated_at": Team.updated_at,
+            },
+            default_fields=("id", "name", "is_permanent", "owner_id"),
+            filters={
+                "owner_id": Filter(Team.owner_id, int),
+                "is_permanent": Filter(Team.is_permanent, _parse_bool),
+                "updated_since": _updated_since(Team),
+            },
+        ),
+        ReadModel(
+            name="registrations",
+            model=EventRegistration,
+            columns={
+                "id": EventRegistration.id,
+                "event_id": EventRegistration.event_id,
+                "user_id": EventRegistration.user_id,
+                "status": EventRegistration.status,
+                "attended": EventRegistration.attended,
+                "created_at": EventRegistration.created_at,
+                "updated_at": EventRegistration.updated_at,
+            },
+            default_fields=("id", "event_id", "user_id", "status", "attended"),
+            filters={
+                "event_id": Filter(EventRegistration.event_id, int),
+                "user_id": Filter(EventRegistration.user_id, int),
+                "status": Filter(EventRegistration.status, _parse_enum(RegistrationStatus)),
+                "attended": Filter(EventRegistration.attended, _parse_bool),
+                "updated_since": _updated_since(EventRegistration),
+            },
+        ),
+    )
+}
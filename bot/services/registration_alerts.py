@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Sequence
+from zoneinfo import ZoneInfo
+
+from ..config import get_settings
+from ..db import session_scope
+from ..keyboards.common import event_signup_confirm
+from ..models import OutboxChannel
+from .club import ClubService, naive_utc
+from .scheduler import registration_schedule, run_deadline_loop
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+TZ = ZoneInfo(settings.timezone)
+
+
+async def load_registration_schedule() -> None:
+    async with session_scope() as session:
+        deadlines = await ClubService(session).list_pending_registration_openings()
+    registration_schedule.replace(deadlines)
+
+
+async def notify_registration_opened(event_ids: Sequence[int]) -> int:
+    """Queue "registration is open" messages for the subscribers of the given events.
+
+    Subscribers are read through the ``event_subscriptions`` index and written
+    to the outbox in one transaction; the outbox worker sends them in the bulk
+    lane of the rate-limited gateway.
+    """
+    async with session_scope() as session:
+        club = ClubService(session)
+        events = await club.list_opened_registrations(event_ids)
+        queued = 0
+        for event in events:
+            subscribers = await club.list_event_subscribers(event.id)
+            start_local = event.start_at.astimezone(TZ).strftime("%d.%m %H:%M")
+            closes_local = event.registration_end.astimezone(TZ).strftime("%d.%m %H:%M")
+            text = (
+                f"Открыта регистрация на «{event.title}» ({start_local}).\n"
+                f"Записаться можно до {closes_local}."
+            )
+            markup = event_signup_confirm(event.id).model_dump(exclude_none=True)
+            opened_key = naive_utc(event.registration_start).strftime("%Y%m%d%H%M")
+            await club.enqueue_notifications(
+                [
+                    {
+                        "channel": OutboxChannel.TELEGRAM,
+                        "payload": {"chat_id": row.telegram_id, "text": text, "reply_markup": markup},
+                        "dedup_key": f"registration-open:{event.id}:{row.id}:{opened_key}",
+                    }
+                    for row in subscribers
+                ]
+            )
+            queued += len(subscribers)
+        await club.mark_registration_notified([event.id for event in events])
+    return queued
+
+
+async def registration_alert_loop(resync_seconds: int = 21600) -> None:
+    """Sleep until the next ``registration_start`` and notify its subscribers."""
+    await run_deadline_loop(
+        registration_schedule,
+        load_registration_schedule,
+        notify_registration_opened,
+        label="уведомлений об открытии регистрации",
+        resync_seconds=resync_seconds,
+    )
+
+
+def start_registration_alert_worker(resync_seconds: int = 21600) -> asyncio.Task:
+    return asyncio.create_task(registration_alert_loop(resync_seconds))
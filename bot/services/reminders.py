@@ -2,62 +2,151 @@ from __future__ import annotations
 
 import asyncio
 import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Sequence, Tuple
 from zoneinfo import ZoneInfo
 
-from aiogram import Bot
-
 from ..config import get_settings
 from ..db import session_scope
-from ..models import RegistrationStatus
-from ..utils.emailer import send_email_background
-from .club import ClubService
+from ..models import OutboxChannel
+from ..utils.email_templates import render_email, render_emails
+from .club import ClubService, active_reminder_stage, naive_utc, reminder_stage
+from .digest import next_digest_at
+from .scheduler import reminder_schedule, run_deadline_loop
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 TZ = ZoneInfo(settings.timezone)
 
 
-async def reminder_loop(bot: Bot, interval_seconds: int = 1800) -> None:
-    while True:
-        try:
-            async with session_scope() as session:
-                club = ClubService(session)
-                events = await club.upcoming_events_for_reminder()
-                for event in events:
-                    start_local = event.start_at.astimezone(TZ).strftime("%d.%m %H:%M")
-                    text = (
-                        f"Напоминание: {event.title} начнётся {start_local}.\n"
-                        f"Локация: {event.location or 'уточните у организаторов'}"
-                    )
-                    emails = []
-                    for registration in event.registrations:
-                        if registration.status != RegistrationStatus.REGISTERED:
-                            continue
-                        try:
-                            await bot.send_message(registration.user.telegram_id, text)
-                        except Exception as exc:  # pragma: no cover - logging only
-                            logger.debug(
-                                "Не удалось отправить напоминание tg_id=%s: %s",
-                                registration.user.telegram_id,
-                                exc,
-                            )
-                        if registration.user.email:
-                            emails.append(registration.user.email)
-                    if emails:
-                        send_email_background(
-                            f"Напоминание о мероприятии: {event.title}",
-                            (
-                                f"Мероприятие '{event.title}' начнётся {start_local}.\n"
-                                f"Место: {event.location or 'уточните у организаторов'}.\n"
-                                "До встречи!"
-                            ),
-                            emails,
-                        )
-                    await club.mark_event_reminded(event)
-        except Exception as exc:  # pragma: no cover - background job
-            logger.exception("Ошибка в задаче напоминаний: %s", exc)
-        await asyncio.sleep(interval_seconds)
-
-
-def start_reminder_worker(bot: Bot, interval_seconds: int = 1800) -> asyncio.Task:
-    return asyncio.create_task(reminder_loop(bot, interval_seconds))
+async def load_reminder_schedule() -> None:
+    async with session_scope() as session:
+        deadlines = await ClubService(session).list_pending_reminders()
+    reminder_schedule.replace(deadlines)
+
+
+async def _enqueue_reminder_emails(club: ClubService, rows: Sequence, event: dict, dedup_key: str) -> None:
+    if not rows or not settings.has_smtp_credentials:
+        return
+    if settings.email_batch_size <= 1:
+        # One message per member, so each can be addressed by name
+        emails = await render_emails("event_reminder", [{**event, "name": row.full_name} for row in rows])
+        await club.enqueue_personal_emails(
+            [(row.email, email) for row, email in zip(rows, emails)], dedup_key=dedup_key
+        )
+    else:
+        email = render_email("event_reminder", **event, name=None)
+        await club.enqueue_email(
+            email.subject, email.text, [row.email for row in rows], html=email.html, dedup_key=dedup_key
+        )
+
+
+async def claim_reminders(due: Sequence[Tuple[int, int]]) -> int:
+    """Queue reminders for due ``(event_id, stage_hours)`` keys in one short transaction.
+
+    Only registrations without a ``(registration_id, stage)`` ledger row are
+    picked, so retries, late registrants and moved events never produce a
+    duplicate. A stage superseded by a later one (e.g. the 24h reminder of an
+    event created an hour before its start) is skipped. The outbox worker
+    sends the queued messages later with no transaction held open. Leases taken
+    by ``process_due_reminders`` are released in the same commit.
+    """
+    if not due:
+        return 0
+    event_ids = list({key[0] for key in due})
+    async with session_scope() as session:
+        club = ClubService(session)
+        events = {row.id: row for row in await club.list_due_reminder_events(event_ids)}
+        now = datetime.utcnow()
+        by_stage = defaultdict(list)
+        for event_id, hours in due:
+            event = events.get(event_id)
+            if event is not None and active_reminder_stage(event.start_at, now) == hours:
+                by_stage[hours].append(event_id)
+
+        queued = 0
+        reminded = set()
+        digest_deadline = next_digest_at(now)
+        for hours, stage_event_ids in by_stage.items():
+            stage = reminder_stage(hours)
+            recipients = defaultdict(list)
+            for row in await club.list_reminder_recipients(stage_event_ids, stage):
+                recipients[row.event_id].append(row)
+            for event_id, rows in recipients.items():
+                event = events[event_id]
+                # The start time is part of the key so a moved event can be reminded again
+                start_key = event.start_at.strftime("%Y%m%d%H%M")
+                start_local = event.start_at.astimezone(TZ).strftime("%d.%m %H:%M")
+                text = (
+                    f"Напоминание: {event.title} начнётся {start_local}.\n"
+                    f"Локация: {event.location or 'уточните у организаторов'}"
+                )
+                messages = [
+                    {
+                        "channel": OutboxChannel.TELEGRAM,
+                        "payload": {"chat_id": row.telegram_id, "text": text},
+                        "dedup_key": f"reminder:{row.registration_id}:{stage}:{start_key}",
+                        "user_id": row.user_id,
+                    }
+                    for row in rows
+                ]
+                if naive_utc(event.start_at) > digest_deadline:
+                    # The digest goes out before the event starts, so digest members can wait for it
+                    await club.enqueue_member_notifications(messages)
+                else:
+                    await club.enqueue_notifications(messages)
+                await _enqueue_reminder_emails(
+                    club,
+                    [row for row in rows if row.email],
+                    {"title": event.title, "start": start_local, "location": event.location},
+                    f"reminder-email:{event_id}:{stage}:{start_key}",
+                )
+                await club.record_reminder_deliveries([row.registration_id for row in rows], stage)
+                queued += len(rows)
+                reminded.add(event_id)
+        if reminded:
+            await club.mark_events_reminded(list(reminded))
+        await club.release_reminder_events(event_ids, settings.worker_name)
+    return queued
+
+
+async def process_due_reminders(due: Sequence[Tuple[int, int]]) -> int:
+    """Lease the due events, then claim their reminders.
+
+    Keys of events leased by another process are rescheduled for the moment
+    that lease expires: by then the holder has either recorded its deliveries
+    in the ledger (the retry is a no-op) or crashed (the retry takes over).
+    """
+    async with session_scope() as session:
+        leased, busy = await ClubService(session).lease_reminder_events(
+            list({key[0] for key in due}), settings.worker_name, settings.worker_lease_seconds
+        )
+    retry_at = datetime.utcnow() + timedelta(seconds=settings.worker_lease_seconds)
+    mine = []
+    for key in due:
+        if key[0] in busy:
+            reminder_schedule.schedule(key, busy[key[0]] or retry_at)
+        elif key[0] in leased:
+            mine.append(key)
+    try:
+        return await claim_reminders(mine)
+    except Exception:
+        for key in mine:
+            reminder_schedule.schedule(key, retry_at)
+        raise
+
+
+async def reminder_loop(resync_seconds: int = 21600) -> None:
+    """Sleep until the next reminder deadline instead of polling."""
+    await run_deadline_loop(
+        reminder_schedule,
+        load_reminder_schedule,
+        process_due_reminders,
+        label="напоминаний",
+        resync_seconds=resync_seconds,
+    )
+
+
+def start_reminder_worker(resync_seconds: int = 21600) -> asyncio.Task:
+    return asyncio.create_task(reminder_loop(resync_seconds))
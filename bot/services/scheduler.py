@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from contextlib import suppress
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Hashable, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+
+class DeadlineScheduler:
+    """Min-heap of deadlines keyed by an id, with lazy deletion.
+
+    Rescheduling a key simply pushes a new entry; stale heap entries are
+    dropped when they reach the top. All times are naive UTC, like the
+    values stored in the database.
+    """
+
+    def __init__(self) -> None:
+        self._heap: List[Tuple[datetime, int, Hashable]] = []
+        self._due: Dict[Hashable, datetime] = {}
+        self._counter = itertools.count()
+        self._changed = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def schedule(self, key: Hashable, due_at: datetime) -> None:
+        self._due[key] = due_at
+        heapq.heappush(self._heap, (due_at, next(self._counter), key))
+        self._changed.set()
+
+    def cancel(self, key: Hashable) -> None:
+        if self._due.pop(key, None) is not None:
+            self._changed.set()
+
+    def replace(self, deadlines: Mapping[Hashable, datetime]) -> None:
+        self._due = dict(deadlines)
+        self._heap = [(due, next(self._counter), key) for key, due in self._due.items()]
+        heapq.heapify(self._heap)
+        self._changed.set()
+
+    def _discard_stale(self) -> None:
+        while self._heap:
+            due_at, _, key = self._heap[0]
+            if self._due.get(key) == due_at:
+                return
+            heapq.heappop(self._heap)
+
+    def next_due(self) -> Optional[datetime]:
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: datetime) -> List[Hashable]:
+        keys = []
+        while True:
+            self._discard_stale()
+            if not self._heap or self._heap[0][0] > now:
+                return keys
+            _, _, key = heapq.heappop(self._heap)
+            del self._due[key]
+            keys.append(key)
+
+    async def wait(self, max_seconds: float) -> None:
+        """Sleep until the earliest deadline, ``max_seconds`` or a schedule change."""
+        self._changed.clear()
+        timeout = max_seconds
+        next_due = self.next_due()
+        if next_due is not None:
+            timeout = min(timeout, (next_due - datetime.utcnow()).total_seconds())
+        if timeout <= 0:
+            return
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self._changed.wait(), timeout=timeout)
+
+
+def schedule_after_commit(
+    session,
+    scheduler: DeadlineScheduler,
+    deadlines: Mapping[Hashable, Optional[datetime]],
+) -> None:
+    """Stage deadline changes on a session; ``None`` cancels a key.
+
+    They reach ``scheduler`` only once the transaction commits, so a worker
+    never wakes up for rows it cannot see yet.
+    """
+    session.info.setdefault("deadline_changes", {}).setdefault(scheduler, {}).update(deadlines)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_deadlines_after_commit(session: Session) -> None:
+    for scheduler, deadlines in session.info.pop("deadline_changes", {}).items():
+        for key, due_at in deadlines.items():
+            if due_at is None:
+                scheduler.cancel(key)
+            else:
+                scheduler.schedule(key, due_at)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_deadlines_after_rollback(session: Session) -> None:
+    session.info.pop("deadline_changes", None)
+
+
+async def run_deadline_loop(
+    scheduler: DeadlineScheduler,
+    load: Callable[[], Awaitable[None]],
+    handle: Callable[[Sequence[Hashable]], Awaitable[int]],
+    *,
+    label: str,
+    resync_seconds: int,
+) -> None:
+    """Sleep until the next deadline of ``scheduler`` and pass the due keys to ``handle``.
+
+    ``load`` fills the schedule from the database at startup and every
+    ``resync_seconds``, picking up rows written by other processes or bulk
+    inserts that bypass the ``ClubService`` hooks. ``handle`` returns how many
+    messages it queued; ``label`` names them in the log.
+    """
+    last_sync = None
+    while True:
+        try:
+            if last_sync is None or time.monotonic() - last_sync >= resync_seconds:
+                await load()
+                last_sync = time.monotonic()
+            due = scheduler.pop_due(datetime.utcnow())
+            if due:
+                queued = await handle(due)
+                logger.info("Поставлено в очередь %s: %s", label, queued)
+        except Exception as exc:  # pragma: no cover - background job
+            logger.exception("Ошибка в задаче %s: %s", label, exc)
+            await asyncio.sleep(5)
+        until_resync = resync_seconds - (time.monotonic() - (last_sync or time.monotonic()))
+        await scheduler.wait(max(until_resync, 0))
+
+
+reminder_schedule = DeadlineScheduler()
+registration_schedule = DeadlineScheduler()
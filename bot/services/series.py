@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from ..db import session_scope
+from .club import ClubService
+
+logger = logging.getLogger(__name__)
+
+
+async def series_loop(interval_seconds: int = 21600) -> None:
+    while True:
+        try:
+            async with session_scope() as session:
+                club = ClubService(session)
+                for series in await club.list_active_series():
+                    created = await club.materialize_series(series)
+                    if created:
+                        logger.info("Серия #%s: создано мероприятий — %s", series.id, created)
+        except Exception as exc:  # pragma: no cover - background job
+            logger.exception("Ошибка в задаче серий мероприятий: %s", exc)
+        await asyncio.sleep(interval_seconds)
+
+
+def start_series_worker(interval_seconds: int = 21600) -> asyncio.Task:
+    return asyncio.create_task(series_loop(interval_seconds))
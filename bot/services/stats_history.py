@@ -0,0 +1,123 @@
+"""History of the club counters for trend charts.
+
+Every ``STATS_SAMPLE_MINUTES`` the counters are written into the raw, hourly,
+daily and weekly series at once: each series keeps one row per bucket, and a
+later sample of the same bucket replaces the earlier one. Raw and hourly rows
+are pruned after their retention; daily and weekly rows are kept forever
+(about 420 rows per year).
+
+A range query picks the finest series that covers the range in at most
+``max_points`` buckets, so a chart costs one index range scan of a bounded
+number of rows however much history has accumulated.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from ..config import get_settings
+from ..db import session_scope
+from ..models import StatsResolution
+from .club import ClubService, naive_utc
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+STATS_HISTORY_KEYS = ["users_total", "members_active", "applications_pending", "event_registrations"]
+MAX_POINTS = 400
+
+RESOLUTION_STEPS: Dict[StatsResolution, timedelta] = {
+    StatsResolution.RAW: timedelta(minutes=settings.stats_sample_minutes),
+    StatsResolution.HOUR: timedelta(hours=1),
+    StatsResolution.DAY: timedelta(days=1),
+    StatsResolution.WEEK: timedelta(weeks=1),
+}
+
+
+def retention(resolution: StatsResolution) -> Optional[timedelta]:
+    if resolution == StatsResolution.RAW:
+        return timedelta(days=settings.stats_raw_retention_days)
+    if resolution == StatsResolution.HOUR:
+        return timedelta(days=settings.stats_hourly_retention_days)
+    return None
+
+
+def bucket_start(resolution: StatsResolution, moment: datetime) -> datetime:
+    """Start of the UTC bucket containing ``moment`` (naive UTC); weeks start on Monday."""
+    if resolution == StatsResolution.RAW:
+        step = settings.stats_sample_minutes
+        return moment.replace(minute=moment.minute - moment.minute % step, second=0, microsecond=0)
+    hour = moment.replace(minute=0, second=0, microsecond=0)
+    if resolution == StatsResolution.HOUR:
+        return hour
+    day = hour.replace(hour=0)
+    if resolution == StatsResolution.DAY:
+        return day
+    return day - timedelta(days=day.weekday())
+
+
+def choose_resolution(
+    start: datetime, end: datetime, max_points: int = MAX_POINTS, now: Optional[datetime] = None
+) -> StatsResolution:
+    """The finest series still kept for ``start`` that spans the range in ``max_points`` buckets."""
+    now = now or datetime.utcnow()
+    for resolution, step in RESOLUTION_STEPS.items():
+        kept = retention(resolution)
+        if kept is not None and start < now - kept:
+            continue
+        if (end - start) / step <= max_points:
+            return resolution
+    return StatsResolution.WEEK
+
+
+async def record_stats_sample(club: ClubService, now: Optional[datetime] = None) -> dict:
+    now = now or datetime.utcnow()
+    stats = await club.get_statistics()
+    values = {key: stats[key] for key in STATS_HISTORY_KEYS}
+    await club.record_stats_samples(
+        [
+            {"resolution": resolution, "bucket_start": bucket_start(resolution, now), "sampled_at": now, **values}
+            for resolution in RESOLUTION_STEPS
+        ]
+    )
+    for resolution in RESOLUTION_STEPS:
+        kept = retention(resolution)
+        if kept is not None:
+            await club.prune_stats_samples(resolution, now - kept)
+    return values
+
+
+async def load_stats_history(
+    club: ClubService, start: datetime, end: datetime, max_points: int = MAX_POINTS
+) -> dict:
+    """Series for a chart: ``{"resolution", "keys", "points": [{"t", <key>...}]}``."""
+    resolution = choose_resolution(start, end, max_points)
+    rows = await club.list_stats_samples(resolution, bucket_start(resolution, start), end)
+    return {
+        "resolution": resolution.value,
+        "keys": STATS_HISTORY_KEYS,
+        "points": [
+            {
+                "t": naive_utc(row.bucket_start).replace(tzinfo=timezone.utc).isoformat(),
+                **{key: getattr(row, key) for key in STATS_HISTORY_KEYS},
+            }
+            for row in rows
+        ],
+    }
+
+
+async def stats_loop() -> None:
+    while True:
+        try:
+            async with session_scope() as session:
+                await record_stats_sample(ClubService(session))
+        except Exception as exc:  # pragma: no cover - background job
+            logger.exception("Ошибка в задаче статистики: %s", exc)
+        await asyncio.sleep(settings.stats_sample_minutes * 60)
+
+
+def start_stats_worker() -> asyncio.Task:
+    return asyncio.create_task(stats_loop())
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, Template, select_autoescape
+
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "templates" / "email"
+
+
+@dataclass(frozen=True)
+class RenderedEmail:
+    subject: str
+    text: str
+    html: Optional[str]
+
+
+class EmailTemplates:
+    """Email templates from ``bot/templates/email``, compiled once.
+
+    Every email is a ``<name>.txt`` template that sets ``subject`` with
+    ``{% set %}`` and renders the plain-text body, plus an optional
+    ``<name>.html`` alternative. Files starting with ``_`` are layouts.
+    """
+
+    def __init__(self, directory: Path = TEMPLATE_DIR) -> None:
+        self.env = Environment(
+            loader=FileSystemLoader(directory),
+            autoescape=select_autoescape(["html"]),
+            undefined=StrictUndefined,
+            trim_blocks=True,
+            lstrip_blocks=True,
+        )
+        self._templates: Dict[str, Tuple[Template, Optional[Template]]] = {}
+        for path in sorted(directory.glob("*.txt")):
+            html_path = path.with_suffix(".html")
+            self._templates[path.stem] = (
+                self.env.get_template(path.name),
+                self.env.get_template(html_path.name) if html_path.exists() else None,
+            )
+
+    def render(self, name: str, /, **context) -> RenderedEmail:
+        try:
+            text_template, html_template = self._templates[name]
+        except KeyError:
+            raise ValueError(f"Шаблон письма «{name}» не найден") from None
+        module = text_template.make_module(context)
+        subject = module.subject
+        html = html_template.render(context, subject=subject) if html_template else None
+        return RenderedEmail(subject=subject, text=str(module).strip() + "\n", html=html)
+
+
+_templates: Optional[EmailTemplates] = None
+
+
+def get_email_templates() -> EmailTemplates:
+    global _templates
+    if _templates is None:
+        _templates = EmailTemplates()
+    return _templates
+
+
+def render_email(name: str, /, **context) -> RenderedEmail:
+    return get_email_templates().render(name, **context)
+
+
+async def render_emails(name: str, contexts: Sequence[dict]) -> List[RenderedEmail]:
+    """Render one template for many recipients in a worker thread, off the event loop."""
+    templates = get_email_templates()
+    return await asyncio.to_thread(lambda: [templates.render(name, **context) for context in contexts])
@@ -2,8 +2,14 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from email.message import EmailMessage
-from typing import Iterable
+import time
+from contextlib import suppress
+from dataclasses import dataclass, field
+from email.header import Header
+from email.message import Message
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Awaitable, Callable, Iterable, List, Optional, Sequence, Tuple
 
 import aiosmtplib
 
@@ -13,37 +19,400 @@ logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
-async def send_email(subject: str, body: str, recipients: Iterable[str]) -> None:
+def build_message(
+    subject: str, body: str, recipients: Iterable[str], html: Optional[str] = None
+) -> Message:
+    """Build a message addressed to one recipient, or to undisclosed recipients for several.
+
+    Several recipients go in the SMTP envelope only (pass them to ``send``),
+    never in a header, so they do not see each other's addresses. With
+    ``html`` the message is multipart/alternative with both bodies.
+
+    Uses the ``email.mime`` classes: ``EmailMessage`` with the default policy
+    parses every header through the header registry and is about ten times
+    slower to build.
+    """
+    recipients = list(recipients)
+    if html:
+        message = MIMEMultipart("alternative")
+        message.attach(MIMEText(body, "plain", "utf-8"))
+        message.attach(MIMEText(html, "html", "utf-8"))
+    else:
+        message = MIMEText(body, "plain", "utf-8")
+    message["From"] = settings.smtp_from
+    message["To"] = recipients[0] if len(recipients) == 1 else "undisclosed-recipients:;"
+    message["Subject"] = Header(subject, "utf-8")
+    return message
+
+
+def encode_message(subject: str, body: str, recipients: Iterable[str], html: Optional[str] = None) -> bytes:
+    return build_message(subject, body, recipients, html).as_bytes()
+
+
+class SMTPPool:
+    """A few authenticated SMTP connections reused across sends.
+
+    Connecting, EHLO, STARTTLS and AUTH happen once per connection instead of
+    once per message. Connections idle for longer than ``idle_timeout`` are
+    closed on the next checkout, ones idle for more than ``health_check_after``
+    are probed with NOOP first, and a send that fails because the server
+    dropped the connection is retried once on a fresh one.
+    """
+
+    def __init__(
+        self,
+        *,
+        hostname: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        start_tls: bool = True,
+        size: int = 2,
+        idle_timeout: float = 60.0,
+        health_check_after: float = 5.0,
+        timeout: float = 30.0,
+    ) -> None:
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.start_tls = start_tls
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.health_check_after = health_check_after
+        self.timeout = timeout
+        self.open_connections = 0
+        self._idle: List[Tuple[aiosmtplib.SMTP, float]] = []
+        self._slots = asyncio.Semaphore(size)
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        client = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            username=self.username,
+            password=self.password,
+            start_tls=self.start_tls,
+            timeout=self.timeout,
+        )
+        await client.connect()
+        self.open_connections += 1
+        return client
+
+    async def _discard(self, client: aiosmtplib.SMTP) -> None:
+        self.open_connections -= 1
+        with suppress(Exception):
+            if client.is_connected:
+                await client.quit()
+        client.close()
+
+    async def _checkout(self) -> aiosmtplib.SMTP:
+        while self._idle:
+            client, last_used = self._idle.pop()
+            idle_for = time.monotonic() - last_used
+            if idle_for > self.idle_timeout or not client.is_connected:
+                await self._discard(client)
+                continue
+            if idle_for > self.health_check_after:
+                try:
+                    await client.noop()
+                except aiosmtplib.SMTPException:
+                    await self._discard(client)
+                    continue
+            return client
+        return await self._connect()
+
+    def _checkin(self, client: aiosmtplib.SMTP) -> None:
+        self._idle.append((client, time.monotonic()))
+
+    async def _run(self, operation: Callable[[aiosmtplib.SMTP], Awaitable]) -> None:
+        async with self._slots:
+            client = await self._checkout()
+            try:
+                await operation(client)
+            except (aiosmtplib.SMTPServerDisconnected, ConnectionError):
+                await self._discard(client)
+                client = await self._connect()
+                try:
+                    await operation(client)
+                except BaseException:
+                    await self._discard(client)
+                    raise
+            except aiosmtplib.SMTPResponseException:
+                # The server rejected this message; the session is usually still usable,
+                # unless the reply was a 421 or the connection dropped meanwhile
+                try:
+                    await client.rset()
+                except Exception:
+                    await self._discard(client)
+                except BaseException:
+                    await self._discard(client)
+                    raise
+                else:
+                    self._checkin(client)
+                raise
+            except BaseException:
+                await self._discard(client)
+                raise
+            self._checkin(client)
+
+    async def send(self, message: Message, recipients: Optional[Sequence[str]] = None) -> None:
+        await self._run(lambda client: client.send_message(message, recipients=recipients))
+
+    async def send_raw(self, sender: str, recipients: Sequence[str], data: bytes) -> None:
+        """Send an already serialized message, skipping aiosmtplib's flattening on the event loop."""
+        await self._run(lambda client: client.sendmail(sender, recipients, data))
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for client, _ in idle:
+            await self._discard(client)
+
+
+_pool: Optional[SMTPPool] = None
+
+
+def get_smtp_pool() -> SMTPPool:
+    global _pool
+    if _pool is None:
+        _pool = SMTPPool(
+            hostname=settings.smtp_host,
+            port=settings.smtp_port,
+            username=settings.smtp_user,
+            password=settings.smtp_password,
+            start_tls=settings.smtp_start_tls,
+            size=settings.smtp_pool_size,
+            idle_timeout=settings.smtp_idle_timeout,
+        )
+    return _pool
+
+
+async def close_smtp_pool() -> None:
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+async def deliver_email(
+    subject: str, body: str, recipients: Iterable[str], html: Optional[str] = None
+) -> None:
+    """Send a message and let SMTP errors propagate to the caller.
+
+    MIME assembly and serialization run in a worker thread so bulk sends do
+    not stall the event loop.
+    """
     recipients = list(recipients)
     if not recipients:
         return
     if not settings.has_smtp_credentials:
         logger.info("SMTP credentials are not configured. Skipping email send: %s", subject)
         return
+    data = await asyncio.to_thread(encode_message, subject, body, recipients, html)
+    await get_smtp_pool().send_raw(settings.smtp_from, recipients, data)
+    logger.info("Email sent to %s", recipients)
 
-    message = EmailMessage()
-    message["From"] = settings.smtp_from
-    message["To"] = ", ".join(recipients)
-    message["Subject"] = subject
-    message.set_content(body)
 
+async def send_email(
+    subject: str, body: str, recipients: Iterable[str], html: Optional[str] = None
+) -> None:
     try:
-        await aiosmtplib.send(
-            message,
-            hostname=settings.smtp_host,
-            port=settings.smtp_port,
-            username=settings.smtp_user,
-            password=settings.smtp_password,
-            start_tls=True,
-        )
-        logger.info("Email sent to %s", recipients)
+        await deliver_email(subject, body, recipients, html)
     except Exception as exc:  # pragma: no cover - this is best effort logging
         logger.exception("Failed to send email: %s", exc)
 
 
-def send_email_background(subject: str, body: str, recipients: Iterable[str]) -> None:
+@dataclass
+class EmailJob:
+    subject: str
+    body: str
+    recipients: List[str]
+    html: Optional[str]
+    max_attempts: int
+    enqueued_at: float = field(default_factory=time.monotonic)
+    attempts: int = 0
+    result: Optional[asyncio.Future] = None
+
+
+class EmailQueue:
+    """One bounded queue of outgoing email drained by a fixed set of workers.
+
+    ``submit`` waits while the queue is full, so a burst of reminders slows the
+    producer down instead of opening an unbounded number of SMTP sessions.
+    Failed sends are retried with a growing delay up to ``max_attempts``; on
+    shutdown the workers finish what is already queued (up to
+    ``drain_timeout`` seconds). ``metrics()`` reports queue depth, in-flight
+    sends, outcomes and enqueue-to-delivery latency.
+    """
+
+    def __init__(
+        self,
+        *,
+        workers: int = 2,
+        maxsize: int = 1000,
+        max_attempts: int = 3,
+        retry_delay: float = 5.0,
+        drain_timeout: float = 30.0,
+    ) -> None:
+        self.workers = max(workers, 1)
+        self.max_attempts = max(max_attempts, 1)
+        self.retry_delay = retry_delay
+        self.drain_timeout = drain_timeout
+        self._queue: asyncio.Queue[EmailJob] = asyncio.Queue(maxsize)
+        self._tasks: List[asyncio.Task] = []
+        self._delayed: set[asyncio.Task] = set()
+        self.in_flight = 0
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def _job(
+        self,
+        subject: str,
+        body: str,
+        recipients: Iterable[str],
+        html: Optional[str],
+        max_attempts: Optional[int],
+    ) -> EmailJob:
+        return EmailJob(subject, body, list(recipients), html, max_attempts or self.max_attempts)
+
+    async def submit(
+        self,
+        subject: str,
+        body: str,
+        recipients: Iterable[str],
+        html: Optional[str] = None,
+        *,
+        max_attempts: Optional[int] = None,
+    ) -> asyncio.Future:
+        """Queue a message, waiting for room; the returned future resolves once it is sent or given up."""
+        job = self._job(subject, body, recipients, html, max_attempts)
+        job.result = asyncio.get_running_loop().create_future()
+        await self._queue.put(job)
+        return job.result
+
+    async def deliver(
+        self, subject: str, body: str, recipients: Iterable[str], html: Optional[str] = None
+    ) -> None:
+        """Send one message through the workers and raise its error, without queue-level retries.
+
+        Used by callers with their own retry bookkeeping, such as the outbox.
+        """
+        if not self.running:
+            await deliver_email(subject, body, recipients, html)
+            return
+        result = await self.submit(subject, body, recipients, html, max_attempts=1)
+        # Shielded so a cancelled caller leaves the worker's bookkeeping intact
+        await asyncio.shield(result)
+
+    def metrics(self) -> dict:
+        done = self.sent + self.failed
+        return {
+            "queued": self._queue.qsize(),
+            "in_flight": self.in_flight,
+            "waiting_retry": len(self._delayed),
+            "sent": self.sent,
+            "failed": self.failed,
+            "retried": self.retried,
+            "latency_avg": self._latency_total / done if done else 0.0,
+            "latency_max": self._latency_max,
+        }
+
+    def _finish(self, job: EmailJob, error: Optional[BaseException]) -> None:
+        latency = time.monotonic() - job.enqueued_at
+        self._latency_total += latency
+        self._latency_max = max(self._latency_max, latency)
+        if error is None:
+            self.sent += 1
+        else:
+            self.failed += 1
+        if job.result is not None and not job.result.done():
+            if error is None:
+                job.result.set_result(None)
+            else:
+                job.result.set_exception(error)
+        elif error is not None:
+            logger.error("Failed to send email %r after %s attempts: %s", job.subject, job.attempts, error)
+
+    async def _requeue_later(self, job: EmailJob, delay: float) -> None:
+        await asyncio.sleep(delay)
+        await self._queue.put(job)
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            self.in_flight += 1
+            job.attempts += 1
+            try:
+                await deliver_email(job.subject, job.body, job.recipients, job.html)
+            except Exception as exc:
+                if job.attempts < job.max_attempts:
+                    self.retried += 1
+                    task = asyncio.create_task(self._requeue_later(job, self.retry_delay * 2 ** (job.attempts - 1)))
+                    self._delayed.add(task)
+                    task.add_done_callback(self._delayed.discard)
+                else:
+                    self._finish(job, exc)
+            else:
+                self._finish(job, None)
+            finally:
+                self.in_flight -= 1
+                self._queue.task_done()
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Drain queued messages (pending retries are dropped) and stop the workers."""
+        for task in list(self._delayed):
+            task.cancel()
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=self.drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Email queue not drained on shutdown: %s", self.metrics())
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            with suppress(asyncio.CancelledError):
+                await task
+        self._tasks = []
+
+
+_queue: Optional[EmailQueue] = None
+
+
+def get_email_queue() -> EmailQueue:
+    global _queue
+    if _queue is None:
+        _queue = EmailQueue(
+            workers=settings.email_workers,
+            maxsize=settings.email_queue_size,
+            max_attempts=settings.email_max_attempts,
+        )
+    return _queue
+
+
+async def email_queue_loop(metrics_interval: int = 300) -> None:
+    """Run the email workers until cancelled, then drain the queue."""
+    queue = get_email_queue()
+    queue.start()
+    last = None
     try:
-        loop = asyncio.get_running_loop()
-        loop.create_task(send_email(subject, body, recipients))
-    except RuntimeError:
-        asyncio.run(send_email(subject, body, recipients))
+        while True:
+            await asyncio.sleep(metrics_interval)
+            metrics = queue.metrics()
+            if metrics != last:
+                logger.info("Email queue: %s", metrics)
+                last = metrics
+    finally:
+        await queue.stop()
+
+
+def start_email_worker() -> asyncio.Task:
+    return asyncio.create_task(email_queue_loop())
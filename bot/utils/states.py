@@ -60,3 +60,12 @@ class TeamPhotoState(StatesGroup):
 
 class EventPhotoState(StatesGroup):
     waiting_photo = State()
+
+
+class CheckInState(StatesGroup):
+    scanning = State()
+
+
+class BroadcastState(StatesGroup):
+    text = State()
+    confirm = State()
@@ -0,0 +1,9 @@
+import os
+import tempfile
+from pathlib import Path
+
+# Settings are read at import time by bot modules; keep tests off the real .env database
+os.environ.setdefault("BOT_TOKEN", "42:TEST")
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite+aiosqlite:///{Path(tempfile.mkdtemp(prefix='techhub-test-')) / 'test.db'}"
+)
@@ -0,0 +1,70 @@
+"""An in-process stand-in for the Bot API, plugged into aiogram as its HTTP session."""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import SendMessage, TelegramMethod
+from aiogram.types import Chat, Message
+
+
+@dataclass
+class Call:
+    at: float
+    method: TelegramMethod
+    flooded: bool = False
+
+    @property
+    def chat_id(self) -> Any:
+        return getattr(self.method, "chat_id", None)
+
+
+class FakeBotAPI(BaseSession):
+    """Records every request with its ``time.monotonic()`` and answers with canned results.
+
+    ``flood_once(retry_after)`` makes the next request fail with
+    ``TelegramRetryAfter`` exactly once, as Telegram's flood control would.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls: List[Call] = []
+        self._flood: Optional[int] = None
+        self._message_ids: Dict[Any, int] = {}
+
+    def flood_once(self, retry_after: int) -> None:
+        self._flood = retry_after
+
+    def sent(self, chat_id: Any = None) -> List[Call]:
+        return [
+            call for call in self.calls if not call.flooded and (chat_id is None or call.chat_id == chat_id)
+        ]
+
+    async def make_request(self, bot: Bot, method: TelegramMethod, timeout: Optional[int] = None) -> Any:
+        call = Call(time.monotonic(), method)
+        self.calls.append(call)
+        if self._flood is not None:
+            retry_after, self._flood = self._flood, None
+            call.flooded = True
+            raise TelegramRetryAfter(method=method, message="Too Many Requests", retry_after=retry_after)
+        if isinstance(method, SendMessage):
+            message_id = self._message_ids[method.chat_id] = self._message_ids.get(method.chat_id, 0) + 1
+            return Message(
+                message_id=message_id,
+                date=datetime.now(timezone.utc),
+                chat=Chat(id=method.chat_id, type="private"),
+                text=method.text,
+            )
+        return True
+
+    async def stream_content(self, *args: Any, **kwargs: Any):  # pragma: no cover - not used by the bot
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
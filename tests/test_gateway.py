@@ -0,0 +1,72 @@
+import asyncio
+
+from aiogram import Bot
+
+from bot.services.gateway import TelegramGateway, bulk_lane
+from fake_bot_api import FakeBotAPI
+
+
+def make_bot(**limits) -> tuple[Bot, FakeBotAPI]:
+    api = FakeBotAPI()
+    bot = Bot("42:TEST", session=api)
+    api.middleware(TelegramGateway(**limits))
+    return bot, api
+
+
+def test_interactive_calls_overtake_queued_bulk_calls():
+    async def scenario():
+        bot, api = make_bot(global_rate=10, chat_rate=100, chat_burst=100)
+
+        async def broadcast():
+            with bulk_lane():
+                await asyncio.gather(*(bot.send_message(1000 + index, "рассылка") for index in range(20)))
+
+        bulk = asyncio.create_task(broadcast())
+        # The first 10 bulk calls drain the global bucket, the other 10 queue up
+        await asyncio.sleep(0.05)
+        reply = await bot.send_message(1, "ответ")
+        await bulk
+        return api, reply
+
+    api, reply = asyncio.run(scenario())
+    order = [call.chat_id for call in api.sent()]
+    assert reply.text == "ответ"
+    # Served with the first token after the burst, ahead of everything still queued
+    assert order.index(1) == 10
+    assert len(order) == 21
+
+
+def test_one_chat_never_exceeds_chat_burst():
+    burst, rate = 3, 5
+
+    async def scenario():
+        bot, api = make_bot(global_rate=100, chat_rate=rate, chat_burst=burst)
+        await asyncio.gather(*(bot.send_message(7, f"#{index}") for index in range(8)))
+        return api
+
+    calls = asyncio.run(scenario()).sent(7)
+    assert len(calls) == 8
+    for first in range(len(calls)):
+        for last in range(first, len(calls)):
+            window = calls[last].at - calls[first].at
+            # A bucket lets through at most ``burst`` calls plus ``rate`` per second
+            assert last - first + 1 <= burst + rate * window + 0.05
+
+
+def test_pause_honours_retry_after():
+    async def scenario():
+        bot, api = make_bot(global_rate=100, chat_rate=100, chat_burst=100)
+        api.flood_once(retry_after=1)
+        first = asyncio.create_task(bot.send_message(1, "первое"))
+        await asyncio.sleep(0.05)
+        # Another chat issued during the pause has to wait for it as well
+        second = await bot.send_message(2, "второе")
+        return api, await first, second
+
+    api, first, second = asyncio.run(scenario())
+    flooded = next(call for call in api.calls if call.flooded)
+    assert first.text == "первое" and second.text == "второе"
+    # The retry queued for the global bucket before the second chat did
+    assert [call.chat_id for call in api.calls] == [1, 1, 2]
+    for call in api.sent():
+        assert call.at - flooded.at >= 1 - 0.01
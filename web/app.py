@@ -1,20 +1,89 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import hmac
 import json
-from typing import Any, AsyncIterator
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Sequence
 
-from fastapi import Depends, FastAPI
-from fastapi.responses import HTMLResponse
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
+from jinja2 import Environment, FileSystemLoader, select_autoescape
 
+from bot.config import get_settings
 from bot.db import init_db, session_scope
-from bot.services.club import ClubService
-from bot.models import RegistrationStatus
+from bot.services.calendar import build_calendar, verify_calendar_token
+from bot.services.club import ClubService, naive_utc
+from bot.services.read_models import READ_MODELS, ReadModel, decode_cursor, encode_cursor
+from bot.services.stats_history import STATS_HISTORY_KEYS, load_stats_history
+
+from .assets import StaticAssets
 
 app = FastAPI(title="IT Club Dashboard")
+# Static assets arrive precompressed and the SSE stream opts out, see api_stream
+app.add_middleware(GZipMiddleware, minimum_size=500)
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+STATS_CHART_KEYS = ["users_total", "members_active", "teams_total", "events_total", "event_registrations"]
+STATS_CHART_LABELS = ["Пользователи", "Активные", "Команды", "Мероприятия", "Регистрации"]
+STATS_HISTORY_LABELS = ["Пользователи", "Активные", "Заявки на рассмотрении", "Регистрации"]
+STATS_HISTORY_RANGES = [1, 7, 30, 365]
+STATIC_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Compiled once at import; asset URLs carry content hashes
+static_assets = StaticAssets()
+templates = Environment(
+    loader=FileSystemLoader(Path(__file__).resolve().parent / "templates"),
+    autoescape=select_autoescape(["html"]),
+    trim_blocks=True,
+    lstrip_blocks=True,
+)
+templates.globals["asset_url"] = static_assets.url
+dashboard_template = templates.get_template("dashboard.html")
+SSE_KEEPALIVE_SECONDS = 15
+API_PAGE_PARAMS = {"limit", "cursor", "fields"}
+
+
+@dataclass
+class CachedBody:
+    body: bytes
+    etag: str
+    last_modified: datetime
+    expires_at: float
+    # Data version the body was rendered from, for caches validated by version instead of TTL
+    version: Any = None
+
+
+@dataclass
+class DashboardData:
+    version: tuple
+    payload: dict
+    expires_at: float
+
+
+_calendar_cache: Dict[int, CachedBody] = {}
+_dashboard_cache: Dict[str, CachedBody] = {}
+_dashboard: DashboardData | None = None
+_history_cache: Dict[int, CachedBody] = {}
 
 
 @app.on_event("startup")
 async def on_startup() -> None:
+    missing = static_assets.missing()
+    if missing:
+        logger.error(
+            "Не найдены файлы панели в web/static: %s. Графики не будут отображаться; "
+            "выполните python -m web.assets fetch и добавьте их в репозиторий.",
+            ", ".join(missing),
+        )
     await init_db()
 
 
@@ -23,111 +92,450 @@ async def get_service() -> AsyncIterator[ClubService]:
         yield ClubService(session)
 
 
+def _is_not_modified(request: Request, cached: CachedBody) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or cached.etag in tags or f"W/{cached.etag}" in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return cached.last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def conditional_response(
+    request: Request,
+    cached: CachedBody,
+    *,
+    media_type: str,
+    max_age: int,
+) -> Response:
+    headers = {
+        "ETag": cached.etag,
+        "Last-Modified": format_datetime(cached.last_modified, usegmt=True),
+        "Cache-Control": f"private, max-age={max_age}",
+    }
+    if _is_not_modified(request, cached):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type=media_type, headers=headers)
+
+
+def refresh_cached_body(previous: CachedBody | None, body: bytes, ttl: int) -> CachedBody:
+    etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+    if previous and previous.etag == etag:
+        # Content is unchanged: keep Last-Modified stable so If-Modified-Since keeps matching
+        last_modified = previous.last_modified
+    else:
+        last_modified = datetime.now(timezone.utc)
+    return CachedBody(
+        body=body,
+        etag=etag,
+        last_modified=last_modified,
+        expires_at=time.monotonic() + ttl,
+    )
+
+
+@app.get("/calendar/{user_id}/{token}.ics")
+async def user_calendar(user_id: int, token: str, request: Request) -> Response:
+    if not verify_calendar_token(user_id, token):
+        raise HTTPException(status_code=404)
+    ttl = settings.calendar_cache_seconds
+    cached = _calendar_cache.get(user_id)
+    if cached is None or cached.expires_at <= time.monotonic():
+        async with session_scope() as session:
+            events = await ClubService(session).list_user_calendar_events(user_id)
+        body = build_calendar(events).encode()
+        cached = refresh_cached_body(cached, body, ttl)
+        _calendar_cache[user_id] = cached
+    return conditional_response(
+        request,
+        cached,
+        media_type="text/calendar; charset=utf-8",
+        max_age=ttl,
+    )
+
+
+async def load_dashboard() -> DashboardData:
+    """Return the dashboard payload, querying at most once per ``DASHBOARD_CACHE_SECONDS``.
+
+    After the TTL only the cheap data version is read; the grouped payload
+    queries run again only if it changed.
+    """
+    global _dashboard
+    now = time.monotonic()
+    if _dashboard is not None and _dashboard.expires_at > now:
+        return _dashboard
+    async with session_scope() as session:
+        service = ClubService(session)
+        version = await service.get_dashboard_version()
+        if _dashboard is not None and _dashboard.version == version:
+            payload = _dashboard.payload
+        else:
+            payload = await service.get_dashboard_payload()
+    _dashboard = DashboardData(
+        version=version,
+        payload=payload,
+        expires_at=now + settings.dashboard_cache_seconds,
+    )
+    return _dashboard
+
+
+async def dashboard_response(
+    request: Request,
+    key: str,
+    render: Callable[[dict], bytes],
+    *,
+    media_type: str,
+) -> Response:
+    """Serve a view of the dashboard payload, re-rendered only when its data version changes.
+
+    Within the TTL a conditional request is answered with 304 from memory,
+    without touching the database.
+    """
+    data = await load_dashboard()
+    cached = _dashboard_cache.get(key)
+    if cached is None or cached.version != data.version:
+        cached = refresh_cached_body(cached, render(data.payload), settings.dashboard_cache_seconds)
+        cached.version = data.version
+        _dashboard_cache[key] = cached
+    return conditional_response(
+        request,
+        cached,
+        media_type=media_type,
+        max_age=settings.dashboard_cache_seconds,
+    )
+
+
+def _event_points(payload: dict) -> Dict[int, dict]:
+    return {
+        event["id"]: {"id": event["id"], "title": event["title"], "registrations": event["registrations"]}
+        for event in payload["events"]
+    }
+
+
+def dashboard_snapshot(payload: dict) -> dict:
+    return {"stats": payload["stats"], "events": list(_event_points(payload).values())}
+
+
+def dashboard_delta(previous: dict, current: dict) -> dict:
+    """Only the counters and per-event registration points that changed."""
+    delta: Dict[str, Any] = {}
+    stats = {key: value for key, value in current["stats"].items() if previous["stats"].get(key) != value}
+    if stats:
+        delta["stats"] = stats
+    old_events = _event_points(previous)
+    new_events = _event_points(current)
+    events = [point for event_id, point in new_events.items() if old_events.get(event_id) != point]
+    if events:
+        delta["events"] = events
+    removed = [event_id for event_id in old_events if event_id not in new_events]
+    if removed:
+        delta["removed_events"] = removed
+    return delta
+
+
+def sse_message(event: str, data: dict, message_id: int | None = None) -> str:
+    lines = [f"event: {event}"]
+    if message_id is not None:
+        lines.append(f"id: {message_id}")
+    lines.append("data: " + json.dumps(data, ensure_ascii=False, default=str))
+    return "\n".join(lines) + "\n\n"
+
+
+class DashboardStream:
+    """One producer polling the dashboard data version for every connected viewer.
+
+    The producer runs only while someone is subscribed. Each change is turned
+    into a delta and serialized once, then handed to every subscriber's
+    queue, so 20 open dashboards cost the same database work as one. A viewer
+    too slow to keep up is sent a fresh snapshot instead of a backlog.
+    """
+
+    def __init__(self, queue_size: int = 16) -> None:
+        self.queue_size = queue_size
+        self._subscribers: set[asyncio.Queue[str]] = set()
+        self._task: asyncio.Task | None = None
+        self.sequence = 0
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> asyncio.Queue[str]:
+        queue: asyncio.Queue[str] = asyncio.Queue(self.queue_size)
+        self._subscribers.add(queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._produce())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue[str]) -> None:
+        self._subscribers.discard(queue)
+        if not self._subscribers and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def publish(self, message: str, snapshot: str) -> None:
+        for queue in self._subscribers:
+            if queue.full():
+                # Replace the backlog with the current state
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(snapshot)
+            else:
+                queue.put_nowait(message)
+
+    async def _produce(self) -> None:
+        # ``None`` until a load succeeds; viewers got their snapshot on connect
+        previous: DashboardData | None = None
+        missed = False
+        delay = 0.0
+        while True:
+            await asyncio.sleep(delay)
+            delay = settings.dashboard_cache_seconds
+            try:
+                current = await load_dashboard()
+            except Exception as exc:  # pragma: no cover - background job
+                logger.exception("Ошибка при обновлении панели: %s", exc)
+                missed = previous is None
+                continue
+            if previous is None:
+                if missed:
+                    # Changes made while loading failed are unknown, resend the whole state
+                    self.sequence += 1
+                    snapshot = sse_message("snapshot", dashboard_snapshot(current.payload), self.sequence)
+                    self.publish(snapshot, snapshot)
+            elif current.version != previous.version:
+                delta = dashboard_delta(previous.payload, current.payload)
+                if delta:
+                    self.sequence += 1
+                    self.publish(
+                        sse_message("delta", delta, self.sequence),
+                        sse_message("snapshot", dashboard_snapshot(current.payload), self.sequence),
+                    )
+            previous = current
+
+
+dashboard_stream = DashboardStream()
+
+
+@app.get("/api/stream")
+async def api_stream(request: Request) -> StreamingResponse:
+    """Server-Sent Events: a snapshot on connect, then deltas as the data changes."""
+
+    async def events() -> AsyncIterator[str]:
+        queue = dashboard_stream.subscribe()
+        try:
+            yield "retry: 5000\n\n"
+            data = await load_dashboard()
+            yield sse_message("snapshot", dashboard_snapshot(data.payload), dashboard_stream.sequence)
+            while not await request.is_disconnected():
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+        finally:
+            dashboard_stream.unsubscribe(queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # An explicit Content-Encoding keeps GZipMiddleware from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "Content-Encoding": "identity"},
+    )
+
+
+@app.get("/static/{path:path}")
+async def static_file(path: str, request: Request) -> Response:
+    asset = static_assets.get(path)
+    if asset is None:
+        raise HTTPException(status_code=404)
+    headers = {"ETag": asset.etag, "Cache-Control": STATIC_CACHE_CONTROL, "Vary": "Accept-Encoding"}
+    if request.headers.get("if-none-match") == asset.etag:
+        return Response(status_code=304, headers=headers)
+    if asset.gzipped is not None and "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=asset.gzipped, media_type=asset.media_type, headers=headers)
+    return Response(content=asset.body, media_type=asset.media_type, headers=headers)
+
+
 @app.get("/api/stats")
-async def api_stats(service: ClubService = Depends(get_service)) -> dict[str, Any]:
-    return await service.get_statistics()
+async def api_stats(request: Request) -> Response:
+    return await dashboard_response(
+        request,
+        "stats",
+        lambda payload: json.dumps(payload["stats"], ensure_ascii=False).encode(),
+        media_type="application/json",
+    )
+
+
+@app.get("/api/stats/history")
+async def api_stats_history(request: Request, days: int = Query(30, ge=1, le=3660)) -> Response:
+    """Counter trends for the last ``days``, downsampled to at most a few hundred points."""
+    cached = _history_cache.get(days)
+    if cached is None or cached.expires_at <= time.monotonic():
+        end = datetime.utcnow()
+        async with session_scope() as session:
+            history = await load_stats_history(ClubService(session), end - timedelta(days=days), end)
+        body = json.dumps(history, ensure_ascii=False).encode()
+        cached = refresh_cached_body(cached, body, settings.dashboard_cache_seconds)
+        _history_cache[days] = cached
+    return conditional_response(
+        request,
+        cached,
+        media_type="application/json",
+        max_age=settings.dashboard_cache_seconds,
+    )
+
+
+def require_api_token(request: Request) -> None:
+    """Bearer ``API_TOKEN``; without it configured the member APIs are not exposed at all."""
+    if not settings.api_token:
+        raise HTTPException(status_code=404)
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), settings.api_token.encode()):
+        raise HTTPException(status_code=401, headers={"WWW-Authenticate": "Bearer"})
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return naive_utc(value).replace(tzinfo=timezone.utc).isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+async def stream_page(
+    read_model: ReadModel, fields: Sequence[str], clauses: Sequence, after_id: Optional[int], limit: int
+) -> AsyncIterator[bytes]:
+    """``{"items": [...], "next_cursor": ...}`` written as rows arrive from the database cursor."""
+    yield b'{"items":['
+    sent = 0
+    last_id = None
+    has_more = False
+    async with session_scope() as session:
+        async for rows in ClubService(session).stream_read_page(read_model, fields, clauses, after_id, limit):
+            items = []
+            for row in rows:
+                if sent == limit:
+                    has_more = True
+                    break
+                items.append(json.dumps(dict(zip(fields, row[1:])), ensure_ascii=False, default=_json_value))
+                last_id = row[0]
+                sent += 1
+            if items:
+                yield ("," if sent > len(items) else "").encode() + ",".join(items).encode()
+    next_cursor = encode_cursor(last_id) if has_more else None
+    yield b'],"next_cursor":' + json.dumps(next_cursor).encode() + b"}"
+
+
+def read_model_response(
+    name: str, request: Request, limit: int, cursor: Optional[str], fields: Optional[str]
+) -> Response:
+    """Validate projection, filters and cursor up front, then stream the page.
+
+    Any query parameter besides ``limit``, ``cursor`` and ``fields`` is a filter.
+    """
+    read_model = READ_MODELS[name]
+    filters = {key: value for key, value in request.query_params.items() if key not in API_PAGE_PARAMS}
+    try:
+        projection = read_model.parse_fields(fields)
+        clauses = read_model.parse_filters(filters)
+        after_id = decode_cursor(cursor) if cursor else None
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from None
+    limit = min(limit, settings.api_max_page_size)
+    return StreamingResponse(
+        stream_page(read_model, projection, clauses, after_id, limit),
+        media_type="application/json",
+        headers={"Cache-Control": "no-store"},
+    )
+
+
+@app.get("/api/users", dependencies=[Depends(require_api_token)])
+async def api_users(
+    request: Request,
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+) -> Response:
+    """Members ordered by id. Filters: ``status``, ``group_name``, ``updated_since``."""
+    return read_model_response("users", request, limit, cursor, fields)
+
+
+@app.get("/api/events", dependencies=[Depends(require_api_token)])
+async def api_events(
+    request: Request,
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+) -> Response:
+    """Events ordered by id. Filters: ``starts_after``, ``starts_before``, ``series_id``, ``updated_since``."""
+    return read_model_response("events", request, limit, cursor, fields)
+
+
+@app.get("/api/teams", dependencies=[Depends(require_api_token)])
+async def api_teams(
+    request: Request,
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+) -> Response:
+    """Teams ordered by id. Filters: ``owner_id``, ``is_permanent``, ``updated_since``."""
+    return read_model_response("teams", request, limit, cursor, fields)
+
+
+@app.get("/api/registrations", dependencies=[Depends(require_api_token)])
+async def api_registrations(
+    request: Request,
+    limit: int = Query(100, ge=1),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+) -> Response:
+    """Registrations by id. Filters: ``event_id``, ``user_id``, ``status``, ``attended``, ``updated_since``."""
+    return read_model_response("registrations", request, limit, cursor, fields)
 
 
 @app.get("/", response_class=HTMLResponse)
-async def dashboard(service: ClubService = Depends(get_service)) -> HTMLResponse:
-    stats = await service.get_statistics()
-    events = await service.list_events()
-    event_titles = [event.title for event in events]
-    registrations = [
-        sum(1 for reg in event.registrations if reg.status == RegistrationStatus.REGISTERED)
-        for event in events
-    ]
-    stats_labels = [
-        "Пользователи",
-        "Активные",
-        "Команды",
-        "Мероприятия",
-        "Регистрации",
-    ]
-    stats_values = [
-        stats["users_total"],
-        stats["members_active"],
-        stats["teams_total"],
-        stats["events_total"],
-        stats["event_registrations"],
-    ]
-    events_data = json.dumps({
-        "labels": event_titles,
-        "values": registrations,
-    }, ensure_ascii=False)
-    stats_data = json.dumps({
-        "labels": stats_labels,
-        "values": stats_values,
-    }, ensure_ascii=False)
+async def dashboard(request: Request) -> Response:
+    return await dashboard_response(
+        request,
+        "dashboard",
+        lambda payload: render_dashboard(payload).encode(),
+        media_type="text/html; charset=utf-8",
+    )
+
+
+def render_dashboard(payload: dict) -> str:
+    stats = payload["stats"]
+    events = payload["events"]
+    now = datetime.utcnow()
+    data = {
+        "stats": {
+            "keys": STATS_CHART_KEYS,
+            "labels": STATS_CHART_LABELS,
+            "values": [stats[key] for key in STATS_CHART_KEYS],
+        },
+        "events": {
+            "ids": [event["id"] for event in events],
+            "labels": [event["title"] for event in events],
+            "values": [event["registrations"] for event in events],
+        },
+        "history": {
+            "keys": STATS_HISTORY_KEYS,
+            "labels": STATS_HISTORY_LABELS,
+            "ranges": STATS_HISTORY_RANGES,
+            "days": 30,
+        },
+    }
     upcoming = [
         {
-            "title": event.title,
-            "time": event.start_at.strftime("%d.%m %H:%M"),
-            "location": event.location or "—",
+            "title": event["title"],
+            "time": event["start_at"].strftime("%d.%m %H:%M"),
+            "location": event["location"] or "—",
         }
-        for event in events[:5]
-    ]
-    upcoming_html = "".join(
-        f"<li><strong>{item['title']}</strong> — {item['time']} ({item['location']})</li>"
-        for item in upcoming
-    ) or "<li>Пока нет событий</li>"
-
-    html = f"""
-    <!DOCTYPE html>
-    <html lang=\"ru\">
-    <head>
-        <meta charset=\"utf-8\" />
-        <title>Панель ИТ-Клуба</title>
-        <script src=\"https://cdn.jsdelivr.net/npm/chart.js\"></script>
-        <style>
-            body {{ font-family: Arial, sans-serif; margin: 2rem; background: #f5f6fa; }}
-            h1 {{ margin-bottom: 1rem; }}
-            .cards {{ display: flex; gap: 1rem; flex-wrap: wrap; margin-bottom: 2rem; }}
-            .card {{ background: white; border-radius: 12px; padding: 1rem; box-shadow: 0 2px 8px rgba(0,0,0,0.08); flex: 1 1 200px; }}
-            canvas {{ max-width: 100%; height: 320px; }}
-        </style>
-    </head>
-    <body>
-        <h1>Статистика ИТ-Клуба</h1>
-        <div class=\"cards\">
-            <div class=\"card\"><canvas id=\"statsChart\"></canvas></div>
-            <div class=\"card\"><canvas id=\"eventsChart\"></canvas></div>
-        </div>
-        <div class=\"card\">
-            <h2>Ближайшие мероприятия</h2>
-            <ul>{upcoming_html}</ul>
-        </div>
-        <script>
-            const statsData = {stats_data};
-            const eventsData = {events_data};
-            new Chart(document.getElementById('statsChart'), {{
-                type: 'bar',
-                data: {{
-                    labels: statsData.labels,
-                    datasets: [{{
-                        label: 'Обзор',
-                        data: statsData.values,
-                        backgroundColor: '#4e73df'
-                    }}]
-                }},
-                options: {{responsive: true, plugins: {{legend: {{display: false}}}}}}
-            }});
-            new Chart(document.getElementById('eventsChart'), {{
-                type: 'line',
-                data: {{
-                    labels: eventsData.labels,
-                    datasets: [{{
-                        label: 'Регистрации',
-                        data: eventsData.values,
-                        borderColor: '#1cc88a',
-                        tension: 0.25,
-                        fill: false
-                    }}]
-                }},
-                options: {{responsive: true, plugins: {{legend: {{position: 'bottom'}}}}}}
-            }});
-        </script>
-    </body>
-    </html>
-    """
-    return HTMLResponse(content=html)
+        for event in events
+        if naive_utc(event["start_at"]) >= now
+    ][:5]
+    return dashboard_template.render(data=data, upcoming=upcoming)
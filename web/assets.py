@@ -0,0 +1,101 @@
+"""Static files of the web dashboard, served under content-hashed URLs.
+
+Chart.js is vendored into ``web/static/vendor`` so the dashboard works
+without access to a CDN. Fetch (or update) it once and commit the file::
+
+    python -m web.assets fetch
+
+While a file in ``REQUIRED`` is missing the web app still starts, but logs
+an error on startup and the dashboard shows the command above in place of
+the charts; nothing is loaded from a third-party host.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import mimetypes
+import urllib.request
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+STATIC_DIR = Path(__file__).resolve().parent / "static"
+CHART_JS = "vendor/chart.umd.js"
+CHART_JS_VERSION = "4.4.1"
+CHART_JS_SOURCE = f"https://cdn.jsdelivr.net/npm/chart.js@{CHART_JS_VERSION}/dist/chart.umd.js"
+
+TEXT_TYPES = {"application/javascript", "application/json", "image/svg+xml"}
+
+REQUIRED = (CHART_JS,)
+
+
+@dataclass(frozen=True)
+class StaticAsset:
+    body: bytes
+    gzipped: Optional[bytes]
+    media_type: str
+    etag: str
+
+
+class StaticAssets:
+    """Loads every file under ``directory`` once and serves it under a hashed name.
+
+    ``dashboard.js`` becomes ``/static/dashboard.<hash>.js``; since the URL
+    changes with the content, responses can be cached for a year. Compressible
+    files are gzipped once at load time instead of on every request.
+    """
+
+    prefix = "/static/"
+
+    def __init__(self, directory: Path = STATIC_DIR) -> None:
+        self._urls: Dict[str, str] = {}
+        self._assets: Dict[str, StaticAsset] = {}
+        for path in sorted(directory.rglob("*")):
+            if not path.is_file() or path.name.startswith("."):
+                continue
+            name = path.relative_to(directory).as_posix()
+            body = path.read_bytes()
+            digest = hashlib.sha256(body).hexdigest()[:12]
+            hashed = str(Path(name).with_suffix(f".{digest}{path.suffix}").as_posix())
+            media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+            gzipped = None
+            if media_type.startswith("text/") or media_type in TEXT_TYPES:
+                media_type += "; charset=utf-8"
+                gzipped = gzip.compress(body, compresslevel=9, mtime=0)
+            self._urls[name] = self.prefix + hashed
+            self._assets[hashed] = StaticAsset(body, gzipped, media_type, f'"{digest}"')
+
+    def missing(self) -> list:
+        return [name for name in REQUIRED if name not in self._urls]
+
+    def url(self, name: str) -> Optional[str]:
+        """Hashed URL of ``name``, or ``None`` for a missing ``REQUIRED`` file."""
+        if name in REQUIRED:
+            return self._urls.get(name)
+        return self._urls[name]
+
+    def get(self, hashed: str) -> Optional[StaticAsset]:
+        return self._assets.get(hashed)
+
+
+def fetch_chart_js() -> Path:
+    target = STATIC_DIR / CHART_JS
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with urllib.request.urlopen(CHART_JS_SOURCE, timeout=30) as response:
+        body = response.read()
+    target.write_bytes(body)
+    print(f"Saved Chart.js {CHART_JS_VERSION} to {target} ({len(body)} bytes, sha256 {hashlib.sha256(body).hexdigest()})")
+    return target
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage vendored dashboard assets")
+    parser.add_argument("command", choices=["fetch"])
+    parser.parse_args()
+    fetch_chart_js()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+(function () {
+    if (typeof Chart === 'undefined') return;
+    const data = JSON.parse(document.getElementById('dashboard-data').textContent);
+    const statsData = data.stats;
+    const eventsData = data.events;
+
+    const statsChart = new Chart(document.getElementById('statsChart'), {
+        type: 'bar',
+        data: {
+            labels: statsData.labels,
+            datasets: [{
+                label: 'Обзор',
+                data: statsData.values,
+                backgroundColor: '#4e73df'
+            }]
+        },
+        options: {responsive: true, plugins: {legend: {display: false}}}
+    });
+    const eventsChart = new Chart(document.getElementById('eventsChart'), {
+        type: 'line',
+        data: {
+            labels: eventsData.labels,
+            datasets: [{
+                label: 'Регистрации',
+                data: eventsData.values,
+                borderColor: '#1cc88a',
+                tension: 0.25,
+                fill: false
+            }]
+        },
+        options: {responsive: true, plugins: {legend: {position: 'bottom'}}}
+    });
+    eventsChart.data.ids = eventsData.ids.slice();
+
+    function applyDashboardUpdate(update) {
+        Object.entries(update.stats || {}).forEach(([key, value]) => {
+            const index = statsData.keys.indexOf(key);
+            if (index >= 0) statsChart.data.datasets[0].data[index] = value;
+        });
+        (update.events || []).forEach((event) => {
+            const index = eventsChart.data.ids.indexOf(event.id);
+            if (index >= 0) {
+                eventsChart.data.labels[index] = event.title;
+                eventsChart.data.datasets[0].data[index] = event.registrations;
+            } else {
+                eventsChart.data.ids.push(event.id);
+                eventsChart.data.labels.push(event.title);
+                eventsChart.data.datasets[0].data.push(event.registrations);
+            }
+        });
+        (update.removed_events || []).forEach((id) => {
+            const index = eventsChart.data.ids.indexOf(id);
+            if (index >= 0) {
+                eventsChart.data.ids.splice(index, 1);
+                eventsChart.data.labels.splice(index, 1);
+                eventsChart.data.datasets[0].data.splice(index, 1);
+            }
+        });
+        statsChart.update();
+        eventsChart.update();
+    }
+
+    const stream = new EventSource('/api/stream');
+    stream.addEventListener('snapshot', (message) => {
+        const snapshot = JSON.parse(message.data);
+        const ids = snapshot.events.map((event) => event.id);
+        applyDashboardUpdate({
+            ...snapshot,
+            removed_events: eventsChart.data.ids.filter((id) => !ids.includes(id)),
+        });
+    });
+    stream.addEventListener('delta', (message) => applyDashboardUpdate(JSON.parse(message.data)));
+
+    const historyData = data.history;
+    const historyColors = ['#4e73df', '#1cc88a', '#f6c23e', '#e74a3b'];
+    const historyChart = new Chart(document.getElementById('historyChart'), {
+        type: 'line',
+        data: {
+            labels: [],
+            datasets: historyData.keys.map((key, index) => ({
+                label: historyData.labels[index],
+                data: [],
+                borderColor: historyColors[index % historyColors.length],
+                pointRadius: 0,
+                tension: 0.2,
+                fill: false
+            }))
+        },
+        options: {responsive: true, interaction: {mode: 'index', intersect: false}, plugins: {legend: {position: 'bottom'}}}
+    });
+    let historyDays = historyData.days;
+
+    function formatBucket(value, resolution) {
+        const date = new Date(value);
+        const day = date.toLocaleDateString('ru-RU', {day: '2-digit', month: '2-digit'});
+        if (resolution === 'raw' || resolution === 'hour') {
+            return day + ' ' + date.toLocaleTimeString('ru-RU', {hour: '2-digit', minute: '2-digit'});
+        }
+        return day;
+    }
+
+    async function loadHistory() {
+        const response = await fetch('/api/stats/history?days=' + historyDays);
+        if (!response.ok) return;
+        const history = await response.json();
+        historyChart.data.labels = history.points.map((point) => formatBucket(point.t, history.resolution));
+        historyChart.data.datasets.forEach((dataset, index) => {
+            dataset.data = history.points.map((point) => point[historyData.keys[index]]);
+        });
+        historyChart.update();
+    }
+
+    document.querySelectorAll('.ranges button').forEach((button) => {
+        button.addEventListener('click', () => {
+            document.querySelectorAll('.ranges button').forEach((other) => other.classList.remove('active'));
+            button.classList.add('active');
+            historyDays = Number(button.dataset.days);
+            loadHistory();
+        });
+    });
+    loadHistory();
+    setInterval(loadHistory, 5 * 60 * 1000);
+})();